@@ -0,0 +1,118 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from utils.config import get_env_variable
+
+LLM_CACHE_PATH = ".llm_cache.sqlite"
+LLM_CACHE_MAX_ENTRIES = 10000
+# Cache hits only update last_access in memory; the updates are written in one transaction once this
+# many are pending, before a put() evicts entries, and on flush()/close()
+ACCESS_FLUSH_SIZE = 1000
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_access REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+def make_cache_key(model, system_prompt, description):
+    """Hashes everything that determines the LLM's answer into a stable cache key."""
+    payload = json.dumps([model, system_prompt, description], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent LLM response cache backed by a SQLite file.
+
+    Entries are evicted least-recently-used first once more than `max_entries` are stored, and
+    expire `ttl` seconds after they were written if a TTL is set. Safe to share between threads.
+    Hit and miss counts are kept for the lifetime of the object. A hit does not write to the file;
+    access times are batched (see ACCESS_FLUSH_SIZE), so call close() or flush() when done.
+    """
+
+    def __init__(self, path=None, max_entries=None, ttl=None):
+        if path is None:
+            path = get_env_variable("LLM_CACHE_PATH", LLM_CACHE_PATH)
+        if max_entries is None:
+            max_entries = int(get_env_variable("LLM_CACHE_MAX_ENTRIES", str(LLM_CACHE_MAX_ENTRIES)))
+        if ttl is None:
+            ttl = float(get_env_variable("LLM_CACHE_TTL", "0")) or None
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._pending_access = {}
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+    def get(self, key):
+        """Returns the cached response for a key, or None on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                if row is not None:
+                    self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._connection.commit()
+                self.misses += 1
+                return None
+            self._pending_access[key] = now
+            if len(self._pending_access) >= ACCESS_FLUSH_SIZE:
+                self._flush_access()
+            self.hits += 1
+            return row[0]
+
+    def _flush_access(self):
+        # Caller holds the lock
+        if self._pending_access:
+            self._connection.executemany("UPDATE responses SET last_access = ? WHERE key = ?",
+                                         [(accessed, key) for key, accessed in self._pending_access.items()])
+            self._connection.commit()
+            self._pending_access.clear()
+
+    def flush(self):
+        """Writes the pending access times so LRU eviction by other processes sees them."""
+        with self._lock:
+            self._flush_access()
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self._lock:
+            # Eviction orders by last_access, so recent hits must be on disk first
+            self._flush_access()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)", (key, model, response, now, now))
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "  SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._pending_access.clear()
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._flush_access()
+            self._connection.close()
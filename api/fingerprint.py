@@ -0,0 +1,63 @@
+import hashlib
+import json
+
+# Component fields that only identify or decorate a component; they never change what gets evaluated
+IGNORED_COMPONENT_KEYS = frozenset({"component_id", "component_label", "visual_indicators", "ref_abs_component_id"})
+IGNORED_CONNECTION_KEYS = frozenset({"connection_id", "label", "ref_source_component_id", "ref_target_component_id"})
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _canonical_component(component):
+    canonical = {key: value for key, value in component.items() if key not in IGNORED_COMPONENT_KEYS}
+    config = canonical.get("component_resource_config")
+    if isinstance(config, dict) and isinstance(config.get("attributes"), list):
+        # The attribute entries form a set of priced line items; their order carries no meaning
+        attributes = sorted(json.dumps(entry, sort_keys=True, default=str) for entry in config["attributes"])
+        canonical["component_resource_config"] = {**config, "attributes": attributes}
+    return canonical
+
+
+def component_fingerprint(component):
+    """Hashes a component's type, provider, resource config and pricing, ignoring its ID, label and icon."""
+    return _digest(_canonical_component(component))
+
+
+def architecture_fingerprint(architecture):
+    """
+    Computes an order-independent hash of what an architecture is made of.
+
+    The hash covers every component's type, provider, resource config and pricing, plus the
+    connections between them, with each endpoint replaced by its component's hash.
+    Architecture IDs, metadata, component IDs, labels and visual indicators are ignored, as is
+    the order of components, connections and config line items. Two candidates that differ only
+    in naming therefore get the same fingerprint.
+
+    Args:
+        architecture (dict): One entry of the architectures.json "architectures" array.
+
+    Returns:
+        str: Hex SHA-256 fingerprint.
+    """
+    component_hashes = []
+    hashes = {}
+    for component in architecture.get("components") or []:
+        component_hash = component_fingerprint(component)
+        component_hashes.append(component_hash)
+        hashes.setdefault(component.get("component_id"), component_hash)
+
+    connections = []
+    for connection in architecture.get("connections") or []:
+        source = hashes.get(connection.get("ref_source_component_id"), connection.get("ref_source_component_id"))
+        target = hashes.get(connection.get("ref_target_component_id"), connection.get("ref_target_component_id"))
+        if connection.get("bidirectional"):
+            source, target = sorted((str(source), str(target)))
+        rest = {key: value for key, value in connection.items() if key not in IGNORED_CONNECTION_KEYS}
+        connections.append(json.dumps([source, target, rest], sort_keys=True, default=str))
+
+    return _digest({
+        "components": sorted(component_hashes),
+        "connections": sorted(connections)
+    })
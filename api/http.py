@@ -0,0 +1,193 @@
+import email.utils
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+# Upper bound on a server-requested Retry-After wait
+RETRY_AFTER_MAX = 120.0
+
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30.0
+
+POOL_SIZE = 16
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling an endpoint after `failure_threshold` consecutive failures.
+
+    While open every call fails fast. After `reset_timeout` seconds one trial request is let
+    through (half-open); its success closes the circuit and its failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Returns True if a request may be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header given either as seconds or as an HTTP date.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Exponential backoff with full jitter: a random wait in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class HttpClient:
+    """
+    Pooled keep-alive HTTP client with retries and a circuit breaker.
+
+    429 and 5xx responses and connection errors are retried with exponential backoff and jitter,
+    waiting for the server's Retry-After instead when it sends one. Server errors and connection
+    failures count against the circuit breaker; rate-limit responses do not.
+    """
+
+    def __init__(self, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 pool_size=POOL_SIZE, breaker=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, url, stats=None, **kwargs):
+        """
+        Sends a POST request, retrying transient failures.
+
+        Args:
+            url (str): The request URL.
+            stats (dict, optional): Filled with 'retries' (extra attempts made), 'retry_delay'
+                                    (seconds spent waiting between attempts) and 'latency' (seconds
+                                    from the first attempt to the final response, retries included).
+            **kwargs: Passed to requests.Session.post (headers, json, timeout, ...).
+
+        Returns:
+            requests.Response: The final response; after the last retry this may still be a 429/5xx.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            requests.RequestException: If the last attempt failed to connect or timed out.
+        """
+        if stats is None:
+            stats = {}
+        stats["retries"] = 0
+        stats["retry_delay"] = 0.0
+        start = time.perf_counter()
+        try:
+            return self._post(url, stats, **kwargs)
+        finally:
+            stats["latency"] = time.perf_counter() - start
+
+    def _post(self, url, stats, **kwargs):
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {url}: too many consecutive failures")
+
+            retry_after = None
+            try:
+                response = self.session.post(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    # The endpoint is up, just throttling us
+                    self.breaker.record_success()
+                if attempt >= self.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+            if retry_after is not None:
+                delay = min(retry_after, RETRY_AFTER_MAX)
+            else:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+            time.sleep(delay)
+            attempt += 1
+            stats["retries"] = attempt
+            stats["retry_delay"] += delay
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Returns the process-wide HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
@@ -1,13 +1,52 @@
 # openrouter.py
 
 import os
-import requests
+import heapq
 import json
-import re
-
-OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1/chat/completions"
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from api.cache import ResponseCache, make_cache_key
+from api.fingerprint import architecture_fingerprint
+from api.http import get_http_client
+from api.prescore import PRESCORE_MARGIN, needs_llm, prescore_architecture, prescore_cutoff
+from api.ratelimit import RateLimiter, estimate_tokens
+from api.scoring import (RESULT_KEYS, RESPONSE_FORMAT, ArchitectureScores, extract_scores_from_llm_output,
+                         extract_json_object)
+from api.streaming import iter_architectures, write_jsonl
+
+# Point OPENROUTER_BASE_URL at a local stand-in server to test without the real API
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1/chat/completions")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
+DEFAULT_MODEL = "openai/gpt-3.5-turbo"
+
+# Concurrency and rate limits for evaluate_all_architectures
+OPENROUTER_MAX_CONCURRENCY = int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "4"))
+OPENROUTER_REQUESTS_PER_MINUTE = int(os.getenv("OPENROUTER_REQUESTS_PER_MINUTE", "60"))
+OPENROUTER_TOKENS_PER_MINUTE = int(os.getenv("OPENROUTER_TOKENS_PER_MINUTE", "100000"))
+OPENROUTER_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "60"))
+OPENROUTER_CONNECT_TIMEOUT = float(os.getenv("OPENROUTER_CONNECT_TIMEOUT", "10"))
+
+# Completion length budgeted per request when charging the tokens-per-minute limit
+ESTIMATED_COMPLETION_TOKENS = 600
+
+# Batched mode packs up to OPENROUTER_BATCH_SIZE descriptions into one request (1 disables batching),
+# as long as their prompt plus expected JSON answer stays within OPENROUTER_BATCH_TOKEN_BUDGET
+OPENROUTER_BATCH_SIZE = int(os.getenv("OPENROUTER_BATCH_SIZE", "1"))
+OPENROUTER_BATCH_TOKEN_BUDGET = int(os.getenv("OPENROUTER_BATCH_TOKEN_BUDGET", "6000"))
+ESTIMATED_BATCH_COMPLETION_TOKENS = 120
+
+# Rule-based pre-scoring: only the best OPENROUTER_PRESCORE_TOP_K candidates (plus ambiguous ones) are sent
+# to the LLM; 0 disables it and sends everything
+OPENROUTER_PRESCORE_TOP_K = int(os.getenv("OPENROUTER_PRESCORE_TOP_K", "0"))
+
+# Evaluate architectures with the same canonical fingerprint (api.fingerprint) only once
+OPENROUTER_DEDUPLICATE = os.getenv("OPENROUTER_DEDUPLICATE", "true").lower() in ("1", "true", "yes")
+
+# Ask for a JSON-schema response (response_format) and validate it; free text is still parsed as a fallback
+OPENROUTER_STRUCTURED_OUTPUT = os.getenv("OPENROUTER_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+
 
 def describe_architecture(name, components):
     """
@@ -19,7 +58,8 @@ def describe_architecture(name, components):
 
         Returns:
             str: A formatted string describing the architecture's services, pricing models, regions,
-                 compute resources, and storage types.
+                 compute resources, and storage types, plus the estimated monthly cost when the
+                 components carry component_pricing from pricing.estimator.
         """
     services = list({comp.get("service") for comp in components if comp.get("service")})
     pricing_models = list({comp.get("pricing_model") for comp in components if comp.get("pricing_model")})
@@ -30,13 +70,22 @@ def describe_architecture(name, components):
         if comp.get("service") in ["EC2", "EKS"] and "vcpu" in comp
     ]
     storage_types = list({comp["service"] for comp in components if comp.get("service") in ["S3", "RDS"]})
+    monthly_costs = [
+        pricing["monthly_cost"]
+        for comp in components
+        for pricing in (comp.get("component_pricing") or {}).values()
+        if isinstance(pricing, dict) and isinstance(pricing.get("monthly_cost"), (int, float))
+    ]
 
-    return f"""Architecture Name: {name}
+    description = f"""Architecture Name: {name}
 Services: {', '.join(services)}
 Pricing Models: {', '.join(pricing_models)}
 Regions: {', '.join(regions) if regions else 'Not Specified'}
 Compute Resources: {', '.join(compute_specs) if compute_specs else 'Not specified'}
 Storage Types: {', '.join(storage_types) if storage_types else 'Not specified'}"""
+    if monthly_costs:
+        description += f"\nEstimated Monthly Cost: ${sum(monthly_costs):,.2f}"
+    return description
 
 
 SYSTEM_PROMPT = """
@@ -56,13 +105,35 @@ Rate the architecture (1–5) for each criterion and explain your reasoning.
 """
 
 
-def query_openrouter(architecture_description, model="openai/gpt-3.5-turbo"):
+STRUCTURED_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+Reply with a JSON object with integer ratings "regional_availability", "operational_fit" and
+"future_cost_flexibility" (1-5), a numeric "overall" and a short "reasoning".
+"""
+
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+You will receive several architectures, each introduced by a line "### Architecture ID: <id>".
+Rate each of them independently. Reply with a single JSON object and nothing else, mapping every
+architecture ID to an object with integer ratings "regional_availability", "operational_fit" and
+"future_cost_flexibility" (1-5), a numeric "overall" and a one-sentence "reasoning".
+"""
+
+
+def query_openrouter(architecture_description, model=DEFAULT_MODEL, timeout=OPENROUTER_TIMEOUT, stats=None,
+                     system_prompt=SYSTEM_PROMPT, response_format=None):
     """
         Sends a request to the OpenRouter API with a given architecture description and returns the LLM's response.
 
+        The request goes through the shared keep-alive client, which retries 429/5xx responses
+        with backoff and stops calling the endpoint while its circuit breaker is open.
+
         Args:
             architecture_description: A formatted string describing the architecture to be evaluated.
             model: The LLM model to use (default is 'openai/gpt-3.5-turbo').
+            timeout: Seconds to wait for the response before giving up.
+            stats: Optional dictionary filled with the number of retries, the seconds spent waiting on them
+                   and the request latency.
+            system_prompt: The system message sent with the description.
+            response_format: Optional OpenAI-style response_format (e.g. a JSON schema) passed to the model.
 
         Returns:
             str: The response content generated by the LLM.
@@ -78,104 +149,366 @@ def query_openrouter(architecture_description, model="openai/gpt-3.5-turbo"):
     payload = {
         "model": model,
         "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "system", "content": system_prompt},
             {"role": "user", "content": architecture_description}
         ]
     }
+    if response_format is not None:
+        payload["response_format"] = response_format
 
-    response = requests.post(OPENROUTER_BASE_URL, headers=headers, json=payload)
+    response = get_http_client().post(OPENROUTER_BASE_URL, stats=stats, headers=headers, json=payload,
+                                      timeout=(OPENROUTER_CONNECT_TIMEOUT, timeout))
     if response.status_code == 200:
         return response.json()["choices"][0]["message"]["content"]
     else:
         raise Exception(f"OpenRouter request failed: {response.status_code}, {response.text}")
 
 
-def evaluate_all_architectures(architectures_path):
+def _run_in_order(func, items, max_concurrency):
     """
-        Loads a list of architecture configurations from a JSON file, evaluates each one using an LLM,
-        and returns their scoring results.
+    Applies `func` to every item on a thread pool and yields the results in input order.
+
+    At most `max_concurrency` calls run at once and only a bounded window of results is held,
+    so a slow early item delays yielding but never the work on the items behind it.
+    """
+    if max_concurrency <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_concurrency * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _result(name, scores=None, error=None, stats=None, scored_by="llm"):
+    """Builds an evaluation result; successful and failed evaluations have the same keys."""
+    stats = stats or {}
+    return {
+        "Architecture": name,
+        **(scores if scores is not None else dict.fromkeys(RESULT_KEYS)),
+        "Error": error,
+        "scored_by": scored_by,
+        "duplicate_of": None,
+        "retries": stats.get("retries", 0),
+        "retry_delay": round(stats.get("retry_delay", 0.0), 3),
+        "latency": round(stats.get("latency", 0.0), 3)
+    }
+
+
+def _evaluate_architecture(name, description, limiter, model=DEFAULT_MODEL, timeout=OPENROUTER_TIMEOUT,
+                           cache=None, structured_output=OPENROUTER_STRUCTURED_OUTPUT):
+    """Scores one architecture description, returning the result dictionary used by evaluate_all_architectures."""
+    print(f"Evaluating: {name}")
+    stats = {"retries": 0, "retry_delay": 0.0}
+    system_prompt = STRUCTURED_SYSTEM_PROMPT if structured_output else SYSTEM_PROMPT
+    try:
+        # Cached answers skip both the network and the rate limiter
+        key = make_cache_key(model, system_prompt, description)
+        response = cache.get(key) if cache is not None else None
+        from_cache = response is not None
+        if response is None:
+            limiter.acquire(estimate_tokens(system_prompt + description) + ESTIMATED_COMPLETION_TOKENS)
+            response = query_openrouter(description, model=model, timeout=timeout, stats=stats,
+                                        system_prompt=system_prompt,
+                                        response_format=RESPONSE_FORMAT if structured_output else None)
+        scores = extract_scores_from_llm_output(response)
+        print(response)
+        if all(value is None for value in scores.values()):
+            raise ValueError("No scores found in the LLM response")
+        # Only cache replies that parsed, so an unreadable answer is asked again next run
+        if cache is not None and not from_cache:
+            cache.put(key, model, response)
+        return _result(name, scores, stats=stats)
+    except Exception as e:
+        print(f"Error evaluating {name}: {e}")
+        return _result(name, error=str(e), stats=stats)
+
+
+def _iter_batches(items, batch_size, token_budget):
+    """
+    Groups (name, description, result) items into batches of at most `batch_size` architectures to
+    send, closing a batch early when adding the next description would push its estimated prompt
+    and answer over `token_budget`. Items that already have a result ride along without counting.
+    """
+    base_tokens = estimate_tokens(BATCH_SYSTEM_PROMPT)
+    batch, batch_count, batch_tokens = [], 0, base_tokens
+    for item in items:
+        name, description, result = item
+        if result is not None:
+            batch.append(item)
+            continue
+        tokens = estimate_tokens(description) + ESTIMATED_BATCH_COMPLETION_TOKENS
+        if batch_count and (batch_count >= batch_size or batch_tokens + tokens > token_budget):
+            yield batch
+            batch, batch_count, batch_tokens = [], 0, base_tokens
+        batch.append(item)
+        batch_count += 1
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def _format_batch(batch):
+    return "\n\n".join(f"### Architecture ID: {name}\n{description}" for name, description in batch)
+
+
+def parse_batch_response(response_text, names):
+    """
+        Splits a batched JSON reply into per-architecture scores.
 
         Args:
-            architectures_path: Path to a JSON file containing architecture definitions.
+            response_text (str): The LLM reply; a JSON object keyed by architecture ID, possibly wrapped
+                                 in a Markdown code fence or surrounding prose.
+            names (list): The architecture IDs that were sent.
 
         Returns:
-            list: A list of dictionaries containing architecture names, evaluation scores for
-                  Regional Availability, Operational Fit, Cost Flexibility, and Overall score.
-                  If evaluation fails, the scores will be None and an error message will be included.
-    """
-    with open(architectures_path, "r") as f:
-        data = json.load(f)
-
-    results = []
-    for architecture in data["architectures"]:
-        name = architecture["metadata"]["architecture_id"]
-        components = architecture.get("components", [])
-        description = describe_architecture(name, components)
-        print(f"Evaluating: {name}")
+            dict: Mapping of architecture ID to a scores dictionary shaped like extract_scores_from_llm_output's.
+                  IDs missing from the reply or without a usable rating are left out.
+    """
+    data = extract_json_object(response_text)
+    if not isinstance(data, dict):
+        return {}
+
+    parsed = {}
+    for name in names:
+        entry = data.get(name)
+        if not isinstance(entry, dict):
+            continue
+        scores = ArchitectureScores.from_dict(entry)
+        if not scores.is_empty:
+            parsed[name] = scores.to_dict()
+    return parsed
+
+
+def _evaluate_batch(batch, limiter, model=DEFAULT_MODEL, timeout=OPENROUTER_TIMEOUT, cache=None,
+                    structured_output=OPENROUTER_STRUCTURED_OUTPUT):
+    """
+    Scores a batch of (name, description, result) items with a single request, returning results in batch order.
+
+    Items that already have a result are passed through. Per-architecture answers are cached individually,
+    so only uncached architectures are sent. Any architecture the reply leaves out, and every one of them
+    if the request fails, is retried on its own.
+    """
+    results = [None] * len(batch)
+    keys = {}
+    pending = []
+    for position, (name, description, result) in enumerate(batch):
+        if result is not None:
+            results[position] = result
+            continue
+        keys[position] = make_cache_key(model, BATCH_SYSTEM_PROMPT, description)
+        cached = cache.get(keys[position]) if cache is not None else None
+        if cached is not None:
+            results[position] = _result(name, json.loads(cached))
+        else:
+            pending.append((position, name, description))
+
+    if len(pending) > 1:
+        names = [name for _, name, _ in pending]
+        print(f"Evaluating batch of {len(pending)}: {', '.join(names)}")
+        stats = {"retries": 0, "retry_delay": 0.0}
+        prompt = _format_batch([(name, description) for _, name, description in pending])
         try:
-            response = query_openrouter(description)
-            scores = extract_scores_from_llm_output(response)
-            print(response)
-            results.append({
-                "Architecture": name,
-                **scores
-            })
+            limiter.acquire(estimate_tokens(BATCH_SYSTEM_PROMPT + prompt)
+                            + ESTIMATED_BATCH_COMPLETION_TOKENS * len(pending))
+            response = query_openrouter(prompt, model=model, timeout=timeout, stats=stats,
+                                        system_prompt=BATCH_SYSTEM_PROMPT)
+            parsed = parse_batch_response(response, names)
         except Exception as e:
-            print(f"Error evaluating {name}: {e}")
-            results.append({
-                "Architecture": name,
-                "Regional Availability": None,
-                "Operational Fit": None,
-                "Cost Flexibility": None,
-                "Overall": None,
-                "Error": str(e)
-            })
+            print(f"Error evaluating batch, retrying individually: {e}")
+            parsed = {}
+        for position, name, _ in pending:
+            if name in parsed:
+                if cache is not None:
+                    cache.put(keys[position], model, json.dumps(parsed[name]))
+                results[position] = _result(name, parsed[name], stats=stats)
+
+    for position, name, description in pending:
+        if results[position] is None:
+            results[position] = _evaluate_architecture(name, description, limiter, model=model, timeout=timeout,
+                                                       cache=cache, structured_output=structured_output)
 
     return results
 
 
-def extract_scores_from_llm_output(response_text):
+def evaluate_architectures_stream(architectures_path, output_path=None, max_concurrency=OPENROUTER_MAX_CONCURRENCY,
+                                  requests_per_minute=OPENROUTER_REQUESTS_PER_MINUTE,
+                                  tokens_per_minute=OPENROUTER_TOKENS_PER_MINUTE, timeout=OPENROUTER_TIMEOUT,
+                                  model=DEFAULT_MODEL, use_cache=True, cache_path=None, cache_ttl=None,
+                                  batch_size=OPENROUTER_BATCH_SIZE, batch_token_budget=OPENROUTER_BATCH_TOKEN_BUDGET,
+                                  structured_output=OPENROUTER_STRUCTURED_OUTPUT,
+                                  prescore_top_k=OPENROUTER_PRESCORE_TOP_K, prescore_margin=PRESCORE_MARGIN,
+                                  deduplicate=OPENROUTER_DEDUPLICATE):
+    """
+        Evaluates the architectures in a JSON file one by one, yielding each result as it is ready.
+
+        The file is parsed incrementally and only a bounded window of architectures is in flight,
+        so memory use does not grow with the file size. Requests run concurrently on a thread pool,
+        throttled by a token-bucket limiter on both requests and tokens per minute, and results are
+        yielded in the order of the input file. Responses are cached on disk by (model, system prompt,
+        description), so re-ranking unchanged architectures makes no network calls.
+
+        With batch_size > 1, several descriptions share one request that asks for JSON scores keyed
+        by architecture ID, cutting the request count (and repeated system prompt) by up to that factor.
+
+        With prescore_top_k set, a first pass over the file scores every candidate with local rules
+        (api.prescore). Only the top k, those within prescore_margin of the cutoff and those the rules
+        know too little about are sent to the LLM; the rest keep their preliminary scores.
+
+        With deduplicate, architectures whose canonical fingerprint (component types, configs, pricing
+        and connections, ignoring IDs and labels) matches an earlier one are not evaluated again; they
+        get a copy of the earlier result with 'duplicate_of' naming it. The first result for every
+        distinct fingerprint is kept in memory for this.
+
+        Args:
+            architectures_path: Path to a JSON file containing architecture definitions.
+            output_path: If given, every result is also appended to this JSON Lines file as it completes.
+            max_concurrency: Maximum number of requests in flight at once (1 evaluates sequentially).
+            requests_per_minute: Request rate limit, or None for no limit.
+            tokens_per_minute: Estimated prompt + completion token rate limit, or None for no limit.
+            timeout: Per-request timeout in seconds.
+            model: The LLM model to use.
+            use_cache: Read and write the response cache; False bypasses it entirely.
+            cache_path: Cache file (defaults to LLM_CACHE_PATH or .llm_cache.sqlite).
+            cache_ttl: Seconds after which a cached response is ignored (defaults to LLM_CACHE_TTL, no expiry).
+            batch_size: Maximum architectures per request; 1 sends one request per architecture.
+            batch_token_budget: Estimated prompt + answer tokens allowed per batched request.
+            structured_output: Request a JSON-schema response and validate it into a score record.
+            prescore_top_k: Number of best pre-scored candidates to send to the LLM; 0 or None sends all.
+            prescore_margin: Preliminary overall-score margin below the top-k cutoff that is still sent.
+            deduplicate: Evaluate each distinct architecture fingerprint only once.
+
+        Yields:
+            dict: 'Architecture', 'Workplan' (the workplan_id from its metadata), the scores
+                  'regional_availability', 'operational_fit', 'future_cost_flexibility' and 'overall',
+                  'Error' (None on success), 'scored_by' ('llm' or 'prescore'), 'duplicate_of' (the
+                  architecture whose result was reused, or None),
+                  'retries', 'retry_delay' (seconds added by retry waits) and 'latency' (seconds spent
+                  on the request, 0 when no request was made).
+                  Failed evaluations have the same keys with None scores and the error message.
+    """
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    cache = ResponseCache(cache_path, ttl=cache_ttl) if use_cache else None
+
+    cutoff = None
+    if prescore_top_k:
+        cutoff = prescore_cutoff(map(prescore_architecture, iter_architectures(architectures_path)), prescore_top_k)
+    counts = {"total": 0, "avoided": 0, "duplicates": 0}
+    # (workplan, fingerprint, name of the first architecture with that fingerprint or None) per prepared
+    # item, in input order; finish() consumes it in step with the ordered results
+    prepared = deque()
+    first_seen = {}
+
+    def prepare(architecture):
+        metadata = architecture["metadata"]
+        name = metadata["architecture_id"]
+        counts["total"] += 1
+        fingerprint = original = None
+        if deduplicate:
+            fingerprint = architecture_fingerprint(architecture)
+            original = first_seen.get(fingerprint)
+            if original is None:
+                first_seen[fingerprint] = name
+        prepared.append((metadata.get("workplan_id"), fingerprint, original))
+        if deduplicate:
+            if original is not None:
+                counts["duplicates"] += 1
+                # Placeholder; fan_out replaces it with the original's result
+                return name, None, _result(name)
+        if prescore_top_k:
+            prescore = prescore_architecture(architecture)
+            if not needs_llm(prescore, cutoff, prescore_margin):
+                counts["avoided"] += 1
+                return name, None, _result(name, prescore.to_dict(), scored_by="prescore")
+        return name, describe_architecture(name, architecture.get("components", [])), None
+
+    def evaluate(item):
+        name, description, result = item
+        if result is not None:
+            return result
+        return _evaluate_architecture(name, description, limiter, model=model, timeout=timeout, cache=cache,
+                                      structured_output=structured_output)
+
+    def evaluate_batch(batch):
+        return _evaluate_batch(batch, limiter, model=model, timeout=timeout, cache=cache,
+                               structured_output=structured_output)
+
+    def finish(results):
+        # Adds the workplan and fans duplicate results out; results arrive in input order, so every
+        # original is seen before its duplicates
+        first_results = {}
+        for result in results:
+            workplan, fingerprint, original = prepared.popleft()
+            if original is not None:
+                result = {**first_results[fingerprint], "Architecture": result["Architecture"],
+                          "duplicate_of": original}
+            elif deduplicate:
+                first_results[fingerprint] = result
+            yield {"Architecture": result["Architecture"], "Workplan": workplan, **result}
+
+    try:
+        items = map(prepare, iter_architectures(architectures_path))
+        if batch_size > 1:
+            batches = _iter_batches(items, batch_size, batch_token_budget)
+            results = (result for batch_results in _run_in_order(evaluate_batch, batches, max_concurrency)
+                       for result in batch_results)
+        else:
+            results = _run_in_order(evaluate, items, max_concurrency)
+        results = finish(results)
+        if output_path is not None:
+            results = write_jsonl(results, output_path)
+        yield from results
+    finally:
+        if deduplicate:
+            print(f"Deduplication: {counts['duplicates']} duplicate architectures of {counts['total']} reused "
+                  f"an earlier result")
+        if prescore_top_k:
+            print(f"Pre-scorer: {counts['avoided']} of {counts['total']} LLM evaluations avoided")
+        if cache is not None:
+            print(f"LLM response cache: {cache.hits} hits, {cache.misses} misses")
+            cache.close()
+
+
+def evaluate_all_architectures(architectures_path, **options):
     """
-        Extracts numerical evaluation scores from the LLM-generated response text.
+        Loads a list of architecture configurations from a JSON file, evaluates each one using an LLM,
+        and returns their scoring results.
 
         Args:
-            response_text (str): The raw response returned by the LLM.
+            architectures_path: Path to a JSON file containing architecture definitions.
+            **options: Any keyword argument accepted by evaluate_architectures_stream.
 
         Returns:
-            dict: A dictionary containing scores for:
-                  - 'regional_availability'
-                  - 'operational_fit'
-                  - 'future_cost_flexibility'
-                  - 'overall' (explicit or calculated average)
-                  Each value is a number (int or float) or None if not found.
-    """
-    import re
-
-    scores = {}
-    criteria = {
-        'regional_availability': r'Regional Availability.*?Rating: ?(\d)',
-        'operational_fit': r'Operational Fit.*?Rating: ?(\d)',
-        'future_cost_flexibility': r'Future Cost Flexibility.*?Rating: ?(\d)',
-    }
+            list: The result dictionaries yielded by evaluate_architectures_stream, in input order.
+    """
+    return list(evaluate_architectures_stream(architectures_path, **options))
 
-    for key, pattern in criteria.items():
-        match = re.search(pattern, response_text, re.IGNORECASE | re.DOTALL)
-        if match:
-            scores[key] = int(match.group(1))
-        else:
-            scores[key] = None
 
-    # Try to extract an explicit overall score
-    overall_match = re.search(r'Overall (?:Rating|Score)[:\s]+([0-5](?:\.\d+)?)', response_text, re.IGNORECASE)
-    if overall_match:
-        scores['overall'] = float(overall_match.group(1))
-    else:
-        # Fallback to average if all individual scores are available
-        individual_scores = [v for v in scores.values() if isinstance(v, int)]
-        if len(individual_scores) == 3:
-            scores['overall'] = round(sum(individual_scores) / 3, 2)
-        else:
-            scores['overall'] = None
+def rank_architectures(results, top_n=None):
+    """
+        Ranks evaluation results by overall score, consuming them one at a time.
 
-    return scores
+        Only the name and overall score of each result are kept, so a long result stream can be
+        ranked without holding the full result dictionaries. Architectures that only have a rule-based
+        preliminary score rank below every LLM-scored one, unscored architectures come last and
+        ties keep their input order.
 
+        Args:
+            results: Iterable of result dictionaries (e.g. from evaluate_architectures_stream or read_jsonl).
+            top_n: Keep only the best `top_n` entries.
+
+        Returns:
+            list: Dictionaries with 'Architecture' and 'overall', best first.
+    """
+    keyed = ((result.get("overall") is not None, result.get("scored_by") != "prescore", result.get("overall") or 0,
+              -i, result.get("Architecture"))
+             for i, result in enumerate(results))
+    ranked = heapq.nlargest(top_n, keyed) if top_n is not None else sorted(keyed, reverse=True)
+    return [{"Architecture": name, "overall": overall if scored else None}
+            for scored, _, overall, _, name in ranked]
@@ -0,0 +1,162 @@
+import heapq
+from dataclasses import dataclass
+
+TARGET_REGION = "il-central-1"
+
+# Service groups used by the rules; names follow the component_type values in architectures.json
+BATCH_COMPUTE_TYPES = frozenset({"AmazonEC2", "AmazonEKS", "AmazonECS", "AWSBatch", "AWSFargate", "AWSLambda",
+                                 "AmazonEMR", "AWSGlue"})
+ANALYTICS_TYPES = frozenset({"AmazonAthena", "AmazonRedshift", "AmazonEMR", "AWSGlue", "AmazonQuickSight",
+                             "AmazonOpenSearchService", "AmazonKinesis", "AmazonKinesisFirehose"})
+RELATIONAL_TYPES = frozenset({"AmazonRDS", "AmazonAurora", "AmazonRedshift"})
+STORAGE_TYPES = frozenset({"AmazonS3", "AmazonEFS", "AmazonDynamoDB"})
+SCHEDULING_TYPES = frozenset({"AmazonEventBridge", "AWSStepFunctions", "AmazonCloudWatch", "AmazonMWAA"})
+SERVERLESS_TYPES = frozenset({"AWSLambda", "AWSFargate", "AmazonAthena", "AWSGlue", "AmazonDynamoDB",
+                              "AmazonAurora"})
+ELASTIC_TYPES = frozenset({"AmazonEKS", "AmazonECS", "AmazonEMR"})
+
+# Pricing terms beyond on-demand that give future cost flexibility
+FLEXIBLE_PRICING_TERMS = ("spot", "reserved", "savings")
+
+REGION_KEYS = ("region", "region code", "region_code")
+
+PRESCORE_TOP_K = 50
+# Candidates whose preliminary overall score is within this margin of the top-k cutoff are ambiguous
+PRESCORE_MARGIN = 0.25
+# Candidates with less evidence than this (see PreScore.confidence) always go to the LLM
+PRESCORE_MIN_CONFIDENCE = 0.5
+
+
+@dataclass
+class PreScore:
+    """Rule-based preliminary ratings (1-5) and how much of the architecture the rules could see."""
+
+    regional_availability: float
+    operational_fit: float
+    future_cost_flexibility: float
+    confidence: float
+
+    @property
+    def overall(self):
+        return round((self.regional_availability + self.operational_fit + self.future_cost_flexibility) / 3, 2)
+
+    def to_dict(self):
+        return {
+            "regional_availability": self.regional_availability,
+            "operational_fit": self.operational_fit,
+            "future_cost_flexibility": self.future_cost_flexibility,
+            "overall": self.overall
+        }
+
+
+def _component_hints(component):
+    """Returns (regions, has_flexible_pricing, has_pricing) read from a component's config and pricing."""
+    regions = set()
+    flexible = False
+    config = component.get("component_resource_config") or {}
+    for attributes in config.get("attributes") or ():
+        for key in REGION_KEYS:
+            region = attributes.get(key)
+            if region:
+                regions.add(region)
+        termtype = attributes.get("termtype")
+        if termtype and termtype != "OnDemand":
+            flexible = True
+
+    pricing = component.get("component_pricing") or {}
+    for term in pricing:
+        if any(flexible_term in term.lower() for flexible_term in FLEXIBLE_PRICING_TERMS):
+            flexible = True
+    return regions, flexible, bool(pricing)
+
+
+def prescore_architecture(architecture, target_region=TARGET_REGION):
+    """
+    Scores an architecture against the SYSTEM_PROMPT criteria with fixed rules, without calling the LLM.
+
+    - Regional availability: share of region-tagged components deployed in the target region, and a
+      penalty for non-AWS components.
+    - Operational fit: points for batch compute, a relational store, analytics or bulk storage and
+      scheduling/monitoring.
+    - Future cost flexibility: points for serverless and elastic services and for spot/reserved terms.
+
+    Args:
+        architecture (dict): One entry of the architectures.json "architectures" array.
+        target_region (str): The region the company operates in.
+
+    Returns:
+        PreScore: Ratings between 1 and 5 and a 0-1 confidence (the share of components with region
+                  or pricing data).
+    """
+    components = architecture.get("components") or ()
+    types = set()
+    in_region = out_of_region = non_aws = informative = 0
+    flexible_pricing = False
+    for component in components:
+        component_type = component.get("component_type")
+        if component_type:
+            types.add(component_type)
+        provider = component.get("component_provider")
+        if provider and provider.lower() != "aws":
+            non_aws += 1
+        regions, flexible, has_pricing = _component_hints(component)
+        flexible_pricing = flexible_pricing or flexible
+        if regions:
+            if target_region in regions:
+                in_region += 1
+            else:
+                out_of_region += 1
+        if regions or has_pricing:
+            informative += 1
+
+    tagged = in_region + out_of_region
+    regional = 1 + 4 * (in_region / tagged) if tagged else 3.0
+    if non_aws:
+        regional -= 1
+
+    operational = 1.0
+    if types & BATCH_COMPUTE_TYPES:
+        operational += 1.5
+    if types & RELATIONAL_TYPES:
+        operational += 1.5
+    if types & ANALYTICS_TYPES:
+        operational += 1.0
+    elif types & STORAGE_TYPES:
+        operational += 0.5
+    if types & SCHEDULING_TYPES:
+        operational += 0.5
+
+    flexibility = 1.0
+    if types & SERVERLESS_TYPES:
+        flexibility += 2.0
+    if types & ELASTIC_TYPES:
+        flexibility += 0.5
+    if flexible_pricing:
+        flexibility += 1.5
+
+    return PreScore(
+        regional_availability=round(min(max(regional, 1.0), 5.0), 2),
+        operational_fit=min(operational, 5.0),
+        future_cost_flexibility=min(flexibility, 5.0),
+        confidence=informative / len(components) if components else 0.0
+    )
+
+
+def prescore_cutoff(prescores, top_k=PRESCORE_TOP_K):
+    """
+    Returns the preliminary overall score of the k-th best candidate, or None if there are at most k.
+
+    Consumes the scores one at a time and keeps only the best k in memory.
+    """
+    best = heapq.nlargest(top_k + 1, (prescore.overall for prescore in prescores))
+    return best[top_k - 1] if len(best) > top_k else None
+
+
+def needs_llm(prescore, cutoff, margin=PRESCORE_MARGIN, min_confidence=PRESCORE_MIN_CONFIDENCE):
+    """
+    Decides whether a candidate is worth an LLM call.
+
+    Candidates in the top k (at or above `cutoff`), within `margin` below it, or with too little
+    data for the rules to be trusted are sent; the rest keep their preliminary score.
+    """
+    return cutoff is None or prescore.overall >= cutoff - margin or prescore.confidence < min_confidence
@@ -0,0 +1,251 @@
+import sqlite3
+import threading
+import time
+from itertools import islice
+
+from api.scoring import RESULT_KEYS
+from utils.config import get_env_variable
+
+RANKING_STORE_PATH = "rankings.sqlite"
+UPSERT_BATCH_SIZE = 1000
+
+RANKING_CRITERIA = RESULT_KEYS
+
+# rank_tier puts LLM-scored architectures above rule-based preliminary scores, matching rank_architectures
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rankings (
+        architecture_id TEXT PRIMARY KEY,
+        workplan_id TEXT,
+        regional_availability NUMERIC,
+        operational_fit NUMERIC,
+        future_cost_flexibility NUMERIC,
+        overall REAL,
+        rank_tier INTEGER NOT NULL,
+        scored_by TEXT,
+        duplicate_of TEXT,
+        error TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS rankings_overall ON rankings (rank_tier DESC, overall DESC, architecture_id);
+    CREATE INDEX IF NOT EXISTS rankings_workplan ON rankings (workplan_id, rank_tier DESC, overall DESC, architecture_id);
+    CREATE INDEX IF NOT EXISTS rankings_regional ON rankings (rank_tier DESC, regional_availability DESC, architecture_id);
+    CREATE INDEX IF NOT EXISTS rankings_operational ON rankings (rank_tier DESC, operational_fit DESC, architecture_id);
+    CREATE INDEX IF NOT EXISTS rankings_flexibility
+        ON rankings (rank_tier DESC, future_cost_flexibility DESC, architecture_id);
+"""
+
+# Rows are only rewritten when something other than the timestamp changed. A failed evaluation
+# (error set) or a preliminary score from a lower tier never replaces a stored score; either is
+# only recorded for architectures without one.
+_UPSERT = """
+    INSERT INTO rankings (architecture_id, workplan_id, regional_availability, operational_fit,
+                          future_cost_flexibility, overall, rank_tier, scored_by, duplicate_of, error, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (architecture_id) DO UPDATE SET
+        workplan_id = excluded.workplan_id,
+        regional_availability = excluded.regional_availability,
+        operational_fit = excluded.operational_fit,
+        future_cost_flexibility = excluded.future_cost_flexibility,
+        overall = excluded.overall,
+        rank_tier = excluded.rank_tier,
+        scored_by = excluded.scored_by,
+        duplicate_of = excluded.duplicate_of,
+        error = excluded.error,
+        updated_at = excluded.updated_at
+    WHERE (rankings.overall IS NULL OR (excluded.error IS NULL AND excluded.rank_tier >= rankings.rank_tier))
+      AND (workplan_id IS NOT excluded.workplan_id
+           OR regional_availability IS NOT excluded.regional_availability
+           OR operational_fit IS NOT excluded.operational_fit
+           OR future_cost_flexibility IS NOT excluded.future_cost_flexibility
+           OR overall IS NOT excluded.overall
+           OR rank_tier IS NOT excluded.rank_tier
+           OR scored_by IS NOT excluded.scored_by
+           OR duplicate_of IS NOT excluded.duplicate_of
+           OR error IS NOT excluded.error)
+"""
+
+_COLUMNS = ("architecture_id", "workplan_id") + RESULT_KEYS + ("scored_by", "duplicate_of", "error", "updated_at")
+
+
+def _row(result, now):
+    scored_by = result.get("scored_by", "llm")
+    return (
+        result["Architecture"],
+        result.get("Workplan"),
+        *(result.get(key) for key in RESULT_KEYS),
+        0 if scored_by == "prescore" else 1,
+        scored_by,
+        result.get("duplicate_of"),
+        result.get("Error"),
+        now
+    )
+
+
+class RankingStore:
+    """
+    Evaluation results persisted in SQLite across runs, indexed for leaderboard queries.
+
+    Each architecture ID has one row holding its latest scores. Leaderboards are read straight off
+    the (tier, score) indexes, so a top-k query touches k rows however many architectures are stored.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = get_env_variable("RANKING_STORE_PATH", RANKING_STORE_PATH)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.executescript(_SCHEMA)
+
+    def upsert(self, results):
+        """
+        Inserts new results and updates changed ones, committing every UPSERT_BATCH_SIZE rows.
+
+        A result with an 'Error' does not overwrite an architecture that already has a stored overall
+        score, so one failed run (open circuit, exhausted retries, unreadable reply) keeps the leaderboard.
+        Likewise a pre-scored result does not replace a stored LLM score.
+
+        Args:
+            results: Iterable of evaluation result dictionaries; consumed one chunk at a time.
+
+        Returns:
+            int: The number of rows inserted or changed.
+        """
+        changed = 0
+        results = iter(results)
+        while True:
+            chunk = list(islice(results, UPSERT_BATCH_SIZE))
+            if not chunk:
+                return changed
+            now = time.time()
+            with self._lock, self._connection:
+                before = self._connection.total_changes
+                self._connection.executemany(_UPSERT, [_row(result, now) for result in chunk])
+                changed += self._connection.total_changes - before
+
+    def record(self, results):
+        """Stores results as they stream past and yields them unchanged."""
+        results = iter(results)
+        while True:
+            chunk = list(islice(results, UPSERT_BATCH_SIZE))
+            if not chunk:
+                return
+            self.upsert(chunk)
+            yield from chunk
+
+    def top(self, k=10, criterion="overall", workplan_id=None):
+        """
+        Returns the best stored architectures by one criterion.
+
+        Architectures without a score for the criterion are left out. LLM-scored architectures rank
+        above pre-scored ones and ties are broken by architecture ID.
+
+        Args:
+            k (int, optional): Number of rows to return; None returns every scored architecture.
+            criterion (str): 'overall' or one of the three rating keys.
+            workplan_id (str, optional): Only consider architectures of this workplan.
+
+        Returns:
+            list: Result dictionaries with 'Architecture', 'Workplan', the score keys, 'scored_by',
+                  'duplicate_of' and 'Error', best first.
+
+        Raises:
+            ValueError: If the criterion is unknown.
+        """
+        if criterion not in RANKING_CRITERIA:
+            raise ValueError(f"Unknown criterion '{criterion}'. Expected one of {', '.join(RANKING_CRITERIA)}")
+        query = f"SELECT {', '.join(_COLUMNS)} FROM rankings WHERE {criterion} IS NOT NULL"
+        params = []
+        if workplan_id is not None:
+            query += " AND workplan_id = ?"
+            params.append(workplan_id)
+        query += f" ORDER BY rank_tier DESC, {criterion} DESC, architecture_id"
+        if k is not None:
+            query += " LIMIT ?"
+            params.append(k)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [self._result(row) for row in rows]
+
+    def rank(self, architecture_ids, criterion="overall", k=None):
+        """
+        Returns the stored results of the given architectures, best first.
+
+        Ordered like top(); architectures without a stored score for the criterion follow in the given order.
+        The IDs go into a temporary table that is joined on the primary key, so only those rows are read.
+
+        Args:
+            architecture_ids: Iterable of architecture IDs, e.g. the ones evaluated in this run.
+            criterion (str): 'overall' or one of the three rating keys.
+            k (int, optional): Number of rows to return; None returns all of them.
+
+        Returns:
+            list: Result dictionaries as returned by top().
+
+        Raises:
+            ValueError: If the criterion is unknown.
+        """
+        if criterion not in RANKING_CRITERIA:
+            raise ValueError(f"Unknown criterion '{criterion}'. Expected one of {', '.join(RANKING_CRITERIA)}")
+        # Consumed before taking the lock: the IDs may come from record(), which upserts as it goes
+        wanted = list(dict.fromkeys(architecture_ids))
+        limit = -1 if k is None else k
+        # Scored rows are read in (tier, score) index order and stop after k matches; the rest follow
+        # in the given order, joined on the primary key
+        scored_query = (f"SELECT {', '.join(_COLUMNS)} FROM rankings "
+                        f"WHERE {criterion} IS NOT NULL AND architecture_id IN (SELECT architecture_id FROM rank_ids) "
+                        f"ORDER BY rank_tier DESC, {criterion} DESC, architecture_id LIMIT ?")
+        unscored_query = (f"SELECT w.architecture_id AS wanted_id, {', '.join('r.' + column for column in _COLUMNS)} "
+                          f"FROM rank_ids w LEFT JOIN rankings r ON r.architecture_id = w.architecture_id "
+                          f"WHERE r.{criterion} IS NULL ORDER BY w.position LIMIT ?")
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS rank_ids (position INTEGER PRIMARY KEY, architecture_id TEXT)")
+            self._connection.execute("DELETE FROM rank_ids")
+            self._connection.executemany("INSERT INTO rank_ids VALUES (?, ?)", enumerate(wanted))
+            ranked = [self._result(row) for row in self._connection.execute(scored_query, (limit,))]
+            if k is None or len(ranked) < k:
+                rest = self._connection.execute(unscored_query, (-1 if k is None else k - len(ranked),))
+                ranked.extend(self._result(row) if row["updated_at"] is not None
+                              else {"Architecture": row["wanted_id"], criterion: None} for row in rest)
+            self._connection.execute("DELETE FROM rank_ids")
+        return ranked
+
+    def get(self, architecture_id):
+        with self._lock:
+            row = self._connection.execute(f"SELECT {', '.join(_COLUMNS)} FROM rankings WHERE architecture_id = ?",
+                                           (architecture_id,)).fetchone()
+        return self._result(row) if row is not None else None
+
+    def count(self, workplan_id=None, scored_only=False):
+        query = "SELECT COUNT(*) FROM rankings WHERE 1 = 1"
+        params = []
+        if workplan_id is not None:
+            query += " AND workplan_id = ?"
+            params.append(workplan_id)
+        if scored_only:
+            query += " AND overall IS NOT NULL"
+        with self._lock:
+            return self._connection.execute(query, params).fetchone()[0]
+
+    def workplans(self):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT workplan_id FROM rankings WHERE workplan_id IS NOT NULL ORDER BY workplan_id")
+            return [row[0] for row in rows]
+
+    @staticmethod
+    def _result(row):
+        return {
+            "Architecture": row["architecture_id"],
+            "Workplan": row["workplan_id"],
+            **{key: row[key] for key in RESULT_KEYS},
+            "scored_by": row["scored_by"],
+            "duplicate_of": row["duplicate_of"],
+            "Error": row["error"]
+        }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,79 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_minute` tokens per minute.
+
+    The bucket starts full and holds at most `capacity` tokens (one minute's worth by default),
+    so short bursts up to the capacity go through immediately and the long-run rate is capped.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount=1, timeout=None):
+        """
+        Blocks until `amount` tokens are available and takes them.
+
+        Requests larger than the capacity are clamped to it, so one oversized request waits for
+        a full bucket instead of blocking forever.
+
+        Args:
+            amount (float): Number of tokens to take.
+            timeout (float, optional): Give up after this many seconds.
+
+        Returns:
+            bool: True once the tokens were taken, False if the timeout expired first.
+        """
+        amount = min(float(amount), self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return True
+                wait = (amount - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """
+    Combined requests-per-minute and tokens-per-minute limit, as enforced by LLM providers.
+
+    Either limit may be None to leave that dimension unbounded.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, tokens=0):
+        """Blocks until one request slot and `tokens` tokens of budget are available."""
+        if self.requests is not None:
+            self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            self.tokens.acquire(tokens)
+
+
+def estimate_tokens(text):
+    """Rough token count for rate-limit budgeting (about four characters per token for English text)."""
+    return max(1, len(text) // 4)
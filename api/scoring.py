@@ -0,0 +1,205 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+SCORE_KEYS = ("regional_availability", "operational_fit", "future_cost_flexibility")
+RESULT_KEYS = SCORE_KEYS + ("overall",)
+
+# JSON schema sent as response_format in structured-output mode
+SCORE_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "regional_availability": {"type": "integer", "minimum": 1, "maximum": 5},
+        "operational_fit": {"type": "integer", "minimum": 1, "maximum": 5},
+        "future_cost_flexibility": {"type": "integer", "minimum": 1, "maximum": 5},
+        "overall": {"type": "number", "minimum": 1, "maximum": 5},
+        "reasoning": {"type": "string"}
+    },
+    "required": ["regional_availability", "operational_fit", "future_cost_flexibility", "overall", "reasoning"],
+    "additionalProperties": False
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "architecture_scores", "strict": True, "schema": SCORE_JSON_SCHEMA}
+}
+
+# Fallback text parser. A single alternation scanned left to right with finditer: a criterion name
+# used as a header opens a section for that criterion, and an explicit "Rating:"/"Score:" or "N/5"
+# in the section wins over a number right after the name. A name is a header when it starts a line
+# (after optional numbering or markdown) or is followed by ":", "-" or "rating"/"score"; mentions in
+# prose such as "Overall, most services..." are skipped. Rubric ranges such as "(1-5)" and counts
+# such as "2 of the 5" are not ratings. There are no nested or unbounded quantifiers, and the header
+# checks look at a bounded window around each name, so the scan is linear in the length.
+_CRITERIA_NAMES = {
+    "regional availability": "regional_availability",
+    "operational fit": "operational_fit",
+    "future cost flexibility": "future_cost_flexibility",
+    "cost flexibility": "future_cost_flexibility",
+    "overall": "overall",
+}
+_RUBRIC = r"(?:\s*\(\s*[0-5]\s*(?:-|–|to)\s*[0-5]\s*\))?"
+_RATING_NUMBER = r"[0-5](?:\.\d+)?\b(?!\s*(?:-|–|to)\s*\d|\s*of\b)"
+_SCORE_TOKEN_RE = re.compile(
+    r"(?P<criterion>regional availability|operational fit|future cost flexibility|cost flexibility|overall)"
+    + _RUBRIC + r"(?:[\s:*\-–]{1,6}(?P<direct>" + _RATING_NUMBER + r"))?"
+    r"|(?:rating|score)" + _RUBRIC + r"[\s:*=]{0,4}(?P<rating>" + _RATING_NUMBER + r")"
+    r"|(?P<fraction>\b[0-5](?:\.\d+)?)\s*(?:/|out of)\s*5\b",
+    re.IGNORECASE
+)
+# Longest line prefix before a header name: indentation, "##", "- ", "3. ", "(b) ", "**"
+_HEADER_LEAD_WINDOW = 16
+_HEADER_LEAD_RE = re.compile(r"[ \t>]*(?:#{1,6}[ \t]*|[-*•+][ \t]+|\(?(?:\d{1,2}|[a-z])[.)][ \t]*)?[*_]{0,2}[ \t]*",
+                             re.IGNORECASE)
+_HEADER_TAIL_RE = re.compile(r"[*_]{0,2}" + _RUBRIC + r"[ \t*_]{0,4}(?::|-|–|(?:rating|score)\b)", re.IGNORECASE)
+
+
+@dataclass
+class ArchitectureScores:
+    """Validated ratings for one architecture; each criterion is 1-5 or None if it could not be read."""
+
+    regional_availability: Optional[int] = None
+    operational_fit: Optional[int] = None
+    future_cost_flexibility: Optional[int] = None
+    overall: Optional[float] = None
+    reasoning: Optional[str] = None
+
+    def __post_init__(self):
+        # Derive the overall score from the three criteria when the model did not give one
+        if self.overall is None:
+            individual_scores = [getattr(self, key) for key in SCORE_KEYS]
+            if all(score is not None for score in individual_scores):
+                self.overall = round(sum(individual_scores) / len(SCORE_KEYS), 2)
+
+    @property
+    def is_empty(self):
+        return all(getattr(self, key) is None for key in RESULT_KEYS)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a score record from a decoded JSON object, dropping values of the wrong type or out of range.
+
+        Raises:
+            ValueError: If `data` is not a JSON object.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object of scores, got {type(data).__name__}")
+        values = {}
+        for key in SCORE_KEYS:
+            value = data.get(key)
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool) and 1 <= value <= 5
+            values[key] = int(round(value)) if valid else None
+        overall = data.get("overall")
+        if isinstance(overall, (int, float)) and not isinstance(overall, bool) and 0 <= overall <= 5:
+            values["overall"] = float(overall)
+        reasoning = data.get("reasoning")
+        values["reasoning"] = reasoning if isinstance(reasoning, str) else None
+        return cls(**values)
+
+    def to_dict(self):
+        """Returns the score keys used in evaluation results (reasoning is left out)."""
+        return {key: getattr(self, key) for key in RESULT_KEYS}
+
+
+def extract_json_object(text):
+    """Decodes the outermost JSON object in a reply, tolerating code fences and surrounding prose."""
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+
+
+def parse_structured_scores(response_text):
+    """
+    Parses a structured-output reply into a score record.
+
+    Returns:
+        ArchitectureScores: The validated scores, or None if the reply is not a usable JSON object.
+    """
+    data = extract_json_object(response_text)
+    if not isinstance(data, dict):
+        return None
+    scores = ArchitectureScores.from_dict(data)
+    return None if scores.is_empty else scores
+
+
+def _store_rating(values, criterion, number):
+    # The first rating found for each criterion wins; criteria other than overall must be 1-5
+    if criterion is None or number is None or criterion in values:
+        return
+    value = float(number)
+    if criterion == "overall":
+        values[criterion] = value
+    elif 1 <= value <= 5:
+        values[criterion] = int(round(value))
+
+
+def _is_header(text, match):
+    """True if the criterion name in `match` heads a section rather than appearing in prose."""
+    start = match.start("criterion")
+    window_start = max(0, start - _HEADER_LEAD_WINDOW - 1)
+    line_start = text.rfind("\n", window_start, start) + 1
+    if (line_start or window_start == 0) and _HEADER_LEAD_RE.fullmatch(text, line_start, start):
+        return True
+    return _HEADER_TAIL_RE.match(text, match.end("criterion")) is not None
+
+
+def parse_text_scores(response_text):
+    """
+    Reads the ratings out of a free-text reply in one linear scan.
+
+    Handles "Regional Availability - Rating: 4", "**Operational Fit:** 3/5", "Overall Score: 4.3",
+    "Regional Availability (1-5): 4" and similar wordings. Within a criterion's section an explicit
+    rating ("Rating: 3", "3/5") is preferred over a number right after the criterion name. Criterion
+    names mentioned in the middle of a sentence do not start a new section.
+
+    Returns:
+        ArchitectureScores: The scores found; missing criteria are None.
+    """
+    values = {}
+    current = direct = None
+    for match in _SCORE_TOKEN_RE.finditer(response_text):
+        criterion = match.group("criterion")
+        if criterion is not None:
+            if not _is_header(response_text, match):
+                continue
+            # The previous section ended without an explicit rating
+            _store_rating(values, current, direct)
+            current = _CRITERIA_NAMES[criterion.lower()]
+            direct = match.group("direct")
+            continue
+        if current is None:
+            continue
+        _store_rating(values, current, match.group("rating") or match.group("fraction"))
+        current = direct = None
+    _store_rating(values, current, direct)
+    return ArchitectureScores(**values)
+
+
+def extract_scores_from_llm_output(response_text):
+    """
+        Extracts numerical evaluation scores from the LLM-generated response text.
+
+        A JSON reply (structured-output mode) is validated against the score schema; anything else
+        goes through the precompiled text parser.
+
+        Args:
+            response_text (str): The raw response returned by the LLM.
+
+        Returns:
+            dict: A dictionary containing scores for:
+                  - 'regional_availability'
+                  - 'operational_fit'
+                  - 'future_cost_flexibility'
+                  - 'overall' (explicit or calculated average)
+                  Each value is a number (int or float) or None if not found.
+    """
+    scores = parse_structured_scores(response_text)
+    if scores is None:
+        scores = parse_text_scores(response_text)
+    return scores.to_dict()
@@ -0,0 +1,131 @@
+import json
+
+READ_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",:]}"
+
+
+class _JsonStreamReader:
+    """
+    Minimal incremental JSON reader over a text file.
+
+    Holds only the unread tail of the file plus whatever is needed to decode the next value,
+    so memory stays proportional to the largest single value rather than to the file.
+    """
+
+    def __init__(self, f, chunk_size=READ_CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_size=None):
+        if self._eof:
+            return False
+        if self._pos > self._chunk_size:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        chunk = self._file.read(max(self._chunk_size, min_size or 0))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer += chunk
+        return True
+
+    def peek(self):
+        """Skips whitespace and returns the next character, or '' at end of file."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at offset {self._pos} but found '{found or 'end of file'}'")
+        self._pos += 1
+
+    def value(self):
+        """Decodes the next complete JSON value, reading more of the file as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number cut off by the end of the buffer ("2." of "2.5") decodes as a shorter
+                # one, so only accept a value once the delimiter that follows it has been read
+                if (end < len(self._buffer) and self._buffer[end] in _DELIMITERS) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # Grow geometrically so a value much larger than the chunk size is not re-parsed too often
+            self._fill(len(self._buffer) - self._pos)
+
+
+def iter_json_array(path, key, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yields the elements of the array stored under a top-level key of a JSON object, one at a time.
+
+    Other top-level keys are decoded and discarded as they are passed.
+
+    Args:
+        path (str): JSON file whose root is an object.
+        key (str): The top-level key holding the array.
+        chunk_size (int): Characters read from the file at a time.
+
+    Raises:
+        ValueError: If the file is not an object with an array under `key`.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _JsonStreamReader(f, chunk_size)
+        reader.expect("{")
+        while reader.peek() != "}":
+            name = reader.value()
+            reader.expect(":")
+            if name != key:
+                reader.value()
+            else:
+                reader.expect("[")
+                if reader.peek() == "]":
+                    return
+                while True:
+                    yield reader.value()
+                    if reader.peek() == "]":
+                        return
+                    reader.expect(",")
+            if reader.peek() != "}":
+                reader.expect(",")
+    raise ValueError(f"No '{key}' array found in {path}")
+
+
+def iter_architectures(path, chunk_size=READ_CHUNK_SIZE):
+    """Yields architecture definitions from an architectures JSON file without loading the whole file."""
+    return iter_json_array(path, "architectures", chunk_size)
+
+
+def write_jsonl(records, path):
+    """
+    Writes each record to a JSON Lines file as it arrives and passes it through.
+
+    The file is flushed after every record so partial results survive an interrupted run.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            yield record
+
+
+def read_jsonl(path):
+    """Yields the records of a JSON Lines file one at a time."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
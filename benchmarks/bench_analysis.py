@@ -0,0 +1,339 @@
+"""
+Benchmark harness for the database analysis engine.
+
+Builds synthetic pricing-like tables (configurable rows, columns, null density and cross-table
+value overlap) in a throwaway SQLite file or any database given by URL, runs each analysis
+phase at several sizes and records wall time, query count and peak Python memory to JSON.
+Results can be compared against a stored baseline to catch performance regressions.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_analysis --sizes 1000x20,10000x50 --output bench_results.json
+    python -m benchmarks.bench_analysis --baseline bench_baseline.json
+    python -m benchmarks.bench_analysis --workers 1,2,4 --tables 8
+    python -m benchmarks.bench_analysis --url postgresql+psycopg2://user:pw@localhost/bench
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import Column, Float, MetaData, Table, Text, event
+
+from database.catalog import get_schema_catalog, invalidate_schema_catalog
+from database.connection import configure_db_engine, get_db_engine, session_scope
+from database.profiler import profile_tables
+from database.queries import (comprehensive_table_analysis, find_duplicate_columns_enhanced,
+                              identify_redundant_columns, ANALYSIS_MAX_WORKERS)
+
+DEFAULT_SIZES = "1000x20,10000x50"
+DEFAULT_TABLES = 4
+DEFAULT_NULL_DENSITY = 0.3
+DEFAULT_OVERLAP = 0.4
+DEFAULT_TOLERANCE = 0.25
+INSERT_BATCH_SIZE = 5000
+
+REGIONS = ["il-central-1", "us-east-1", "us-west-2", "eu-west-1", "eu-central-1", "ap-south-1",
+           "ap-northeast-1", "sa-east-1", "ca-central-1", "me-south-1", "af-south-1", "eu-north-1"]
+INSTANCE_TYPES = [f"{family}.{size}" for family in ("m5", "c5", "r5", "t3", "g5")
+                  for size in ("large", "xlarge", "2xlarge", "4xlarge")]
+
+
+def parse_sizes(sizes):
+    """Parses "ROWSxCOLUMNS,..." into a list of (rows, columns) tuples."""
+    parsed = []
+    for size in sizes.split(","):
+        rows, columns = size.lower().split("x")
+        parsed.append((int(rows), max(int(columns), 4)))
+    return parsed
+
+
+def parse_workers(workers):
+    """Parses "1,2,4" into a tuple of worker counts."""
+    return tuple(int(count) for count in workers.split(","))
+
+
+def _column_domains(table_idx, n_columns, null_density, overlap, rng):
+    """Assigns each filler column a value domain; overlapping columns share a domain across tables."""
+    domains = []
+    for col_idx in range(n_columns):
+        if rng.random() < overlap:
+            name = f"shared_{col_idx}"
+        else:
+            name = f"t{table_idx}_c{col_idx}"
+        cardinality = rng.choice([2, 10, 100, 1000, 10000])
+        # A few columns are entirely NULL; the rest average `null_density`
+        null_rate = 1.0 if rng.random() < 0.05 else min(1.0, rng.random() * 2 * null_density)
+        domains.append((name, cardinality, null_rate))
+    return domains
+
+
+def create_synthetic_tables(engine, n_tables, n_rows, n_columns, null_density=DEFAULT_NULL_DENSITY,
+                            overlap=DEFAULT_OVERLAP, seed=42):
+    """
+    Creates `n_tables` pricing-like tables with `n_rows` rows and `n_columns` columns each.
+
+    Every table has sku, region, instance_type and priceperunit columns followed by filler
+    attribute columns. `null_density` scales the per-column NULL rate and `overlap` is the
+    probability that a filler column draws from a value domain shared with the other tables.
+
+    Returns:
+        list: The names of the created tables.
+    """
+    rng = random.Random(seed)
+    metadata = MetaData()
+    tables = []
+    for table_idx in range(n_tables):
+        columns = [Column("sku", Text), Column("region", Text), Column("instance_type", Text),
+                   Column("priceperunit", Float)]
+        columns += [Column(f"attr_{col_idx}", Text) for col_idx in range(n_columns - 4)]
+        tables.append(Table(f"bench_table_{table_idx}", metadata, *columns))
+
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    for table_idx, table in enumerate(tables):
+        domains = _column_domains(table_idx, n_columns - 4, null_density, overlap, rng)
+        batch = []
+        with engine.begin() as connection:
+            for row_idx in range(n_rows):
+                row = {
+                    "sku": f"SKU{table_idx}-{row_idx:08d}",
+                    "region": rng.choice(REGIONS),
+                    "instance_type": rng.choice(INSTANCE_TYPES),
+                    "priceperunit": round(rng.random() * 5, 5),
+                }
+                for col_idx, (domain, cardinality, null_rate) in enumerate(domains):
+                    if rng.random() < null_rate:
+                        row[f"attr_{col_idx}"] = None
+                    else:
+                        row[f"attr_{col_idx}"] = f"{domain}-{rng.randrange(cardinality)}"
+                batch.append(row)
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    connection.execute(table.insert(), batch)
+                    batch = []
+            if batch:
+                connection.execute(table.insert(), batch)
+
+    return [table.name for table in tables]
+
+
+class QueryCounter:
+    """Counts statements executed on an engine via the before_cursor_execute event."""
+
+    def __init__(self, engine):
+        self.count = 0
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def remove(self):
+        event.remove(self._engine, "before_cursor_execute", self._on_execute)
+
+
+def _phases(tables, cache_path, workers=(ANALYSIS_MAX_WORKERS,)):
+    """
+    Returns the analysis phases to measure as (name, callable) pairs.
+
+    comprehensive_table_analysis is measured once per worker count; with more than one count the
+    phase names carry the count, e.g. "comprehensive_table_analysis[4w]".
+    """
+
+    def all_table_columns():
+        catalog = get_schema_catalog()
+        return {table: catalog.get_columns(table) for table in tables}
+
+    def run_profile():
+        with session_scope() as session:
+            profile_tables(session, tables, all_table_columns())
+
+    def run_redundant():
+        with session_scope() as session:
+            identify_redundant_columns(tables, all_table_columns(), session)
+
+    def run_duplicates():
+        with session_scope() as session:
+            find_duplicate_columns_enhanced(tables, all_table_columns(), session)
+
+    def run_comprehensive(max_workers):
+        return lambda: comprehensive_table_analysis(tables, force=True, cache_path=cache_path,
+                                                    max_workers=max_workers)
+
+    phases = [
+        ("profile_tables", run_profile),
+        ("identify_redundant_columns", run_redundant),
+        ("find_duplicate_columns_enhanced", run_duplicates),
+    ]
+    for max_workers in workers:
+        name = "comprehensive_table_analysis" if len(workers) == 1 else f"comprehensive_table_analysis[{max_workers}w]"
+        phases.append((name, run_comprehensive(max_workers)))
+    return phases
+
+
+def measure_phase(func, repeat=3):
+    """
+    Runs a phase `repeat` times for timing (keeping the fastest) and once more under tracemalloc.
+
+    Memory is traced in a separate run because tracemalloc slows allocation-heavy code down.
+
+    Returns:
+        dict: wall_time_s, queries and peak_memory_mb.
+    """
+    counter = QueryCounter(get_db_engine())
+    try:
+        timings = []
+        queries = 0
+        for _ in range(max(repeat, 1)):
+            counter.count = 0
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+            timings.append(time.perf_counter() - start)
+            queries = counter.count
+    finally:
+        counter.remove()
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_time_s": round(min(timings), 4),
+        "queries": queries,
+        "peak_memory_mb": round(peak / (1024 * 1024), 2),
+    }
+
+
+def run_benchmarks(url, sizes, n_tables=DEFAULT_TABLES, null_density=DEFAULT_NULL_DENSITY,
+                   overlap=DEFAULT_OVERLAP, repeat=3, workers=(ANALYSIS_MAX_WORKERS,)):
+    """
+    Builds synthetic tables at each size and measures every analysis phase.
+
+    Args:
+        url (str): Database URL the synthetic tables are created in.
+        sizes (list): (rows, columns) tuples.
+        n_tables (int): Number of tables per size.
+        null_density (float): Scales the per-column NULL rate.
+        overlap (float): Probability that a column shares its value domain across tables.
+        repeat (int): Timed runs per phase; the fastest is kept.
+        workers (tuple): Worker counts to run comprehensive_table_analysis with.
+
+    Returns:
+        list: One result dictionary per (size, phase).
+    """
+    engine_options = {"connect_args": {"check_same_thread": False}} if url.startswith("sqlite") else {}
+    configure_db_engine(url, **engine_options)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, "analysis_cache.json")
+        for n_rows, n_columns in sizes:
+            label = f"{n_rows}x{n_columns}"
+            print(f"Building {n_tables} tables of {label}...")
+            tables = create_synthetic_tables(get_db_engine(), n_tables, n_rows, n_columns, null_density, overlap)
+            invalidate_schema_catalog()
+            get_schema_catalog()
+
+            for phase, func in _phases(tables, cache_path, workers):
+                measurement = measure_phase(func, repeat)
+                results.append({"size": label, "rows": n_rows, "columns": n_columns, "tables": n_tables,
+                                "phase": phase, **measurement})
+                print(f"  {phase:<34} {measurement['wall_time_s']:>9.3f}s {measurement['queries']:>7} queries "
+                      f"{measurement['peak_memory_mb']:>9.2f} MB")
+
+    configure_db_engine(None)
+    invalidate_schema_catalog()
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares benchmark results with a baseline run.
+
+    Wall time and peak memory regress when they exceed the baseline by more than `tolerance`
+    (a fraction); the query count is deterministic and regresses on any increase.
+
+    Returns:
+        list: Human-readable descriptions of every regression found.
+    """
+    baseline_index = {(entry["size"], entry["phase"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        reference = baseline_index.get((entry["size"], entry["phase"]))
+        if reference is None:
+            continue
+        key = f"{entry['phase']} @ {entry['size']}"
+        for metric in ("wall_time_s", "peak_memory_mb"):
+            if reference[metric] > 0 and entry[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(f"{key}: {metric} {entry[metric]} vs baseline {reference[metric]} "
+                                   f"(+{entry[metric] / reference[metric] - 1:.0%})")
+        if entry["queries"] > reference["queries"]:
+            regressions.append(f"{key}: queries {entry['queries']} vs baseline {reference['queries']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the database analysis engine on synthetic tables.")
+    parser.add_argument("--url", help="Database URL (default: a temporary SQLite file)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated ROWSxCOLUMNS sizes")
+    parser.add_argument("--tables", type=int, default=DEFAULT_TABLES, help="Tables per size")
+    parser.add_argument("--null-density", type=float, default=DEFAULT_NULL_DENSITY)
+    parser.add_argument("--overlap", type=float, default=DEFAULT_OVERLAP)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per phase (fastest is kept)")
+    parser.add_argument("--workers", default=str(ANALYSIS_MAX_WORKERS),
+                        help="Comma-separated worker counts for comprehensive_table_analysis")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the results JSON")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed fractional slowdown / memory growth before flagging a regression")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        url = args.url or f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        results = run_benchmarks(url, parse_sizes(args.sizes), args.tables, args.null_density,
+                                 args.overlap, args.repeat, parse_workers(args.workers))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "dialect": (args.url or "sqlite").split(":", 1)[0],
+            "null_density": args.null_density,
+            "overlap": args.overlap,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nPerformance regressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Load benchmark for the architecture ranking pipeline.
+
+Generates synthetic architecture files of several sizes from the templates in architectures.json,
+runs evaluate_all_architectures against a local mock OpenRouter endpoint (benchmarks.mock_openrouter)
+and records throughput, p50/p95/p99 request latency, retries and the parse-failure rate to JSON.
+Results can be compared against a stored baseline to catch regressions in the evaluation path.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_ranking --counts 100,1000 --latency-ms 200 --concurrency 8
+    python -m benchmarks.bench_ranking --error-rate 0.05 --burst-every 50 --burst-length 5 --malformed-rate 0.02
+    python -m benchmarks.bench_ranking --batch-size 8 --baseline bench_ranking_baseline.json
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from api import openrouter
+from api.scoring import SCORE_KEYS
+from benchmarks.mock_openrouter import MockOpenRouterServer, add_config_arguments, config_from_args
+
+DEFAULT_COUNTS = "100,1000"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TOLERANCE = 0.25
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "architectures.json")
+
+PARSE_FAILURE_ERROR = "No scores found"
+PERCENTILES = (50, 95, 99)
+
+
+def parse_counts(counts):
+    """Parses "100,1000" into a list of architecture counts."""
+    return [int(count) for count in counts.split(",")]
+
+
+def write_synthetic_architectures(path, count, duplicate_rate=0.0, seed=42, templates_path=TEMPLATES_PATH):
+    """
+    Writes `count` architectures built from the templates to an architectures JSON file.
+
+    Each architecture gets its own ID and a distinct component environment, so none of them share a
+    fingerprint, except for the `duplicate_rate` fraction that are relabelled copies of an earlier one.
+    """
+    with open(templates_path, "r", encoding="utf-8") as f:
+        templates = json.load(f)["architectures"]
+    rng = random.Random(seed)
+    unique = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"architectures": [')
+        for index in range(count):
+            if unique and rng.random() < duplicate_rate:
+                architecture = copy.deepcopy(rng.choice(unique))
+            else:
+                architecture = copy.deepcopy(templates[index % len(templates)])
+                for component in architecture.get("components") or []:
+                    component["component_environments"] = [f"bench-{index}"]
+                unique.append(architecture)
+            architecture["metadata"]["architecture_id"] = f"BENCH-{index:07d}"
+            f.write(("," if index else "") + json.dumps(architecture))
+        f.write("]}")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list, or None if it is empty."""
+    if not values:
+        return None
+    rank = max(int(round(pct / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def summarize(results, wall_time):
+    """
+    Reduces evaluation results to the benchmark metrics.
+
+    Latency percentiles cover the architectures scored through a request (duplicates and pre-scored
+    ones are left out); the parse-failure rate is the share of those whose reply had no readable rating
+    or was missing one of the criteria (the mock always rates all three).
+    """
+    evaluated = [result for result in results
+                 if result.get("duplicate_of") is None and result.get("scored_by") == "llm"]
+    latencies = sorted(result["latency"] for result in evaluated if result.get("latency"))
+    parse_failures = sum(1 for result in evaluated
+                         if (result.get("Error") or "").startswith(PARSE_FAILURE_ERROR)
+                         or (not result.get("Error") and any(result.get(key) is None for key in SCORE_KEYS)))
+    errors = sum(1 for result in evaluated if result.get("Error"))
+    summary = {
+        "architectures": len(results),
+        "wall_time_s": round(wall_time, 3),
+        "throughput_per_s": round(len(results) / wall_time, 2) if wall_time > 0 else None,
+        "evaluated": len(evaluated),
+        "errors": errors,
+        "parse_failures": parse_failures,
+        "parse_failure_rate": round(parse_failures / len(evaluated), 4) if evaluated else 0.0,
+        "retries": sum(result.get("retries") or 0 for result in evaluated),
+        "retried_architectures": sum(1 for result in evaluated if result.get("retries")),
+        "retry_delay_s": round(sum(result.get("retry_delay") or 0.0 for result in evaluated), 3),
+    }
+    for pct in PERCENTILES:
+        value = percentile(latencies, pct)
+        summary[f"latency_p{pct}_s"] = round(value, 4) if value is not None else None
+    return summary
+
+
+def run_benchmarks(counts, mock_config, concurrency=DEFAULT_CONCURRENCY, batch_size=1, structured_output=True,
+                   deduplicate=True, duplicate_rate=0.0, prescore_top_k=0):
+    """
+    Runs the ranking pipeline against a mock endpoint for each architecture count.
+
+    Client-side rate limiting and the response cache are disabled so the numbers reflect the
+    evaluation path itself.
+
+    Args:
+        counts (list): Architecture counts to benchmark.
+        mock_config (MockConfig): Latency, error and 429 behaviour of the mock endpoint.
+        concurrency (int): Requests in flight.
+        batch_size (int): Architectures per request.
+        structured_output (bool): Request JSON-schema replies.
+        deduplicate (bool): Skip architectures with an already seen fingerprint.
+        duplicate_rate (float): Share of generated architectures that are copies of earlier ones.
+        prescore_top_k (int): Pre-scorer cutoff; 0 sends everything to the LLM.
+
+    Returns:
+        list: One result dictionary per count, with the mock's own request counters under 'server'.
+    """
+    server = MockOpenRouterServer(mock_config).start()
+    # The module reads OPENROUTER_BASE_URL at import; point it at the mock for this run
+    original_url = openrouter.OPENROUTER_BASE_URL
+    openrouter.OPENROUTER_BASE_URL = server.url
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for count in counts:
+                path = os.path.join(tmp_dir, f"architectures_{count}.json")
+                write_synthetic_architectures(path, count, duplicate_rate, mock_config.seed)
+                server.reset_stats()
+
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    evaluated = openrouter.evaluate_all_architectures(
+                        path, max_concurrency=concurrency, requests_per_minute=None, tokens_per_minute=None,
+                        use_cache=False, batch_size=batch_size, structured_output=structured_output,
+                        deduplicate=deduplicate, prescore_top_k=prescore_top_k)
+                summary = summarize(evaluated, time.perf_counter() - start)
+                summary["server"] = server.stats.to_dict()
+                results.append(summary)
+
+                print(f"  {count:>8} architectures {summary['wall_time_s']:>9.3f}s "
+                      f"{summary['throughput_per_s'] or 0:>9.2f}/s  p50 {summary['latency_p50_s']}s "
+                      f"p95 {summary['latency_p95_s']}s p99 {summary['latency_p99_s']}s  "
+                      f"{summary['retries']} retries  {summary['parse_failure_rate']:.2%} parse failures")
+    finally:
+        openrouter.OPENROUTER_BASE_URL = original_url
+        server.stop()
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares benchmark results with a baseline run of the same counts.
+
+    Throughput regresses when it drops by more than `tolerance` (a fraction) and p95 latency when it
+    grows by more than `tolerance`; any rise in the parse-failure rate is reported.
+
+    Returns:
+        list: Human-readable descriptions of every regression found.
+    """
+    baseline_index = {entry["architectures"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        reference = baseline_index.get(entry["architectures"])
+        if reference is None:
+            continue
+        key = f"{entry['architectures']} architectures"
+        if reference["throughput_per_s"] and entry["throughput_per_s"] < reference["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {entry['throughput_per_s']}/s vs baseline "
+                               f"{reference['throughput_per_s']}/s")
+        if reference["latency_p95_s"] and entry["latency_p95_s"] and \
+                entry["latency_p95_s"] > reference["latency_p95_s"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 latency {entry['latency_p95_s']}s vs baseline {reference['latency_p95_s']}s")
+        if entry["parse_failure_rate"] > reference["parse_failure_rate"]:
+            regressions.append(f"{key}: parse-failure rate {entry['parse_failure_rate']} vs baseline "
+                               f"{reference['parse_failure_rate']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ranking pipeline against a mock OpenRouter endpoint.")
+    parser.add_argument("--counts", default=DEFAULT_COUNTS, help="Comma-separated architecture counts")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Requests in flight")
+    parser.add_argument("--batch-size", type=int, default=1, help="Architectures per request")
+    parser.add_argument("--text-output", action="store_true", help="Ask for free-text replies instead of JSON")
+    parser.add_argument("--no-dedup", action="store_true", help="Evaluate duplicate architectures again")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0,
+                        help="Share of generated architectures that copy an earlier one")
+    parser.add_argument("--prescore-top-k", type=int, default=0, help="Pre-scorer cutoff (0 disables it)")
+    add_config_arguments(parser)
+    parser.add_argument("--output", default="bench_ranking_results.json", help="Where to write the results JSON")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed fractional throughput drop / p95 growth before flagging a regression")
+    args = parser.parse_args(argv)
+
+    mock_config = config_from_args(args)
+    print(f"Ranking {args.counts} architectures against the mock endpoint...")
+    results = run_benchmarks(parse_counts(args.counts), mock_config, args.concurrency, args.batch_size,
+                             not args.text_output, not args.no_dedup, args.duplicate_rate, args.prescore_top_k)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": args.concurrency,
+            "batch_size": args.batch_size,
+            "structured_output": not args.text_output,
+            "mock": vars(mock_config),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nPerformance regressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
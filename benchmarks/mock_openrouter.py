@@ -0,0 +1,308 @@
+"""
+Local stand-in for the OpenRouter chat-completions endpoint.
+
+Answers the three prompt shapes the ranking pipeline sends: free-text ratings for the plain
+system prompt, a JSON object when a response_format is requested, and a JSON object keyed by
+architecture ID for batched prompts. Latency, server errors, 429 bursts and malformed replies
+are injected according to a MockConfig so throughput and retry behaviour can be measured
+without spending API credits.
+
+Usage (from the repository root):
+    python -m benchmarks.mock_openrouter --port 8765 --latency lognormal --latency-ms 800 --error-rate 0.02
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/v1/chat/completions python main.py
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+COMPLETIONS_PATH = "/v1/chat/completions"
+
+_ARCHITECTURE_ID_RE = re.compile(r"^### Architecture ID: (\S+)", re.MULTILINE)
+
+
+@dataclass
+class MockConfig:
+    """
+    Behaviour of the mock endpoint.
+
+    latency_ms is the fixed delay, the mean of a uniform delay (spread over +/- latency_spread) or the
+    median of a lognormal delay (latency_spread is then the sigma of the underlying normal).
+    Every burst_every requests, the next burst_length requests are answered with 429 and a
+    Retry-After of retry_after seconds. scores pins the canned ratings; when None each architecture
+    gets stable ratings derived from a hash of its prompt.
+    """
+
+    latency: str = "lognormal"
+    latency_ms: float = 200.0
+    latency_spread: float = 0.5
+    error_rate: float = 0.0
+    burst_every: int = 0
+    burst_length: int = 0
+    retry_after: float = 0.5
+    malformed_rate: float = 0.0
+    scores: Optional[tuple] = None
+    seed: int = 42
+
+
+@dataclass
+class MockStats:
+    """Counters of what the mock served, by outcome."""
+
+    requests: int = 0
+    ok: int = 0
+    rate_limited: int = 0
+    server_errors: int = 0
+    malformed: int = 0
+    batched_architectures: int = 0
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "ok": self.ok,
+            "rate_limited": self.rate_limited,
+            "server_errors": self.server_errors,
+            "malformed": self.malformed,
+            "batched_architectures": self.batched_architectures,
+        }
+
+
+def _canned_scores(config, text):
+    """Returns (regional_availability, operational_fit, future_cost_flexibility) for a prompt."""
+    if config.scores is not None:
+        return tuple(config.scores)
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return tuple(1 + byte % 5 for byte in digest[:3])
+
+
+def _score_object(ratings):
+    regional, operational, flexibility = ratings
+    return {
+        "regional_availability": regional,
+        "operational_fit": operational,
+        "future_cost_flexibility": flexibility,
+        "overall": round(sum(ratings) / 3, 2),
+        "reasoning": "Canned mock rating."
+    }
+
+
+def _text_reply(ratings):
+    regional, operational, flexibility = ratings
+    if sum(ratings) % 2:
+        # Prose that names other criteria mid-sentence; the ratings still belong to the section headers
+        return (f"Regional Availability: Overall, most services are offered in the target region. "
+                f"Rating: {regional}\n"
+                f"Operational Fit: Lambda covers the batch jobs and adds cost flexibility. Rating: {operational}\n"
+                f"Future Cost Flexibility: Serverless and reserved options exist. Rating: {flexibility}")
+    return (f"1. Regional Availability - Rating: {regional}\nThe services are offered in the target region.\n\n"
+            f"2. Operational Fit - Rating: {operational}\nBatch, analytics and relational needs are covered.\n\n"
+            f"3. Future Cost Flexibility - Rating: {flexibility}\nSome serverless and reserved options exist.\n\n"
+            f"Overall Score: {round(sum(ratings) / 3, 2)}")
+
+
+class MockOpenRouterServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server imitating the OpenRouter chat-completions API.
+
+    Start it with start(), point OPENROUTER_BASE_URL (or api.openrouter.OPENROUTER_BASE_URL) at
+    .url and read .stats afterwards.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        super().__init__((host, port), _MockHandler)
+        self.config = config or MockConfig()
+        self.stats = MockStats()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._burst_remaining = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{COMPLETIONS_PATH}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = MockStats()
+            self._burst_remaining = 0
+
+    def _sample_latency(self):
+        config = self.config
+        base = config.latency_ms / 1000
+        if config.latency == "fixed":
+            return base
+        if config.latency == "uniform":
+            return max(0.0, self._rng.uniform(base * (1 - config.latency_spread), base * (1 + config.latency_spread)))
+        return self._rng.lognormvariate(math.log(base), config.latency_spread) if base > 0 else 0.0
+
+    def plan_response(self):
+        """
+        Decides how the next request is answered.
+
+        Returns:
+            tuple: (status, delay_seconds, malformed); status 429 and 5xx skip the body.
+        """
+        config = self.config
+        with self._lock:
+            self.stats.requests += 1
+            delay = self._sample_latency()
+            if config.burst_every and config.burst_length and self.stats.requests % config.burst_every == 0:
+                self._burst_remaining = config.burst_length
+            if self._burst_remaining:
+                self._burst_remaining -= 1
+                self.stats.rate_limited += 1
+                return 429, 0.0, False
+            if self._rng.random() < config.error_rate:
+                self.stats.server_errors += 1
+                return self._rng.choice((500, 502, 503)), delay, False
+            malformed = self._rng.random() < config.malformed_rate
+            if malformed:
+                self.stats.malformed += 1
+            self.stats.ok += 1
+            return 200, delay, malformed
+
+    def reply_content(self, payload):
+        """Builds the assistant message for a chat-completions payload."""
+        messages = payload.get("messages") or []
+        system = next((message.get("content", "") for message in messages if message.get("role") == "system"), "")
+        user = next((message.get("content", "") for message in reversed(messages) if message.get("role") == "user"), "")
+
+        if "### Architecture ID" in system:
+            # Batched prompt: one JSON object keyed by every architecture ID in the message
+            sections = _ARCHITECTURE_ID_RE.split(user)[1:]
+            replies = {name: _score_object(_canned_scores(self.config, description))
+                       for name, description in zip(sections[::2], sections[1::2])}
+            with self._lock:
+                self.stats.batched_architectures += len(replies)
+            return "```json\n" + json.dumps(replies) + "\n```"
+        ratings = _canned_scores(self.config, user)
+        if payload.get("response_format"):
+            return json.dumps(_score_object(ratings))
+        return _text_reply(ratings)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Buffer the response so headers and body leave in one write; separate small writes on a
+    # keep-alive connection stall on Nagle's algorithm and delayed ACKs (~40 ms per request)
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self.path.split("?")[0] != COMPLETIONS_PATH:
+            self._send(404)
+            return
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            self._send(400, b'{"error": {"message": "Invalid JSON body"}}', {"Content-Type": "application/json"})
+            return
+
+        server = self.server
+        status, delay, malformed = server.plan_response()
+        if delay:
+            time.sleep(delay)
+        if status == 429:
+            self._send(429, b'{"error": {"message": "Rate limit exceeded"}}',
+                       {"Content-Type": "application/json", "Retry-After": f"{server.config.retry_after:g}"})
+            return
+        if status != 200:
+            self._send(status, b'{"error": {"message": "Upstream error"}}', {"Content-Type": "application/json"})
+            return
+
+        content = "I am unable to rate this architecture." if malformed else server.reply_content(payload)
+        body = json.dumps({
+            "id": f"mock-{server.stats.requests}",
+            "object": "chat.completion",
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        }).encode("utf-8")
+        self._send(200, body, {"Content-Type": "application/json"})
+
+
+def parse_scores(value):
+    """Parses "R,O,F" into a ratings tuple."""
+    ratings = tuple(int(part) for part in value.split(","))
+    if len(ratings) != 3 or not all(1 <= rating <= 5 for rating in ratings):
+        raise argparse.ArgumentTypeError("Expected three ratings between 1 and 5, e.g. 4,3,5")
+    return ratings
+
+
+def add_config_arguments(parser):
+    """Adds the MockConfig options to an argument parser."""
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fixed, mean or median latency")
+    parser.add_argument("--latency-spread", type=float, default=0.5,
+                        help="Relative spread (uniform) or sigma (lognormal)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 5xx")
+    parser.add_argument("--burst-every", type=int, default=0, help="Start a 429 burst every N requests")
+    parser.add_argument("--burst-length", type=int, default=0, help="Requests rejected per 429 burst")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Fraction of 200 replies without any readable rating")
+    parser.add_argument("--scores", type=parse_scores, help="Fixed canned ratings R,O,F (default: hash-derived)")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def config_from_args(args):
+    return MockConfig(latency=args.latency, latency_ms=args.latency_ms, latency_spread=args.latency_spread,
+                      error_rate=args.error_rate, burst_every=args.burst_every, burst_length=args.burst_length,
+                      retry_after=args.retry_after, malformed_rate=args.malformed_rate, scores=args.scores,
+                      seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock OpenRouter chat-completions endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = MockOpenRouterServer(config_from_args(args), args.host, args.port)
+    print(f"Mock OpenRouter listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {json.dumps(server.stats.to_dict())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
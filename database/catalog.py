@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import NoSuchTableError
+from database.connection import get_db_engine
+from utils.config import get_env_variable
+
+# Cheap change detector: hashes every live column's table OID, position, name and type from the
+# system catalogs, so adding, dropping, renaming or retyping a column changes the fingerprint.
+FINGERPRINT_QUERY = """
+    SELECT md5(string_agg(a.attrelid::text || '.' || a.attnum::text || ':' || a.attname || ':' || a.atttypid::text,
+                          ',' ORDER BY a.attrelid, a.attnum))
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+      AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+      AND a.attnum > 0
+      AND NOT a.attisdropped
+"""
+
+COLUMNS_QUERY = """
+    SELECT table_name, column_name, data_type, is_nullable, column_default
+    FROM information_schema.columns
+    WHERE table_schema = current_schema()
+    ORDER BY table_name, ordinal_position
+"""
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+class SchemaCatalog:
+    """
+    In-memory snapshot of the column layout of every table in the current schema.
+
+    Column entries are dictionaries with 'name', 'type', 'nullable' and 'default' keys,
+    mirroring the shape returned by SQLAlchemy's Inspector.get_columns.
+    """
+
+    def __init__(self, tables, fingerprint=None):
+        self.tables = tables
+        self.fingerprint = fingerprint
+
+    def table_names(self):
+        return list(self.tables)
+
+    def get_columns(self, table):
+        """
+        Returns the column info dictionaries for a table, in ordinal order.
+
+        Raises:
+            sqlalchemy.exc.NoSuchTableError: If the table is not in the catalog.
+        """
+        if table not in self.tables:
+            raise NoSuchTableError(table)
+        return [dict(col) for col in self.tables[table]]
+
+    def column_names(self, table):
+        return [col['name'] for col in self.get_columns(table)]
+
+    def to_dict(self):
+        return {"fingerprint": self.fingerprint, "tables": self.tables}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["tables"], data.get("fingerprint"))
+
+
+def compute_schema_fingerprint(connection):
+    """
+    Computes a hash of the current schema's table and column definitions.
+
+    Args:
+        connection: An open SQLAlchemy connection.
+
+    Returns:
+        str: The fingerprint, or None on dialects other than PostgreSQL.
+    """
+    if connection.dialect.name != "postgresql":
+        return None
+    return connection.execute(text(FINGERPRINT_QUERY)).scalar()
+
+
+def load_schema_catalog(connection, fingerprint=None):
+    """
+    Reads every column of every table in the current schema in a single query.
+
+    Falls back to SQLAlchemy reflection on dialects without information_schema (e.g. SQLite).
+
+    Args:
+        connection: An open SQLAlchemy connection.
+        fingerprint (str, optional): Fingerprint to record on the catalog.
+
+    Returns:
+        SchemaCatalog: The loaded catalog.
+    """
+    tables = {}
+    if connection.dialect.name == "postgresql":
+        for table_name, column_name, data_type, is_nullable, column_default in connection.execute(text(COLUMNS_QUERY)):
+            tables.setdefault(table_name, []).append({
+                'name': column_name,
+                'type': data_type,
+                'nullable': is_nullable == 'YES',
+                'default': column_default
+            })
+    else:
+        inspector = inspect(connection)
+        for table_name in inspector.get_table_names():
+            tables[table_name] = [{
+                'name': col['name'],
+                'type': str(col['type']),
+                'nullable': col.get('nullable', True),
+                'default': col.get('default')
+            } for col in inspector.get_columns(table_name)]
+
+    return SchemaCatalog(tables, fingerprint)
+
+
+def _read_cache_file(cache_path):
+    try:
+        with open(cache_path, "r") as f:
+            return SchemaCatalog.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_cache_file(cache_path, catalog):
+    try:
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(catalog.to_dict(), f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Could not write schema cache to '{cache_path}'. Error: {e}")
+
+
+def get_schema_catalog(refresh=False, cache_path=None):
+    """
+    Returns the process-wide schema catalog, loading it on first use.
+
+    The catalog is kept in memory for the life of the process. With `refresh=True` the schema
+    fingerprint is re-checked and the catalog reloaded only if it changed. If a cache path is
+    given (or SCHEMA_CACHE_PATH is set), a catalog stored on disk is reused when its fingerprint
+    still matches the database.
+
+    Args:
+        refresh (bool): Re-validate the in-memory catalog against the database.
+        cache_path (str, optional): JSON file used as an on-disk cache.
+
+    Returns:
+        SchemaCatalog: The schema catalog.
+    """
+    global _catalog
+    if _catalog is not None and not refresh:
+        return _catalog
+
+    if cache_path is None:
+        cache_path = get_env_variable("SCHEMA_CACHE_PATH", "") or None
+
+    with _catalog_lock:
+        if _catalog is not None and not refresh:
+            return _catalog
+
+        with get_db_engine().connect() as connection:
+            fingerprint = compute_schema_fingerprint(connection)
+
+            if _catalog is not None and fingerprint is not None and _catalog.fingerprint == fingerprint:
+                return _catalog
+
+            catalog = None
+            if cache_path and fingerprint is not None:
+                cached = _read_cache_file(cache_path)
+                if cached is not None and cached.fingerprint == fingerprint:
+                    catalog = cached
+
+            if catalog is None:
+                catalog = load_schema_catalog(connection, fingerprint)
+                if cache_path and fingerprint is not None:
+                    _write_cache_file(cache_path, catalog)
+
+        _catalog = catalog
+        return _catalog
+
+
+def invalidate_schema_catalog():
+    """Drops the in-memory catalog so the next get_schema_catalog call reloads it."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+
+def set_schema_catalog(catalog):
+    """Installs a catalog loaded elsewhere (e.g. from an offline snapshot) as the process-wide catalog."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = catalog
@@ -1,34 +1,163 @@
-from sqlalchemy import create_engine
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from utils.config import get_env_variable
 
-db_user = get_env_variable("DB_USER")
-db_password = get_env_variable("DB_PASSWORD")
-db_read = get_env_variable("DB_READ")
-db_main = get_env_variable("DB_MAIN")
+# The engine and session factory are created on first use and shared by the whole process
+_engine = None
+_session_factory = None
+_engine_lock = threading.Lock()
+
+_connections_opened = 0
+_connections_lock = threading.Lock()
+
+# Set through configure_db_engine to point the process at another database (benchmarks, snapshots)
+_db_url_override = None
+_engine_options_override = {}
+
+
+def get_db_url():
+    """
+    Builds the PostgreSQL connection URL from the DB_* environment variables.
+
+    Returns:
+        str: A SQLAlchemy database URL.
+    """
+
+    db_user = get_env_variable("DB_USER")
+    db_password = get_env_variable("DB_PASSWORD")
+    db_read = get_env_variable("DB_READ")
+    db_main = get_env_variable("DB_MAIN")
+    return f"postgresql+psycopg2://{db_user}:{db_password}@{db_read}/{db_main}"
+
+
+def get_pool_settings():
+    """
+    Reads the connection pool configuration, falling back to defaults for unset variables.
+
+    Returns:
+        dict: Keyword arguments for create_engine (pool_size, max_overflow, pool_recycle, pool_pre_ping).
+    """
+
+    return {
+        "pool_size": int(get_env_variable("DB_POOL_SIZE", "5")),
+        "max_overflow": int(get_env_variable("DB_MAX_OVERFLOW", "10")),
+        "pool_recycle": int(get_env_variable("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": get_env_variable("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+    }
+
+
+def _count_connection(dbapi_connection, connection_record):
+    global _connections_opened
+    with _connections_lock:
+        _connections_opened += 1
 
 
 # Create SQLAlchemy engine and session
 def get_db_engine():
     """
-    Creates and returns a SQLAlchemy engine for connecting to the PostgreSQL database.
+    Returns the process-wide SQLAlchemy engine, creating it and its connection pool on first use.
 
     Returns:
         sqlalchemy.engine.Engine: A SQLAlchemy engine instance using configured credentials.
     """
 
-    db_url = f"postgresql+psycopg2://{db_user}:{db_password}@{db_read}/{db_main}"
-    return create_engine(db_url)
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if _db_url_override is not None:
+                    engine = create_engine(_db_url_override, **_engine_options_override)
+                else:
+                    engine = create_engine(get_db_url(), **get_pool_settings())
+                event.listen(engine, "connect", _count_connection)
+                _engine = engine
+    return _engine
+
+
+def get_session_factory():
+    """
+    Returns the cached sessionmaker bound to the shared engine.
+
+    Returns:
+        sqlalchemy.orm.sessionmaker: The session factory.
+    """
+
+    global _session_factory
+    if _session_factory is None:
+        engine = get_db_engine()
+        with _engine_lock:
+            if _session_factory is None:
+                _session_factory = sessionmaker(bind=engine)
+    return _session_factory
 
 
 def get_db_session():
     """
     Creates and returns a new SQLAlchemy session for database operations.
 
+    The session borrows connections from the shared pool; callers must close it.
+
     Returns:
         sqlalchemy.orm.Session: A new session bound to the database engine.
     """
 
-    engine = get_db_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return get_session_factory()()
+
+
+@contextmanager
+def session_scope():
+    """
+    Provides a session that is rolled back on error and always closed, returning its connection to the pool.
+
+    Yields:
+        sqlalchemy.orm.Session: A new session bound to the database engine.
+    """
+
+    session = get_db_session()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_connection_count():
+    """
+    Returns the number of physical database connections opened by this process so far.
+
+    Returns:
+        int: The number of DBAPI connections the pool has created.
+    """
+
+    return _connections_opened
+
+
+def dispose_db_engine():
+    """Closes every pooled connection and forgets the shared engine so the next call builds a new one."""
+
+    global _engine, _session_factory
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _session_factory = None
+
+
+def configure_db_engine(url=None, **engine_options):
+    """
+    Points the shared engine at a different database URL, replacing any engine already created.
+
+    Args:
+        url (str, optional): SQLAlchemy database URL; None restores the DB_* environment configuration.
+        **engine_options: Extra keyword arguments for create_engine (replace the DB_POOL_* settings).
+    """
+
+    global _db_url_override, _engine_options_override
+    dispose_db_engine()
+    _db_url_override = url
+    _engine_options_override = engine_options if url is not None else {}
@@ -0,0 +1,225 @@
+import csv
+import datetime
+import decimal
+import json
+import time
+
+from sqlalchemy import text
+from database.connection import get_db_engine
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+EXPORT_CHUNK_SIZE = 10000
+
+# Excel's hard sheet limit; rows beyond it continue on the next sheet
+EXCEL_MAX_ROWS = 1048576
+
+# NUMERIC columns are written to Parquet at the widest decimal precision with this fixed scale, so a
+# later chunk with more digits than the first still fits the file's schema
+PARQUET_DECIMAL_SCALE = 18
+
+
+class _CsvWriter:
+    def __init__(self, file_name):
+        self._file = open(file_name, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+
+    def write_header(self, columns):
+        self._writer.writerow(columns)
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    """
+    Writes each chunk as one Parquet row group.
+
+    The schema is inferred from the first chunk, with decimals widened to PARQUET_DECIMAL_SCALE
+    digits after the point; values with more fractional digits are rounded to that scale.
+    """
+
+    def __init__(self, file_name):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from e
+        self._pa = pa
+        self._pq = pq
+        self._file_name = file_name
+        self._columns = None
+        self._schema = None
+        self._writer = None
+        self._rounded_columns = set()
+
+    def write_header(self, columns):
+        self._columns = list(columns)
+
+    def _wide_decimal(self, data_type):
+        pa = self._pa
+        if pa.types.is_decimal256(data_type) or data_type.precision - data_type.scale > 38 - PARQUET_DECIMAL_SCALE:
+            return pa.decimal256(76, max(data_type.scale, PARQUET_DECIMAL_SCALE))
+        return pa.decimal128(38, PARQUET_DECIMAL_SCALE)
+
+    def _to_decimal_array(self, values, name, data_type):
+        pa = self._pa
+        try:
+            return pa.array(values, type=data_type)
+        except pa.ArrowInvalid:
+            if name not in self._rounded_columns:
+                self._rounded_columns.add(name)
+                print(f"Warning: Column '{name}' has values with more than {data_type.scale} decimal places; "
+                      f"they are rounded in the Parquet file.")
+            quantum = decimal.Decimal(1).scaleb(-data_type.scale)
+            return pa.array([value.quantize(quantum) if isinstance(value, decimal.Decimal) else value
+                             for value in values], type=data_type)
+
+    def _to_array(self, values, name, field):
+        pa = self._pa
+        if field is None:
+            array = pa.array(values)
+            # An all-NULL first chunk gives no type information; store such columns as text
+            if pa.types.is_null(array.type):
+                return array.cast(pa.string())
+            if pa.types.is_decimal(array.type):
+                return self._to_decimal_array(values, name, self._wide_decimal(array.type))
+            return array
+        if pa.types.is_decimal(field.type):
+            return self._to_decimal_array(values, name, field.type)
+        try:
+            return pa.array(values, type=field.type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if pa.types.is_string(field.type):
+                return pa.array([None if v is None else str(v) for v in values], type=field.type)
+            raise
+
+    def write_rows(self, rows):
+        pa = self._pa
+        columns = list(zip(*rows)) if rows else [[] for _ in self._columns]
+        fields = self._schema if self._schema is not None else [None] * len(self._columns)
+        arrays = [self._to_array(list(values), name, field)
+                  for values, name, field in zip(columns, self._columns, fields)]
+        table = pa.Table.from_arrays(arrays, names=self._columns)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._pq.ParquetWriter(self._file_name, self._schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is None and self._columns is not None:
+            # No rows: still produce a valid file with the column names
+            self.write_rows([])
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _XlsxWriter:
+    """openpyxl write-only workbook that starts a new sheet whenever Excel's row limit is reached."""
+
+    def __init__(self, file_name):
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+        self._file_name = file_name
+        self._illegal_characters = ILLEGAL_CHARACTERS_RE
+        self._workbook = Workbook(write_only=True)
+        self._columns = None
+        self._sheet = None
+        self._sheet_rows = 0
+        self._sheet_count = 0
+
+    def _new_sheet(self):
+        self._sheet_count += 1
+        self._sheet = self._workbook.create_sheet(title=f"Sheet{self._sheet_count}")
+        self._sheet.append(self._columns)
+        self._sheet_rows = 1
+
+    def _cell_value(self, value):
+        if value is None or isinstance(value, (bool, int, float, decimal.Decimal, datetime.date, datetime.time)):
+            if isinstance(value, (datetime.datetime, datetime.time)) and value.tzinfo is not None:
+                # Excel has no notion of time zones
+                return value.replace(tzinfo=None)
+            return value
+        if isinstance(value, str):
+            return self._illegal_characters.sub("", value)
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=str)
+        return str(value)
+
+    def write_header(self, columns):
+        self._columns = list(columns)
+        self._new_sheet()
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self._sheet_rows >= EXCEL_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append([self._cell_value(value) for value in row])
+            self._sheet_rows += 1
+
+    def close(self):
+        if self._sheet is None:
+            self._workbook.create_sheet(title="Sheet1")
+        self._workbook.save(self._file_name)
+
+
+_WRITERS = {
+    "xlsx": _XlsxWriter,
+    "csv": _CsvWriter,
+    "parquet": _ParquetWriter,
+}
+
+
+def export_table(table_name, file_name=None, fmt="xlsx", limit=None, chunk_size=EXPORT_CHUNK_SIZE,
+                 show_progress=True):
+    """
+    Streams a table to a file chunk by chunk, keeping memory use independent of the table size.
+
+    Rows are read through a server-side cursor and handed to the writer one chunk at a time:
+    CSV rows are appended, each chunk becomes a Parquet row group, and XLSX uses an openpyxl
+    write-only workbook that continues on a new sheet when Excel's row limit is hit.
+
+    Args:
+        table_name (str): The name of the table to export.
+        file_name (str, optional): Output path. Defaults to f"{table_name}_data.{fmt}".
+        fmt (str): One of EXPORT_FORMATS.
+        limit (int, optional): The maximum number of rows to export. If None, all rows are exported.
+        chunk_size (int): Number of rows fetched and written per chunk.
+        show_progress (bool): Print the running row count and throughput after every chunk.
+
+    Returns:
+        int: The number of rows exported.
+
+    Raises:
+        ValueError: If the format is not supported.
+        ImportError: If the writer for the format needs a library that is not installed.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Expected one of {', '.join(EXPORT_FORMATS)}")
+    if file_name is None:
+        file_name = f"{table_name}_data.{fmt}"
+
+    # Construct the SQL query with an optional LIMIT clause
+    sql_query = f"SELECT * FROM \"{table_name}\""
+    if limit is not None and isinstance(limit, int) and limit > 0:
+        sql_query += f" LIMIT {limit}"
+
+    writer = _WRITERS[fmt](file_name)
+    row_count = 0
+    start = time.perf_counter()
+    try:
+        with get_db_engine().connect() as connection:
+            result = connection.execution_options(stream_results=True).execute(text(sql_query))
+            writer.write_header(list(result.keys()))
+            for chunk in result.partitions(chunk_size):
+                writer.write_rows([tuple(row) for row in chunk])
+                row_count += len(chunk)
+                if show_progress:
+                    elapsed = time.perf_counter() - start
+                    print(f"  {table_name}: {row_count:,} rows written ({row_count / max(elapsed, 1e-9):,.0f} rows/s)")
+    finally:
+        writer.close()
+
+    return row_count
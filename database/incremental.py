@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict
+
+from sqlalchemy import text
+from database.profiler import ColumnProfile, TableProfile, quote_identifier
+from utils.config import get_env_variable
+
+ANALYSIS_CACHE_PATH = ".analysis_cache.json"
+CACHE_FORMAT_VERSION = 2
+
+# TRUNCATE and VACUUM FULL give a table a new relfilenode, and the tuple counters move on every
+# insert, update and delete on the primary. Neither is enough on a hot standby (DB_READ): replayed
+# changes do not move the counters there, so the fingerprint also reads the table's contents below.
+TABLE_STATS_QUERY = """
+    SELECT c.relname, c.oid, c.relfilenode, c.relkind, s.relid IS NOT NULL AS has_stats,
+           s.n_tup_ins, s.n_tup_upd, s.n_tup_del
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE n.nspname = current_schema() AND c.relname = ANY(:tables)
+"""
+
+# Plain and partitioned tables carry an xmin system column; views and foreign tables do not
+_XMIN_RELKINDS = ("r", "p", "m")
+
+
+def _schema_hash(columns_info):
+    layout = [[col['name'], str(col.get('type'))] for col in columns_info]
+    return hashlib.md5(json.dumps(layout).encode("utf-8")).hexdigest()
+
+
+def _count_rows(session, table):
+    return session.execute(text(f"SELECT COUNT(*) FROM {quote_identifier(table)}")).scalar()
+
+
+def _postgres_content(session, table):
+    """
+    Row count plus the newest inserting transaction ID among the table's rows.
+
+    Every insert and update writes a row version with a new xmin, and a delete lowers the count,
+    so the pair changes with the contents. Both are replicated, so this also works on a standby.
+    """
+    row_count, max_xmin = session.execute(text(
+        f"SELECT COUNT(*), MAX(xmin::text::bigint) FROM {quote_identifier(table)}")).one()
+    return f"rows:{row_count}:xmin:{max_xmin}"
+
+
+def _sqlite_file_state(session):
+    """
+    Size and modification time of the SQLite database file and its WAL, or None for in-memory databases.
+
+    Any committed write changes one of them, updates that keep the row count included.
+    """
+    path = session.bind.url.database
+    if not path or path == ":memory:" or path.startswith("file::memory:"):
+        return None
+    parts = []
+    for file_path in (path, f"{path}-wal"):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+    return ":".join(parts) or None
+
+
+def compute_table_fingerprints(session, tables, all_table_columns):
+    """
+    Computes a content fingerprint for each table.
+
+    Every fingerprint holds the exact row count and a hash of the column layout, plus a component
+    that changes when rows are updated in place:
+      - PostgreSQL tables: the newest row xmin (see _postgres_content), the OID and relfilenode, and
+        the pg_stat_user_tables insert/update/delete counters when statistics exist.
+      - SQLite: the size and modification time of the database file and its WAL.
+    Tables without such a component (PostgreSQL views, other dialects, in-memory SQLite) get None;
+    they cannot be told apart from an unchanged table, so they are never served from the cache.
+
+    Args:
+        session: An active SQLAlchemy session.
+        tables (list): Table names to fingerprint.
+        all_table_columns (dict): Mapping of table name to its column info dictionaries.
+
+    Returns:
+        dict: Mapping of table name to fingerprint string, or None if the table cannot be cached.
+    """
+    dialect = session.bind.dialect.name
+    content = {}
+    if dialect == "postgresql":
+        for relname, oid, relfilenode, relkind, has_stats, n_ins, n_upd, n_del in session.execute(
+                text(TABLE_STATS_QUERY), {"tables": list(tables)}):
+            if relkind not in _XMIN_RELKINDS:
+                continue
+            counters = f":{n_ins}:{n_upd}:{n_del}" if has_stats else ""
+            content[relname] = f"{_postgres_content(session, relname)}|{oid}:{relfilenode}{counters}"
+    elif dialect == "sqlite":
+        file_state = _sqlite_file_state(session)
+        if file_state is not None:
+            for table in tables:
+                content[table] = f"rows:{_count_rows(session, table)}|file:{file_state}"
+
+    fingerprints = {}
+    for table in tables:
+        if table not in content:
+            fingerprints[table] = None
+            continue
+        fingerprints[table] = f"{content[table]}|{_schema_hash(all_table_columns[table])}"
+    return fingerprints
+
+
+def _profile_to_dict(table_profile):
+    return {
+        "row_count": table_profile.row_count,
+        "columns": [asdict(col_profile) for col_profile in table_profile.columns.values()]
+    }
+
+
+def _profile_from_dict(table, data):
+    columns = {col['name']: ColumnProfile(**col) for col in data["columns"]}
+    return TableProfile(table=table, row_count=data["row_count"], columns=columns)
+
+
+class AnalysisCache:
+    """
+    Per-table analysis results persisted as JSON, each tagged with the table fingerprint it was computed for.
+
+    Cross-table semantic matches are stored per table pair, tagged with both fingerprints. The whole
+    cache is discarded when the analysis settings (sampling mode, sample size, thresholds) change.
+    """
+
+    def __init__(self, path, settings, data=None):
+        self.path = path
+        self.settings = settings
+        data = data or {}
+        self.tables = data.get("tables", {})
+        self.pairs = data.get("pairs", {})
+
+    @classmethod
+    def load(cls, path=None, settings=None):
+        """
+        Loads the cache from disk, or returns an empty cache if the file is missing, unreadable or stale.
+
+        Args:
+            path (str, optional): Cache file. Defaults to ANALYSIS_CACHE_PATH or the env variable of that name.
+            settings (dict, optional): Analysis settings the cached results must have been computed with.
+
+        Returns:
+            AnalysisCache: The loaded cache.
+        """
+        if path is None:
+            path = get_env_variable("ANALYSIS_CACHE_PATH", ANALYSIS_CACHE_PATH)
+        settings = settings or {}
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, settings)
+        if data.get("version") != CACHE_FORMAT_VERSION or data.get("settings") != settings:
+            return cls(path, settings)
+        return cls(path, settings, data)
+
+    def is_current(self, table, fingerprint):
+        entry = self.tables.get(table)
+        return fingerprint is not None and entry is not None and entry.get("fingerprint") == fingerprint
+
+    def get_table(self, table):
+        """Returns (profile, samples, table_specific, redundant) for a cached table."""
+        entry = self.tables[table]
+        samples = {col_name: set(values) for col_name, values in entry["samples"].items()}
+        return (_profile_from_dict(table, entry["profile"]), samples,
+                entry["table_specific"], entry["redundant"])
+
+    def put_table(self, table, fingerprint, profile, samples, table_specific, redundant):
+        if fingerprint is None:  # The table cannot be fingerprinted; drop any stale entry instead
+            self.tables.pop(table, None)
+            return
+        self.tables[table] = {
+            "fingerprint": fingerprint,
+            "profile": _profile_to_dict(profile),
+            "samples": {col_name: sorted(values) for col_name, values in samples.items()},
+            "table_specific": table_specific,
+            "redundant": redundant
+        }
+
+    @staticmethod
+    def _pair_key(table1, table2):
+        return json.dumps([table1, table2])
+
+    def get_pair(self, table1, table2, fingerprint1, fingerprint2):
+        """Returns the cached semantic matches for a table pair, or None if either table changed."""
+        if fingerprint1 is None or fingerprint2 is None:
+            return None
+        entry = self.pairs.get(self._pair_key(table1, table2))
+        if entry is None or entry["fingerprints"] != [fingerprint1, fingerprint2]:
+            return None
+        return entry["matches"]
+
+    def put_pair(self, table1, table2, fingerprint1, fingerprint2, matches):
+        if fingerprint1 is None or fingerprint2 is None:
+            self.pairs.pop(self._pair_key(table1, table2), None)
+            return
+        self.pairs[self._pair_key(table1, table2)] = {
+            "fingerprints": [fingerprint1, fingerprint2],
+            "matches": matches
+        }
+
+    def save(self):
+        data = {
+            "version": CACHE_FORMAT_VERSION,
+            "settings": self.settings,
+            "tables": self.tables,
+            "pairs": self.pairs
+        }
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write analysis cache to '{self.path}'. Error: {e}")
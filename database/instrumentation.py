@@ -0,0 +1,246 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from sqlalchemy import event
+from database.connection import get_db_engine
+
+MAX_STATEMENT_LENGTH = 200
+
+_tracer = None
+_NO_TRACE = nullcontext()
+
+
+class QueryTracer:
+    """
+    Records per-statement latency and named phase spans for one engine.
+
+    Statements are timed with SQLAlchemy's before/after_cursor_execute events and attributed
+    to the innermost phase open on the executing thread. Phases are tracked per thread, so a
+    worker thread's statements only belong to a phase it opened or attached (see attach_phase).
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def remove(self):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(self.engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(self.engine, "handle_error", self._handle_error)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_phase(self):
+        """Returns the innermost phase open on the calling thread, or None."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("trace_start", []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("trace_start"):
+            connection.info["trace_start"].pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        end = time.perf_counter()
+        start = conn.info["trace_start"].pop()
+        rowcount = getattr(cursor, "rowcount", -1)
+        record = {
+            "statement": " ".join(statement.split())[:MAX_STATEMENT_LENGTH],
+            "phase": self.current_phase(),
+            "start": start - self._origin,
+            "duration": end - start,
+            "rows": rowcount if rowcount is not None and rowcount >= 0 else None,
+            "thread": threading.get_ident(),
+        }
+        with self._lock:
+            self.statements.append(record)
+
+    @contextmanager
+    def phase(self, name):
+        stack = self._stack()
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "start": start - self._origin,
+                    "duration": end - start,
+                    "thread": threading.get_ident(),
+                })
+
+    @contextmanager
+    def attached(self, name):
+        """Attributes the calling thread's statements to a phase opened on another thread, without a new span."""
+        stack = self._stack()
+        stack.append(name)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def summary(self, top_n=10):
+        """
+        Aggregates the recorded data.
+
+        Returns:
+            dict: 'phases' maps each phase to its wall time (the length of the union of its spans,
+                  so overlapping spans count once and gaps between them not at all), cumulative
+                  time (the span durations summed, which exceeds the wall time when spans overlap
+                  on several threads), statement count, rows and time spent in the database
+                  (summed over statements); 'slowest' lists the top_n slowest statements.
+        """
+        with self._lock:
+            statements = list(self.statements)
+            spans = list(self.spans)
+
+        phases = defaultdict(lambda: {"wall_time": 0.0, "cumulative_time": 0.0, "statements": 0,
+                                      "db_time": 0.0, "rows": 0})
+        # Wall time: merge each phase's spans in start order and add up the covered intervals
+        covered_until = {}
+        for span in sorted(spans, key=lambda span: span["start"]):
+            entry = phases[span["name"]]
+            entry["cumulative_time"] += span["duration"]
+            end = span["start"] + span["duration"]
+            covered = covered_until.get(span["name"], span["start"])
+            if end > covered:
+                entry["wall_time"] += end - max(covered, span["start"])
+                covered_until[span["name"]] = end
+        for record in statements:
+            entry = phases[record["phase"] or "(no phase)"]
+            entry["statements"] += 1
+            entry["db_time"] += record["duration"]
+            entry["rows"] += record["rows"] or 0
+
+        slowest = sorted(statements, key=lambda record: record["duration"], reverse=True)[:top_n]
+        return {"phases": dict(phases), "slowest": slowest}
+
+    def chrome_trace(self):
+        """Returns the spans and statements in Chrome trace event format (load in chrome://tracing or Perfetto)."""
+        pid = os.getpid()
+        events = []
+        with self._lock:
+            for span in self.spans:
+                events.append({"name": span["name"], "cat": "phase", "ph": "X", "pid": pid, "tid": span["thread"],
+                               "ts": span["start"] * 1e6, "dur": span["duration"] * 1e6})
+            for record in self.statements:
+                events.append({"name": record["statement"][:60], "cat": "sql", "ph": "X", "pid": pid,
+                               "tid": record["thread"], "ts": record["start"] * 1e6, "dur": record["duration"] * 1e6,
+                               "args": {"statement": record["statement"], "phase": record["phase"],
+                                        "rows": record["rows"]}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def enable_tracing(engine=None):
+    """
+    Starts recording statements and phases on the shared engine (or the given one).
+
+    Returns:
+        QueryTracer: The active tracer.
+    """
+    global _tracer
+    disable_tracing()
+    _tracer = QueryTracer(engine or get_db_engine())
+    return _tracer
+
+
+def disable_tracing():
+    """Stops tracing and removes the event hooks; returns the tracer that was active, if any."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.remove()
+    return tracer
+
+
+def get_tracer():
+    return _tracer
+
+
+def trace_phase(name):
+    """
+    Context manager marking a named phase; a shared no-op context when tracing is off.
+
+    Args:
+        name (str): The phase name shown in summaries and traces.
+    """
+    if _tracer is None:
+        return _NO_TRACE
+    return _tracer.phase(name)
+
+
+def current_phase():
+    """Returns the innermost phase open on the calling thread, or None (also when tracing is off)."""
+    if _tracer is None:
+        return None
+    return _tracer.current_phase()
+
+
+def attach_phase(name):
+    """
+    Context manager that attributes a worker thread's statements to a phase opened by the caller.
+
+    Capture current_phase() before handing work to a thread pool and wrap each job in
+    attach_phase(phase); no extra span is recorded, so the phase's times are unchanged.
+
+    Args:
+        name (str): The phase name, usually from current_phase(); None attaches nothing.
+    """
+    if _tracer is None or name is None:
+        return _NO_TRACE
+    return _tracer.attached(name)
+
+
+def print_trace_summary(top_n=10):
+    """Prints time per phase and the top_n slowest statements recorded by the active tracer."""
+    if _tracer is None:
+        return
+    summary = _tracer.summary(top_n)
+
+    print("\n" + "=" * 80)
+    print("QUERY TRACE SUMMARY")
+    print("=" * 80)
+    print(f"\n{'Phase':<32} {'Wall (s)':>10} {'Cumulative (s)':>15} {'DB (s)':>10} {'Statements':>11} "
+          f"{'Rows':>10}")
+    print("-" * 93)
+    for name, entry in sorted(summary["phases"].items(), key=lambda item: -item[1]["wall_time"]):
+        print(f"{name:<32} {entry['wall_time']:>10.3f} {entry['cumulative_time']:>15.3f} "
+              f"{entry['db_time']:>10.3f} {entry['statements']:>11} {entry['rows']:>10}")
+    print("Cumulative and DB times are summed over threads, so they can exceed the wall time.")
+
+    print(f"\nTop {len(summary['slowest'])} slowest statements:")
+    for record in summary["slowest"]:
+        rows = record["rows"] if record["rows"] is not None else "?"
+        print(f"  {record['duration'] * 1000:>9.1f} ms  rows={rows:<8} [{record['phase']}] {record['statement'][:90]}")
+
+
+def write_chrome_trace(path):
+    """Writes the active tracer's data as a Chrome trace JSON file."""
+    if _tracer is None:
+        return
+    with open(path, "w") as f:
+        json.dump(_tracer.chrome_trace(), f)
+    print(f"Trace written to {path}")
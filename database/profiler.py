@@ -0,0 +1,186 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+# PostgreSQL caps a select list at 1664 entries; each profiled column adds up to
+# four aggregates, so wide tables are split into several statements. The budget
+# stays a little under the cap to leave room for COUNT(*).
+SELECT_LIST_BUDGET = 1600
+AGGREGATES_PER_COLUMN = 4
+PROFILE_CHUNK_SIZE = SELECT_LIST_BUDGET // AGGREGATES_PER_COLUMN
+
+
+@dataclass
+class ColumnProfile:
+    """Aggregate statistics for a single column, gathered in one table scan."""
+    name: str
+    row_count: int
+    non_null_count: int
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+    distinct_estimate: Optional[int] = None
+
+    @property
+    def null_count(self):
+        return self.row_count - self.non_null_count
+
+    @property
+    def null_fraction(self):
+        if self.row_count == 0:
+            return 0.0
+        return self.null_count / self.row_count
+
+    @property
+    def is_empty(self):
+        return self.non_null_count == 0
+
+
+@dataclass
+class TableProfile:
+    """Per-column profiles for one table, keyed by column name."""
+    table: str
+    row_count: int
+    columns: Dict[str, ColumnProfile] = field(default_factory=dict)
+
+    def get(self, column_name):
+        return self.columns.get(column_name)
+
+
+def quote_identifier(name):
+    """Quotes a table or column name for use in a raw SQL statement."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _column_aggregates(column_name, index, exact_distinct):
+    col = quote_identifier(column_name)
+    as_text = f"CAST({col} AS TEXT)"
+    aggregates = [
+        f"COUNT({col}) AS nn_{index}",
+        f"MIN(LENGTH({as_text})) AS minlen_{index}",
+        f"MAX(LENGTH({as_text})) AS maxlen_{index}",
+    ]
+    if exact_distinct:
+        aggregates.append(f"COUNT(DISTINCT {col}) AS nd_{index}")
+    return aggregates
+
+
+def _profile_chunk(session, table, columns, exact_distinct):
+    """Runs one aggregate statement for a chunk of columns and returns (row_count, profiles)."""
+    select_list = ["COUNT(*) AS row_count"]
+    for i, col_name in enumerate(columns):
+        select_list.extend(_column_aggregates(col_name, i, exact_distinct))
+
+    query = text(f"SELECT {', '.join(select_list)} FROM {quote_identifier(table)}")
+    row = session.execute(query).mappings().one()
+
+    row_count = row["row_count"]
+    profiles = {}
+    for i, col_name in enumerate(columns):
+        profiles[col_name] = ColumnProfile(
+            name=col_name,
+            row_count=row_count,
+            non_null_count=row[f"nn_{i}"],
+            min_length=row[f"minlen_{i}"],
+            max_length=row[f"maxlen_{i}"],
+            distinct_estimate=row[f"nd_{i}"] if exact_distinct else None,
+        )
+    return row_count, profiles
+
+
+def _fetch_distinct_estimates(session, table, row_count):
+    """Reads planner distinct-value estimates from pg_stats (populated by ANALYZE)."""
+    query = text(
+        "SELECT attname, n_distinct FROM pg_stats "
+        "WHERE schemaname = current_schema() AND tablename = :table"
+    )
+    estimates = {}
+    for attname, n_distinct in session.execute(query, {"table": table}):
+        if n_distinct is None:
+            continue
+        # Negative values are a fraction of the row count rather than an absolute count
+        if n_distinct < 0:
+            estimates[attname] = int(round(-n_distinct * row_count))
+        else:
+            estimates[attname] = int(n_distinct)
+    return estimates
+
+
+def profile_table(session, table, columns, chunk_size=PROFILE_CHUNK_SIZE, exact_distinct=None):
+    """
+    Profiles every column of a table with one aggregate query per chunk of columns.
+
+    Args:
+        session: An active SQLAlchemy session.
+        table (str): The table to profile.
+        columns (list): Column names to include in the profile.
+        chunk_size (int): Maximum number of columns per aggregate statement.
+        exact_distinct (bool, optional): Count distinct values exactly with COUNT(DISTINCT).
+            Defaults to False on PostgreSQL, where the pg_stats estimate is used instead,
+            and True on other dialects.
+
+    Returns:
+        TableProfile: Row count plus a ColumnProfile for each column that could be profiled.
+    """
+    is_postgres = session.bind.dialect.name == "postgresql"
+    if exact_distinct is None:
+        exact_distinct = not is_postgres
+
+    table_profile = TableProfile(table=table, row_count=0)
+    pending = [columns[i:i + chunk_size] for i in range(0, len(columns), chunk_size)] or [[]]
+
+    split_warned = False
+    while pending:
+        chunk = pending.pop(0)
+        try:
+            row_count, profiles = _profile_chunk(session, table, chunk, exact_distinct)
+        except Exception as e:
+            session.rollback()
+            if len(chunk) > 1:
+                if not split_warned:
+                    print(f"Warning: Profiling statement for table '{table}' failed; splitting it "
+                          f"to isolate the bad column, so the table will be scanned more than once. "
+                          f"Error: {e}")
+                    split_warned = True
+                # Bisect so a single bad column costs a handful of extra scans, not one per column
+                middle = len(chunk) // 2
+                pending[:0] = [chunk[:middle], chunk[middle:]]
+                continue
+            print(f"Warning: Could not profile column '{chunk[0] if chunk else '*'}' "
+                  f"in table '{table}'. Error: {e}")
+            continue
+        table_profile.row_count = row_count
+        table_profile.columns.update(profiles)
+
+    if is_postgres and not exact_distinct:
+        try:
+            estimates = _fetch_distinct_estimates(session, table, table_profile.row_count)
+        except Exception as e:
+            session.rollback()
+            print(f"Warning: Could not read distinct estimates for table '{table}'. Error: {e}")
+            estimates = {}
+        for col_name, estimate in estimates.items():
+            if col_name in table_profile.columns:
+                table_profile.columns[col_name].distinct_estimate = estimate
+
+    return table_profile
+
+
+def profile_tables(session, tables, all_table_columns, chunk_size=PROFILE_CHUNK_SIZE):
+    """
+    Profiles each table once so that every analysis check can share the result.
+
+    Args:
+        session: An active SQLAlchemy session.
+        tables (list): Table names to profile.
+        all_table_columns (dict): Mapping of table name to its column info dictionaries.
+        chunk_size (int): Maximum number of columns per aggregate statement.
+
+    Returns:
+        dict: Mapping of table name to TableProfile.
+    """
+    profiles = {}
+    for table in tables:
+        columns = [col['name'] for col in all_table_columns[table]]
+        profiles[table] = profile_table(session, table, columns, chunk_size=chunk_size)
+    return profiles
@@ -1,9 +1,35 @@
-from sqlalchemy import inspect, text
-from database.connection import get_db_engine, get_db_session
-import pandas as pd
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from database.connection import get_db_engine, session_scope, get_connection_count
+from database.catalog import get_schema_catalog
+from database.export import export_table
+from database.incremental import AnalysisCache, compute_table_fingerprints
+from database.instrumentation import (enable_tracing, disable_tracing, trace_phase, print_trace_summary,
+                                      write_chrome_trace)
+from database.profiler import profile_tables
+from database.sampling import sample_columns, SAMPLING_MAX_WORKERS, SAMPLING_MAX_PER_TABLE, SAMPLING_MODE
+# Re-exported: fetch_distinct_column_values used to live in this module
+from database.sampling import fetch_distinct_column_values  # noqa: F401
+from utils.minhash import MinHasher, LSHIndex, DEFAULT_NUM_PERM
 from collections import defaultdict
 
-engine = get_db_engine()
+# Columns whose sampled values overlap by more than this Jaccard similarity are reported as duplicates
+SEMANTIC_SIMILARITY_THRESHOLD = 0.8
+MINHASH_NUM_PERM = DEFAULT_NUM_PERM
+
+# Distinct values sampled per column for the semantic duplicate check
+ANALYSIS_SAMPLE_LIMIT = 500
+
+# Tables analyzed concurrently, each job on its own pooled connection. Every job also splits
+# SAMPLING_MAX_WORKERS with the others, so the pool needs about twice this many connections
+# (within DB_POOL_SIZE + DB_MAX_OVERFLOW); 1 analyzes the tables one after another.
+ANALYSIS_MAX_WORKERS = int(os.getenv("ANALYSIS_MAX_WORKERS", "4"))
+
+# Comma-separated override of the tables run_comprehensive_analysis covers
+ANALYSIS_TABLES = [table.strip() for table in
+                   os.getenv("ANALYSIS_TABLES", "aws-ec2-proc,aws-s3-proc,aws-rds-full,aws-lambda-full").split(",")
+                   if table.strip()]
 
 
 def find_duplicate_columns(tables):
@@ -16,12 +42,12 @@ def find_duplicate_columns(tables):
     Returns:
         dict: Mapping of table names to duplicate column information.
     """
-    inspector = inspect(engine)
+    catalog = get_schema_catalog()
     duplicate_columns = {}
 
     for table in tables:
         # Get column names for the current table
-        columns = [col['name'] for col in inspector.get_columns(table)]
+        columns = catalog.column_names(table)
 
         # Check for duplicates within the same table
         duplicates_within = [col for col in columns if columns.count(col) > 1]
@@ -33,7 +59,7 @@ def find_duplicate_columns(tables):
         }
 
     # Check for duplicates across tables
-    all_columns = {table: [col['name'] for col in inspector.get_columns(table)] for table in tables}
+    all_columns = {table: catalog.column_names(table) for table in tables}
     for i, table1 in enumerate(tables):
         for table2 in tables[i + 1:]:
             common = set(all_columns[table1]).intersection(all_columns[table2])
@@ -54,13 +80,12 @@ def find_shared_columns(tables, min_occurrence=3):
     Returns:
         list: A list of dictionaries, each containing a column name, its count, and the tables it appears in.
     """
-    session = get_db_session()
-    inspector = inspect(session.bind)
+    catalog = get_schema_catalog()
 
     column_map = {}
 
     for table in tables:
-        columns = [col["name"] for col in inspector.get_columns(table)]
+        columns = catalog.column_names(table)
         for col in columns:
             key = col.lower()  # use lowercase for consistency
             if key not in column_map:
@@ -82,112 +107,235 @@ def find_shared_columns(tables, min_occurrence=3):
 
 
 def extract_columns(table):
-    inspector = inspect(engine)
-    columns = [col['name'] for col in inspector.get_columns(table)]
-    return columns
+    return get_schema_catalog().column_names(table)
 
 
-def export_table_to_excel(table_name, file_name=None, limit=10):
+def export_table_to_excel(table_name, file_name=None, limit=10, fmt="xlsx"):
     """
     Exports a table's data to an Excel file, with an optional row limit.
 
+    Rows are streamed to the file in chunks, so exporting a full table (limit=None) keeps memory flat.
+
     Args:
         table_name (str): The name of the table to export.
         file_name (str, optional): The name of the Excel file to create.
                                    Defaults to f"{table_name}_data.xlsx".
         limit (int, optional): The maximum number of rows to export. If None, all rows are exported.
+        fmt (str, optional): Output format: "xlsx" (default), "csv" or "parquet".
+
+    Returns:
+        int: Number of rows exported, or None if the export failed.
     """
     if file_name is None:
-        file_name = f"{table_name}_data.xlsx"
+        file_name = f"{table_name}_data.{fmt}"
 
     try:
-        # Construct the SQL query with an optional LIMIT clause
-        sql_query = f"SELECT * FROM \"{table_name}\""
-        if limit is not None and isinstance(limit, int) and limit > 0:
-            sql_query += f" LIMIT {limit}"
-
-        # Use pandas to read the results of the SQL query into a DataFrame
-        df = pd.read_sql_query(text(sql_query), con=engine)
-
-        # Export the DataFrame to an Excel file
-        df.to_excel(file_name, index=False)  # index=False prevents writing DataFrame index as a column
-
-        row_count = len(df)
+        row_count = export_table(table_name, file_name, fmt=fmt, limit=limit)
         print(f"Successfully exported {row_count} rows from '{table_name}' to '{file_name}'")
+        return row_count
 
     except Exception as e:
-        print(f"An error occurred while exporting {table_name} to Excel: {e}")
+        print(f"An error occurred while exporting {table_name} to {fmt}: {e}")
 
 
 # Enhanced analysis functions for the assignment
-def comprehensive_table_analysis(tables):
+def comprehensive_table_analysis(tables, sampling_mode=SAMPLING_MODE, force=False, cache_path=None,
+                                 max_workers=ANALYSIS_MAX_WORKERS):
     """
     Comprehensive analysis of database tables to answer all assignment questions.
 
+    Per-table results are cached on disk together with a fingerprint of each table's contents and
+    schema. On a re-run only tables whose fingerprint changed are profiled and sampled again, and
+    only the cross-table pairs involving them are re-compared; the results are the same as a full run.
+
+    The per-table work (profiling, sampling, table-specific and redundant column checks) runs as one
+    job per table on a thread pool of `max_workers`, each job on its own pooled connection. The
+    results do not depend on the worker count.
+
     Args:
         tables (list): List of table names to analyze
+        sampling_mode (str): How column values are sampled for duplicate detection: "table" or
+                             "tablesample" (one query per table, PostgreSQL) or "column" (one per column)
+        force (bool): Ignore cached results and recompute every table
+        cache_path (str, optional): Analysis cache file (defaults to ANALYSIS_CACHE_PATH)
+        max_workers (int): Tables analyzed concurrently; 1 analyzes them one after another
 
     Returns:
         dict: Complete analysis results
     """
-    inspector = inspect(engine)
-    session = get_db_session()
+    with trace_phase("schema_catalog"):
+        catalog = get_schema_catalog()
 
     analysis_results = {
         'duplicate_info': {},
         'essential_columns': {},
         'table_specific_columns': {},
         'redundant_columns': {},
-        'column_details': {}
+        'column_details': {},
+        'column_profiles': {}
     }
 
     # Get detailed column information for all tables
     all_table_columns = {}
     for table in tables:
-        columns_info = inspector.get_columns(table)
+        columns_info = catalog.get_columns(table)
         all_table_columns[table] = columns_info
         analysis_results['column_details'][table] = columns_info
 
-    # Question 1: Duplicate Information Analysis
-    # Pass the session to the enhanced function for data sampling
-    analysis_results['duplicate_info'] = find_duplicate_columns_enhanced(tables, all_table_columns, session)
+    settings = {
+        'sampling_mode': sampling_mode,
+        'sample_limit': ANALYSIS_SAMPLE_LIMIT,
+        'similarity_threshold': SEMANTIC_SIMILARITY_THRESHOLD,
+        'num_perm': MINHASH_NUM_PERM
+    }
+    cache = AnalysisCache.load(cache_path, settings)
+
+    profiles, column_data_samples, table_specific, redundant = {}, {}, {}, {}
 
-    # Question 3: Most Important Table-Specific Columns
-    analysis_results['table_specific_columns'] = identify_table_specific_columns(tables, all_table_columns, session)
+    with session_scope() as session:
+        with trace_phase("fingerprints"):
+            fingerprints = compute_table_fingerprints(session, tables, all_table_columns)
+    changed = [table for table in tables if force or not cache.is_current(table, fingerprints[table])]
+    for table in tables:
+        if table not in changed:
+            profiles[table], column_data_samples[table], table_specific[table], redundant[table] = \
+                cache.get_table(table)
+    if len(changed) < len(tables):
+        print(f"Reusing cached analysis for {len(tables) - len(changed)} unchanged table(s).")
+
+    if changed:
+        dialect = get_db_engine().dialect.name
+        if sampling_mode != "column" and dialect != "postgresql":
+            # Decide once here rather than in every table job
+            print(f"Sampling mode '{sampling_mode}' requires PostgreSQL; using per-column sampling on {dialect}.")
+            sampling_mode = "column"
+
+        # Every table is profiled, sampled and checked by its own job; only the cross-table
+        # comparison below needs all of them
+        workers = max(1, min(max_workers, len(changed)))
+        sampling_workers = max(1, SAMPLING_MAX_WORKERS // workers)
+        with trace_phase("table_jobs"):
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    jobs = {table: executor.submit(analyze_table, table, all_table_columns, sampling_mode,
+                                                   sampling_workers)
+                            for table in changed}
+                    table_results = {table: job.result() for table, job in jobs.items()}
+            else:
+                table_results = {table: analyze_table(table, all_table_columns, sampling_mode, sampling_workers)
+                                 for table in changed}
+        for table in changed:
+            profiles[table], column_data_samples[table], table_specific[table], redundant[table] = \
+                table_results[table]
+            cache.put_table(table, fingerprints[table], *table_results[table])
 
-    # Question 4: Redundant Columns
-    analysis_results['redundant_columns'] = identify_redundant_columns(tables, all_table_columns, session)
+    # Question 1: Duplicate Information Analysis
+    with trace_phase("cross_table_comparison"):
+        duplicates = find_name_duplicates(tables, all_table_columns)
+        column_positions = {table: {col_name: i for i, col_name in enumerate(column_data_samples[table])}
+                            for table in tables}
+        for i, table1 in enumerate(tables):
+            for table2 in tables[i + 1:]:
+                matches = None if force else cache.get_pair(table1, table2, fingerprints[table1],
+                                                            fingerprints[table2])
+                if matches is None:
+                    pair_samples = {table1: column_data_samples[table1], table2: column_data_samples[table2]}
+                    matches = find_semantic_matches([table1, table2], pair_samples)[table1]
+                    cache.put_pair(table1, table2, fingerprints[table1], fingerprints[table2], matches)
+                duplicates[table1]["semantic_data_match"].extend(matches)
+        for i, table1 in enumerate(tables):
+            # Same order as a single pass over all tables: by column, then other table, then its column
+            duplicates[table1]["semantic_data_match"].sort(key=lambda match: (
+                column_positions[table1][match['column1']],
+                tables.index(match['table2']),
+                column_positions[match['table2']][match['column2']]
+            ))
+
+    with trace_phase("cache_save"):
+        cache.save()
+
+    analysis_results['duplicate_info'] = duplicates
+    analysis_results['column_profiles'] = {table: profiles[table] for table in tables}
+    analysis_results['table_specific_columns'] = {table: table_specific[table] for table in tables}
+    analysis_results['redundant_columns'] = {table: redundant[table] for table in tables}
 
-    session.close()
     return analysis_results
 
 
-def fetch_distinct_column_values(session, table_name, column_name, limit=100):
-    """Fetches a sample of distinct non-null values from a column."""
-    try:
-        query = text(
-            f'SELECT DISTINCT "{column_name}" FROM "{table_name}" WHERE "{column_name}" IS NOT NULL LIMIT {limit}'
-        )
-        result = session.execute(query).fetchall()
-        # Convert to a set for faster comparison
-        return {str(row[0]) for row in result}
-    except Exception as e:
-        print(f"Error fetching distinct values for {table_name}.{column_name}: {e}")
-        return set()
+def analyze_table(table, all_table_columns, sampling_mode=SAMPLING_MODE, sampling_workers=SAMPLING_MAX_WORKERS):
+    """
+    Runs the per-table checks of the comprehensive analysis for one table in its own session.
 
+    Args:
+        table (str): The table to analyze.
+        all_table_columns (dict): Mapping of table name to its column info dictionaries.
+        sampling_mode (str): Sampling mode passed to collect_column_samples.
+        sampling_workers (int): Concurrent sampling queries for this table; <= 1 samples on the job's session.
 
-def find_duplicate_columns_enhanced(tables, all_table_columns, session, sample_limit=500):
+    Returns:
+        tuple: (TableProfile, {column_name: set_of_sample_values}, table-specific columns, redundant columns)
     """
-    Enhanced duplicate column detection with semantic analysis based on data content.
+    with session_scope() as session:
+        # Scan the table once; every check below reads from this profile
+        with trace_phase("profiling"):
+            profiles = profile_tables(session, [table], all_table_columns)
+
+        # Question 1 (data part): sample column values for the semantic duplicate check
+        with trace_phase("sampling"):
+            samples = collect_column_samples([table], all_table_columns, session, sample_limit=ANALYSIS_SAMPLE_LIMIT,
+                                             profiles=profiles, max_workers=sampling_workers,
+                                             sampling_mode=sampling_mode)
+
+        with trace_phase("table_checks"):
+            # Question 3: Most Important Table-Specific Columns
+            table_specific = identify_table_specific_columns([table], all_table_columns, session, profiles=profiles)
+
+            # Question 4: Redundant Columns
+            redundant = identify_redundant_columns([table], all_table_columns, session, profiles=profiles)
+
+    return profiles[table], samples[table], table_specific[table], redundant[table]
+
+
+def collect_column_samples(tables, all_table_columns, session, sample_limit=ANALYSIS_SAMPLE_LIMIT, profiles=None,
+                           max_workers=SAMPLING_MAX_WORKERS, max_per_table=SAMPLING_MAX_PER_TABLE,
+                           sampling_mode=SAMPLING_MODE):
+    """
+    Samples distinct values for every column of the given tables.
+
+    Columns that the table profiles report as entirely NULL are not sampled.
+
+    Returns:
+        dict: Mapping of {table: {column_name: set_of_sample_values}}, in column order.
     """
-    duplicates = {}
     column_data_samples = defaultdict(dict)  # Stores {table: {column_name: set_of_sample_values}}
 
-    # First, collect column data samples for all columns in all tables
+    columns_to_sample = {}
     for table in tables:
         columns = [col['name'] for col in all_table_columns[table]]
+        table_profile = profiles.get(table) if profiles else None
+        columns_to_sample[table] = []
         for col_name in columns:
-            column_data_samples[table][col_name] = fetch_distinct_column_values(session, table, col_name, sample_limit)
+            column_data_samples[table][col_name] = set()
+            col_profile = table_profile.get(col_name) if table_profile else None
+            if col_profile is None or not col_profile.is_empty:
+                columns_to_sample[table].append(col_name)
+
+    sampled = sample_columns(columns_to_sample, sample_limit, mode=sampling_mode, max_workers=max_workers,
+                             max_per_table=max_per_table, session=session)
+    for table, table_samples in sampled.items():
+        column_data_samples[table].update(table_samples)
+
+    return column_data_samples
+
+
+def find_name_duplicates(tables, all_table_columns):
+    """
+    Finds duplicate column names within each table and shared names across tables.
+
+    Returns:
+        dict: Mapping of table name to its duplicate info, with an empty "semantic_data_match" list.
+    """
+    duplicates = {}
 
     for table in tables:
         columns = [col['name'] for col in all_table_columns[table]]
@@ -213,67 +361,95 @@ def find_duplicate_columns_enhanced(tables, all_table_columns, session, sample_l
                     duplicates[table2] = {"within_name_match": [], "across_name_match": [], "semantic_data_match": []}
                 duplicates[table2]["across_name_match"].append({table1: list(common_names)})
 
-    # Semantic Data Duplicates (new logic)
-    # This checks for columns in different tables (or even the same table, though less common for semantic)
-    # that have similar distinct data values, even if their names differ.
-    processed_pairs = set() # To avoid redundant comparisons (A vs B is same as B vs A)
+    return duplicates
 
-    for i, table1_name in enumerate(tables):
-        for col1_name, col1_sample in column_data_samples[table1_name].items():
-            if not col1_sample: # Skip if no data
-                continue
 
-            for j, table2_name in enumerate(tables):
-                # Ensure we don't compare a table with itself for cross-table semantic duplicates
-                # And avoid re-processing pairs (e.g., (A,B) and then (B,A))
-                if (table1_name == table2_name) or ((table1_name, table2_name) in processed_pairs) or ((table2_name, table1_name) in processed_pairs):
-                    continue
-
-                for col2_name, col2_sample in column_data_samples[table2_name].items():
-                    if not col2_sample: # Skip if no data
-                        continue
-
-                    # Heuristic for semantic duplication: significant overlap in distinct values
-                    # You might need to adjust this heuristic based on data characteristics.
-                    # For example, Jaccard similarity: |A intersect B| / |A union B|
-                    intersection = col1_sample.intersection(col2_sample)
-                    union = col1_sample.union(col2_sample)
-
-                    if len(union) > 0: # Avoid division by zero
-                        jaccard_similarity = len(intersection) / len(union)
-                        # Define a threshold for considering them semantically duplicate
-                        if jaccard_similarity > 0.8: # Adjust this threshold (e.g., 0.8 means 80% overlap)
-                            duplicates[table1_name]["semantic_data_match"].append({
-                                'column1': col1_name,
-                                'table2': table2_name,
-                                'column2': col2_name,
-                                'similarity': f"{jaccard_similarity:.2f}",
-                                'reason': f"High data overlap ({jaccard_similarity:.2f}) suggests semantic duplication."
-                            })
-                processed_pairs.add((table1_name, table2_name))
-
-    # Clean up the output format for semantic_data_match
-    for table_name in duplicates:
-        # Remove reverse entries if they exist, or structure as pairs
-        unique_semantic_matches = []
-        seen_combinations = set()
-        for match in duplicates[table_name]["semantic_data_match"]:
-            col1 = match['column1']
-            table2 = match['table2']
-            col2 = match['column2']
-            # Create a canonical representation for the pair to avoid duplicates
-            if (table_name, col1, table2, col2) not in seen_combinations and \
-               (table2, col2, table_name, col1) not in seen_combinations:
-                unique_semantic_matches.append(match)
-                seen_combinations.add((table_name, col1, table2, col2))
-                seen_combinations.add((table2, col2, table_name, col1)) # Mark reverse as seen too
-        duplicates[table_name]["semantic_data_match"] = unique_semantic_matches
+def find_duplicate_columns_enhanced(tables, all_table_columns, session, sample_limit=ANALYSIS_SAMPLE_LIMIT,
+                                    profiles=None, similarity_threshold=SEMANTIC_SIMILARITY_THRESHOLD,
+                                    num_perm=MINHASH_NUM_PERM, max_workers=SAMPLING_MAX_WORKERS,
+                                    max_per_table=SAMPLING_MAX_PER_TABLE, sampling_mode=SAMPLING_MODE):
+    """
+    Enhanced duplicate column detection with semantic analysis based on data content.
+
+    Columns that the table profiles report as entirely NULL are not sampled. `similarity_threshold`
+    and `num_perm` configure the Jaccard cut-off and MinHash signature size of the semantic check.
+    `sampling_mode` selects one query per table ("table"/"tablesample") or per column ("column").
+    Sampling runs on a thread pool bounded by `max_workers` overall and `max_per_table` per table;
+    with max_workers <= 1 it runs serially on `session`.
+    """
+    # First, collect column data samples for all columns in all tables
+    column_data_samples = collect_column_samples(tables, all_table_columns, session, sample_limit, profiles,
+                                                 max_workers, max_per_table, sampling_mode)
+
+    duplicates = find_name_duplicates(tables, all_table_columns)
+
+    # Semantic Data Duplicates (new logic)
+    # This checks for columns in different tables that have similar distinct data values,
+    # even if their names differ. MinHash/LSH narrows the candidates before the exact check.
+    semantic_matches = find_semantic_matches(tables, column_data_samples, similarity_threshold, num_perm)
+    for table_name, matches in semantic_matches.items():
+        duplicates[table_name]["semantic_data_match"] = matches
 
     return duplicates
 
 
-def identify_table_specific_columns(tables, all_table_columns, session):
-    """Identify most important columns for each specific service type"""
+def find_semantic_matches(tables, column_data_samples, similarity_threshold=SEMANTIC_SIMILARITY_THRESHOLD,
+                          num_perm=MINHASH_NUM_PERM):
+    """
+    Finds cross-table column pairs whose sampled values have a Jaccard similarity above the threshold.
+
+    Every non-empty column sample gets a MinHash signature and is inserted into an LSH band index;
+    only the pairs that share a band bucket are compared with exact set operations.
+
+    Args:
+        tables (list): Table names, in report order.
+        column_data_samples (dict): Mapping of {table: {column_name: set_of_sample_values}}.
+        similarity_threshold (float): Minimum Jaccard similarity (exclusive) for a match.
+        num_perm (int): MinHash signature length; larger values trade speed for fewer missed pairs.
+
+    Returns:
+        dict: Mapping of table name to its list of semantic match dictionaries. Each pair is
+              reported once, under the table that comes first in `tables`.
+    """
+    hasher = MinHasher(num_perm=num_perm)
+    index = LSHIndex(similarity_threshold, num_perm=num_perm)
+
+    positions = {}
+    for table_idx, table_name in enumerate(tables):
+        for col_idx, (col_name, sample) in enumerate(column_data_samples[table_name].items()):
+            if not sample:  # Skip if no data
+                continue
+            key = (table_idx, col_idx)
+            positions[key] = (table_name, col_name)
+            index.insert(key, hasher.signature(sample))
+
+    matches = {table_name: [] for table_name in tables}
+    # Sorting keeps the report in table/column order regardless of bucket order
+    for key1, key2 in sorted(tuple(sorted(pair)) for pair in index.candidate_pairs()):
+        if key1[0] == key2[0]:  # Only cross-table pairs are reported
+            continue
+        table1_name, col1_name = positions[key1]
+        table2_name, col2_name = positions[key2]
+        col1_sample = column_data_samples[table1_name][col1_name]
+        col2_sample = column_data_samples[table2_name][col2_name]
+
+        # Jaccard similarity: |A intersect B| / |A union B|
+        intersection = len(col1_sample & col2_sample)
+        jaccard_similarity = intersection / (len(col1_sample) + len(col2_sample) - intersection)
+        if jaccard_similarity > similarity_threshold:
+            matches[table1_name].append({
+                'column1': col1_name,
+                'table2': table2_name,
+                'column2': col2_name,
+                'similarity': f"{jaccard_similarity:.2f}",
+                'reason': f"High data overlap ({jaccard_similarity:.2f}) suggests semantic duplication."
+            })
+
+    return matches
+
+
+def identify_table_specific_columns(tables, all_table_columns, session, profiles=None):
+    """Identify most important columns for each specific service type, skipping columns with no data"""
     service_specific = {}
 
     service_priorities = {
@@ -289,7 +465,14 @@ def identify_table_specific_columns(tables, all_table_columns, session):
             'configuration_specific': []
         }
 
-        available_columns = [col['name'].lower() for col in all_table_columns[table]]
+        table_profile = profiles.get(table) if profiles else None
+        available_columns = []
+        for col in all_table_columns[table]:
+            col_profile = table_profile.get(col['name']) if table_profile else None
+            # A column with no values at all cannot drive service selection
+            if col_profile is not None and col_profile.is_empty and table_profile.row_count > 0:
+                continue
+            available_columns.append(col['name'].lower())
 
         if table in service_priorities:
             for priority_col in service_priorities[table]:
@@ -307,10 +490,14 @@ def identify_table_specific_columns(tables, all_table_columns, session):
     return service_specific
 
 
-def identify_redundant_columns(tables, all_table_columns, session):
+def identify_redundant_columns(tables, all_table_columns, session, profiles=None):
     """Identify potentially redundant columns including empty/near-empty ones."""
     redundant = {}
 
+    # Null fractions come from one aggregate scan per table instead of two queries per column
+    if profiles is None:
+        profiles = profile_tables(session, tables, all_table_columns)
+
     for table in tables:
         redundant[table] = {
             'likely_redundant': [],
@@ -345,38 +532,37 @@ def identify_redundant_columns(tables, all_table_columns, session):
         # For example, if more than 95% of its values are NULL
         EMPTY_COLUMN_THRESHOLD = 0.95
 
-        for col_name in columns:
-            # Query to count NULLs and total rows for the column
-            try:
-                # Get total row count for the table
-                row_count_query = text(f"SELECT COUNT(*) FROM \"{table}\"")
-                total_rows = session.execute(row_count_query).scalar()
-
-                if total_rows == 0: # Handle empty tables
-                    continue
+        table_profile = profiles.get(table)
+        if table_profile is None or table_profile.row_count == 0:  # Handle empty tables
+            continue
 
-                # Count non-NULL values for the column
-                non_null_count_query = text(f"SELECT COUNT(\"{col_name}\") FROM \"{table}\"")
-                non_null_count = session.execute(non_null_count_query).scalar()
+        for col_name in columns:
+            col_profile = table_profile.get(col_name)
+            if col_profile is None:
+                # The profiler already reported why this column could not be scanned
+                print(f"Warning: Could not check emptiness for column '{col_name}' in table '{table}'.")
+                continue
 
-                # Calculate null percentage
-                null_percentage = (total_rows - non_null_count) / total_rows
+            null_percentage = col_profile.null_fraction
 
-                if null_percentage >= EMPTY_COLUMN_THRESHOLD:
-                    redundant[table]['likely_redundant'].append({
-                        'column': col_name,
-                        'reason': f'Empty/Near-empty column ({null_percentage:.2%} nulls) - contains mostly null values'
-                    })
-            except Exception as e:
-                # Handle cases where column might not exist or other query errors
-                print(f"Warning: Could not check emptiness for column '{col_name}' in table '{table}'. Error: {e}")
-                continue
+            if null_percentage >= EMPTY_COLUMN_THRESHOLD:
+                redundant[table]['likely_redundant'].append({
+                    'column': col_name,
+                    'reason': f'Empty/Near-empty column ({null_percentage:.2%} nulls) - contains mostly null values'
+                })
 
     return redundant
 
 
-def print_analysis_report(analysis_results):
-    """Print a comprehensive analysis report"""
+def print_analysis_report(analysis_results, tables=None):
+    """
+    Print a comprehensive analysis report
+
+    Args:
+        analysis_results (dict): The result of comprehensive_table_analysis.
+        tables (list, optional): The analyzed tables (defaults to ANALYSIS_TABLES).
+    """
+    tables = list(tables or ANALYSIS_TABLES)
     print("=" * 80)
     print("COMPREHENSIVE DATABASE ANALYSIS REPORT")
     print("=" * 80)
@@ -402,17 +588,18 @@ def print_analysis_report(analysis_results):
     print("\n2. SHARED ESSENTIAL COLUMNS ACROSS SERVICES")
     print("-" * 50)
 
-    shared_columns = find_shared_columns(
-        tables=["aws-ec2-proc", "aws-s3-proc", "aws-rds-full", "aws-lambda-full"],
-        min_occurrence=4
-    )
+    # A column counts as shared when every analyzed table has it
+    min_occurrence = len(tables)
+    shared_columns = find_shared_columns(tables=tables, min_occurrence=min_occurrence) if len(tables) > 1 else []
 
     if shared_columns:
-        print(f"\nColumns appearing in at least 3 out of 4 tables:\n")
+        print(f"\nColumns appearing in all {min_occurrence} tables:\n")
         for col in shared_columns:
             print(f"  - {col['column']}  |  Appears in {col['count']} tables: {', '.join(col['tables'])}")
+    elif len(tables) > 1:
+        print(f"  No shared columns found across all {min_occurrence} tables.")
     else:
-        print("  No shared columns found across 3 or more tables.")
+        print("  Only one table was analyzed.")
 
     # Question 3: Table-specific columns
     print("\n\n3. MOST IMPORTANT TABLE-SPECIFIC COLUMNS")
@@ -440,13 +627,39 @@ def print_analysis_report(analysis_results):
 
 
 # Usage function for main.py
-def run_comprehensive_analysis():
-    """Main function to run the comprehensive analysis"""
-    tables = ["aws-ec2-proc", "aws-s3-proc", "aws-rds-full", "aws-lambda-full"]
+def run_comprehensive_analysis(force=False, trace=False, trace_file=None, tables=None,
+                               max_workers=ANALYSIS_MAX_WORKERS):
+    """
+    Main function to run the comprehensive analysis.
 
-    print("Starting comprehensive database analysis...")
-    results = comprehensive_table_analysis(tables)
+    Args:
+        force (bool): Ignore cached per-table results.
+        trace (bool): Record per-statement latency and phase timings and print a summary at the end.
+        trace_file (str, optional): Also write the trace as Chrome-trace JSON to this path (implies trace).
+        tables (list, optional): Tables to analyze (defaults to ANALYSIS_TABLES).
+        max_workers (int): Tables analyzed concurrently.
+    """
+    tables = list(tables or ANALYSIS_TABLES)
+    trace = trace or bool(trace_file)
+
+    if trace:
+        enable_tracing()
 
-    print_analysis_report(results)
+    print("Starting comprehensive database analysis...")
+    try:
+        with trace_phase("comprehensive_table_analysis"):
+            results = comprehensive_table_analysis(tables, force=force, max_workers=max_workers)
+
+        with trace_phase("report"):
+            print_analysis_report(results, tables)
+        print(f"\nDatabase connections opened: {get_connection_count()}")
+
+        if trace:
+            print_trace_summary()
+            if trace_file:
+                write_chrome_trace(trace_file)
+    finally:
+        if trace:
+            disable_tracing()
 
     return results
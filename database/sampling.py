@@ -0,0 +1,223 @@
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+from database.connection import get_db_engine, session_scope
+from database.instrumentation import attach_phase, current_phase
+
+# Keep SAMPLING_MAX_WORKERS within DB_POOL_SIZE + DB_MAX_OVERFLOW, or workers will queue for connections
+SAMPLING_MAX_WORKERS = 8
+SAMPLING_MAX_PER_TABLE = 4
+
+# "column": one DISTINCT query per column (works on any dialect, used as the fallback)
+# "table": one query per table that unpivots every row with jsonb_each_text (PostgreSQL only)
+# "tablesample": like "table", but reads a TABLESAMPLE SYSTEM subset of the table's pages
+SAMPLING_MODES = ("column", "table", "tablesample")
+SAMPLING_MODE = "table"
+TABLESAMPLE_PERCENT = 10
+
+
+def fetch_distinct_column_values(session, table_name, column_name, limit=100):
+    """Fetches a sample of distinct non-null values from a column."""
+    try:
+        query = text(
+            f'SELECT DISTINCT "{column_name}" FROM "{table_name}" WHERE "{column_name}" IS NOT NULL LIMIT {limit}'
+        )
+        result = session.execute(query).fetchall()
+        # Convert to a set for faster comparison
+        return {str(row[0]) for row in result}
+    except Exception as e:
+        # A failed statement aborts the transaction; reset it so the session stays usable
+        session.rollback()
+        print(f"Error fetching distinct values for {table_name}.{column_name}: {e}")
+        return set()
+
+
+def fetch_table_samples(session, table_name, columns, limit=100, sample_percent=None):
+    """
+    Fetches up to `limit` distinct non-null values for every listed column of a table in one statement.
+
+    Rows are unpivoted into (column, value) pairs with jsonb_each_text, so PostgreSQL deduplicates
+    and caps the values per column server-side. Values are compared in their JSON text form,
+    which differs from str() for some types (e.g. booleans, timestamps) but is consistent
+    across tables sampled the same way.
+
+    Args:
+        session: An active SQLAlchemy session on a PostgreSQL database.
+        table_name (str): The table to sample.
+        columns (list): Column names to return samples for.
+        limit (int): Maximum number of distinct values per column.
+        sample_percent (float, optional): If set, read only this percentage of the table's pages
+                                          with TABLESAMPLE SYSTEM.
+
+    Returns:
+        dict: Mapping of column name to a set of sample values (columns without values are omitted).
+
+    Raises:
+        sqlalchemy.exc.SQLAlchemyError: If the statement fails; callers fall back to per-column sampling.
+    """
+    source = f'"{table_name}" AS row_data'
+    if sample_percent:
+        source += f" TABLESAMPLE SYSTEM ({float(sample_percent)})"
+
+    query = text(f"""
+        SELECT key, value FROM (
+            SELECT key, value, ROW_NUMBER() OVER (PARTITION BY key ORDER BY value) AS rn
+            FROM (
+                SELECT DISTINCT kv.key, kv.value
+                FROM {source}, jsonb_each_text(to_jsonb(row_data)) AS kv
+                WHERE kv.value IS NOT NULL AND kv.key = ANY(:columns)
+            ) AS distinct_values
+        ) AS ranked
+        WHERE rn <= :limit
+    """)
+
+    samples = defaultdict(set)
+    for key, value in session.execute(query, {"columns": list(columns), "limit": limit}):
+        samples[key].add(value)
+    return dict(samples)
+
+
+def _interleave(columns_by_table):
+    """Orders (table, column) jobs round-robin across tables so no table's cap stalls the pool."""
+    queues = [[(table, col_name) for col_name in columns] for table, columns in columns_by_table.items()]
+    jobs = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        jobs.extend(q[i] for q in queues if i < len(q))
+    return jobs
+
+
+def sample_columns_concurrently(columns_by_table, limit=500, max_workers=SAMPLING_MAX_WORKERS,
+                                max_per_table=SAMPLING_MAX_PER_TABLE):
+    """
+    Samples distinct values for many columns in parallel on a bounded thread pool.
+
+    Each job checks out its own session from the shared connection pool. A failing column
+    yields an empty sample and does not affect the others.
+
+    Args:
+        columns_by_table (dict): Mapping of table name to the column names to sample.
+        limit (int): Maximum number of distinct values to fetch per column.
+        max_workers (int): Global cap on concurrent queries.
+        max_per_table (int): Cap on concurrent queries against any single table.
+
+    Returns:
+        dict: Mapping of {table: {column_name: set_of_sample_values}}, in the input column order.
+    """
+    samples = defaultdict(dict)
+    for table, columns in columns_by_table.items():
+        for col_name in columns:
+            samples[table][col_name] = set()
+
+    table_slots = {table: threading.Semaphore(max_per_table) for table in columns_by_table}
+    phase = current_phase()
+
+    def _sample(table, col_name):
+        with table_slots[table], attach_phase(phase):
+            with session_scope() as session:
+                return fetch_distinct_column_values(session, table, col_name, limit)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sampler") as executor:
+        futures = {executor.submit(_sample, table, col_name): (table, col_name)
+                   for table, col_name in _interleave(columns_by_table)}
+        for future, (table, col_name) in futures.items():
+            try:
+                samples[table][col_name] = future.result()
+            except Exception as e:
+                print(f"Error fetching distinct values for {table}.{col_name}: {e}")
+
+    return samples
+
+
+def _sample_tables_set_based(columns_by_table, limit, sample_percent, max_workers, session=None):
+    """Runs fetch_table_samples for each table and returns (samples, tables_that_failed)."""
+    samples = defaultdict(dict)
+    failed = []
+
+    def _sample(table, columns, table_session):
+        try:
+            return fetch_table_samples(table_session, table, columns, limit, sample_percent)
+        except Exception as e:
+            table_session.rollback()
+            print(f"Set-based sampling failed for {table}, falling back to per-column queries: {e}")
+            return None
+
+    phase = current_phase()
+
+    def _sample_in_own_session(table, columns):
+        with attach_phase(phase), session_scope() as table_session:
+            return _sample(table, columns, table_session)
+
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(columns_by_table) or 1),
+                                thread_name_prefix="sampler") as executor:
+            futures = {table: executor.submit(_sample_in_own_session, table, columns)
+                       for table, columns in columns_by_table.items()}
+            results = {table: future.result() for table, future in futures.items()}
+    else:
+        results = {table: _sample(table, columns, session) for table, columns in columns_by_table.items()}
+
+    for table, table_samples in results.items():
+        if table_samples is None:
+            failed.append(table)
+            continue
+        for col_name in columns_by_table[table]:
+            samples[table][col_name] = table_samples.get(col_name, set())
+
+    return samples, failed
+
+
+def sample_columns(columns_by_table, limit=500, mode=SAMPLING_MODE, max_workers=SAMPLING_MAX_WORKERS,
+                   max_per_table=SAMPLING_MAX_PER_TABLE, session=None):
+    """
+    Collects distinct value samples for the given columns using the selected sampling mode.
+
+    The set-based modes issue one statement per table and need PostgreSQL; on other dialects,
+    or for any table whose statement fails, the per-column queries are used instead.
+
+    Args:
+        columns_by_table (dict): Mapping of table name to the column names to sample.
+        limit (int): Maximum number of distinct values to fetch per column.
+        mode (str): One of SAMPLING_MODES.
+        max_workers (int): Global cap on concurrent queries; <= 1 runs serially on `session`.
+        max_per_table (int): Cap on concurrent per-column queries against any single table.
+        session (optional): Session used when sampling serially.
+
+    Returns:
+        dict: Mapping of {table: {column_name: set_of_sample_values}}, in the input column order.
+    """
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"Unknown sampling mode '{mode}'. Expected one of {', '.join(SAMPLING_MODES)}")
+
+    samples = defaultdict(dict)
+    for table, columns in columns_by_table.items():
+        for col_name in columns:
+            samples[table][col_name] = set()
+
+    remaining = columns_by_table
+    if mode != "column":
+        dialect = (session.bind if session is not None else get_db_engine()).dialect.name
+        if dialect == "postgresql":
+            sample_percent = TABLESAMPLE_PERCENT if mode == "tablesample" else None
+            set_based, failed = _sample_tables_set_based(columns_by_table, limit, sample_percent, max_workers,
+                                                         session)
+            for table, table_samples in set_based.items():
+                samples[table].update(table_samples)
+            remaining = {table: columns_by_table[table] for table in failed}
+        else:
+            print(f"Sampling mode '{mode}' requires PostgreSQL; using per-column sampling on {dialect}.")
+
+    if not remaining:
+        return samples
+
+    if max_workers > 1:
+        column_samples = sample_columns_concurrently(remaining, limit, max_workers, max_per_table)
+    else:
+        column_samples = {table: {col_name: fetch_distinct_column_values(session, table, col_name, limit)
+                                  for col_name in columns}
+                          for table, columns in remaining.items()}
+    for table, table_samples in column_samples.items():
+        samples[table].update(table_samples)
+
+    return samples
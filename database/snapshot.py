@@ -0,0 +1,406 @@
+"""
+Offline snapshots of the pricing tables.
+
+A snapshot directory holds one uncompressed Arrow IPC file per table, a SQLite mirror of the same
+rows and schema.json (the PostgreSQL column metadata and row counts). Arrow files are memory-mapped,
+so columnar readers such as the pricing engine use the page cache directly instead of copying.
+The analysis, exploration and export paths run their SQL unchanged against the SQLite mirror,
+opened read-only with memory-mapped I/O. No database server or network is involved, so a snapshot
+also works as a test fixture.
+
+The SQLite mirror is a second full copy of every row, so a snapshot takes roughly twice the disk
+space of the Arrow files alone. Running against it differs from the live database in a few ways:
+- Profiling has no pg_stats estimates, so distinct counts use the exact COUNT(DISTINCT) path,
+  which is slower on wide tables.
+- Booleans are stored as 0/1 integers, timestamps and dates as ISO-8601 text and numerics as
+  REAL, so sampled values, min/max lengths and exported cells can differ from the live tables.
+  schema.json keeps the source column types, so type-based checks still see the original types.
+The Arrow files keep NUMERIC values exact as decimal128(38, SNAPSHOT_DECIMAL_SCALE); only the
+mirror's REAL copy (and the pricing engine's float64 arrays) round them to double precision.
+
+Usage (from the repository root):
+    python -m database.snapshot create snapshot/
+    python -m database.snapshot info snapshot/
+    python main.py --snapshot snapshot/
+"""
+
+import argparse
+import datetime
+import decimal
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from sqlalchemy import text
+
+from database.catalog import SchemaCatalog, get_schema_catalog, invalidate_schema_catalog, set_schema_catalog
+from database.connection import configure_db_engine, get_db_engine
+from database.profiler import quote_identifier
+
+SNAPSHOT_TABLES = ["aws-ec2-proc", "aws-s3-proc", "aws-rds-full", "aws-lambda-full"]
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_CHUNK_SIZE = 50000
+SCHEMA_FILE = "schema.json"
+SQLITE_FILE = "snapshot.sqlite"
+ARROW_SUFFIX = ".arrow"
+# NUMERIC/DECIMAL columns are stored exactly as decimal128(38, SNAPSHOT_DECIMAL_SCALE); values with
+# more digits after the point are rounded to that scale
+SNAPSHOT_DECIMAL_SCALE = 18
+# Upper bound on the SQLite mirror's memory-mapped region; pages beyond it are read normally
+SQLITE_MMAP_SIZE = 1 << 34
+
+_active_snapshot = None
+_active_lock = threading.Lock()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError("Snapshots require pyarrow (pip install pyarrow)") from e
+    return pa
+
+
+def arrow_path(snapshot_dir, table):
+    return os.path.join(snapshot_dir, f"{table}{ARROW_SUFFIX}")
+
+
+def _arrow_type(pa, data_type):
+    """Maps a catalog column type (PostgreSQL or SQLite spelling) to the Arrow type it is stored as."""
+    data_type = str(data_type or "").lower()
+    if "timestamp" in data_type:
+        return pa.timestamp("us", tz="UTC") if "with time zone" in data_type else pa.timestamp("us")
+    if data_type == "date":
+        return pa.date32()
+    if "bool" in data_type:
+        return pa.bool_()
+    if "int" in data_type and "interval" not in data_type and "point" not in data_type:
+        return pa.int64()
+    if "numeric" in data_type or "decimal" in data_type:
+        return pa.decimal128(38, SNAPSHOT_DECIMAL_SCALE)
+    if any(name in data_type for name in ("real", "double", "float")):
+        return pa.float64()
+    return pa.string()
+
+
+_TRUE_TEXT = ("t", "true", "y", "yes", "1")
+_FALSE_TEXT = ("f", "false", "n", "no", "0")
+
+
+def _coerce_value(pa, arrow_type, value):
+    """Converts a value stored with another type (0/1 booleans, ISO-8601 text) to the column's type."""
+    if pa.types.is_boolean(arrow_type):
+        if isinstance(value, (int, float)):
+            return bool(value)
+        text_value = str(value).strip().lower()
+        if text_value in _TRUE_TEXT or text_value in _FALSE_TEXT:
+            return text_value in _TRUE_TEXT
+    elif pa.types.is_timestamp(arrow_type) and isinstance(value, str):
+        return datetime.datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    elif pa.types.is_date(arrow_type) and isinstance(value, str):
+        return datetime.date.fromisoformat(value.strip()[:10])
+    elif pa.types.is_decimal(arrow_type) and not isinstance(value, bool):
+        number = decimal.Decimal(value.strip() if isinstance(value, str) else str(value))
+        return number.quantize(decimal.Decimal(1).scaleb(-arrow_type.scale), context=decimal.Context(prec=76))
+    elif pa.types.is_integer(arrow_type):
+        number = value if isinstance(value, int) else float(value)
+        if isinstance(number, int) or number.is_integer():
+            return int(number)
+    raise ValueError(f"{value!r} is not a valid {arrow_type}")
+
+
+def _convert(pa, arrow_type, values):
+    """
+    Coerces fetched values to the column's Arrow type.
+
+    Values are converted one at a time only when the whole chunk does not fit, e.g. booleans
+    stored as 0/1 or timestamps stored as text.
+
+    Returns:
+        tuple: (pyarrow.Array, number of non-NULL values that could not be converted and became NULL).
+    """
+    if pa.types.is_floating(arrow_type):
+        converted = []
+        lost = 0
+        for value in values:
+            try:
+                converted.append(None if value is None else float(value))
+            except (TypeError, ValueError):
+                converted.append(None)
+                lost += 1
+        return pa.array(converted, type=arrow_type), lost
+    if pa.types.is_string(arrow_type):
+        return pa.array([None if value is None else (value if isinstance(value, str) else str(value))
+                         for value in values], type=arrow_type), 0
+    # Arrow truncates floats such as 3.5 when building an integer array, so those go value by value
+    exact_ints = not pa.types.is_integer(arrow_type) or all(type(value) is int for value in values if value is not None)
+    if exact_ints:
+        try:
+            return pa.array(values, type=arrow_type), 0
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            pass
+    converted = []
+    lost = 0
+    for value in values:
+        if value is None:
+            converted.append(None)
+            continue
+        try:
+            if pa.types.is_integer(arrow_type) and type(value) is not int:
+                raise pa.ArrowInvalid(f"{value!r} is not an integer")
+            converted.append(pa.scalar(value, type=arrow_type).as_py())
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            try:
+                converted.append(pa.scalar(_coerce_value(pa, arrow_type, value), type=arrow_type).as_py())
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError, TypeError, ValueError,
+                    decimal.InvalidOperation):
+                converted.append(None)
+                lost += 1
+    return pa.array(converted, type=arrow_type), lost
+
+
+def _sqlite_type(pa, arrow_type):
+    if pa.types.is_integer(arrow_type) or pa.types.is_boolean(arrow_type):
+        return "INTEGER"
+    if pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        return "REAL"
+    return "TEXT"
+
+
+def _sqlite_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
+
+
+def _write_arrow_table(connection, snapshot_dir, table, columns, chunk_size):
+    """Streams one table into an Arrow IPC file, one record batch per fetched chunk; returns the row count."""
+    pa = _require_pyarrow()
+    schema = pa.schema([(col['name'], _arrow_type(pa, col.get('type'))) for col in columns])
+    query = text(f"SELECT {', '.join(quote_identifier(col['name']) for col in columns)} "
+                 f"FROM {quote_identifier(table)}")
+    rows_written = 0
+    lost = dict.fromkeys(schema.names, 0)
+    tmp_path = arrow_path(snapshot_dir, table) + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        result = connection.execution_options(stream_results=True).execute(query)
+        for chunk in result.partitions(chunk_size):
+            column_values = list(zip(*chunk))
+            arrays = []
+            for field, values in zip(schema, column_values):
+                array, lost_values = _convert(pa, field.type, list(values))
+                arrays.append(array)
+                lost[field.name] += lost_values
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            rows_written += len(chunk)
+    os.replace(tmp_path, arrow_path(snapshot_dir, table))
+    for column, count in lost.items():
+        if count:
+            print(f"Warning: {count:,} values of {table}.{column} could not be stored as "
+                  f"{schema.field(column).type} and were written as NULL.")
+    return rows_written
+
+
+def open_snapshot_table(snapshot_dir, table):
+    """
+    Memory-maps a table's Arrow IPC file.
+
+    Returns:
+        pyarrow.Table: A table whose buffers point into the mapped file (no copy is made).
+    """
+    pa = _require_pyarrow()
+    with pa.memory_map(arrow_path(snapshot_dir, table), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def build_sqlite_mirror(snapshot_dir, tables=None):
+    """
+    (Re)builds the snapshot's SQLite mirror from its Arrow files.
+
+    Args:
+        snapshot_dir (str): Snapshot directory.
+        tables (list, optional): Tables to include; defaults to every table in schema.json.
+
+    Returns:
+        str: Path of the SQLite file.
+    """
+    pa = _require_pyarrow()
+    manifest = read_manifest(snapshot_dir)
+    tables = tables or list(manifest["tables"])
+    path = os.path.join(snapshot_dir, SQLITE_FILE)
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        for table in tables:
+            with pa.memory_map(arrow_path(snapshot_dir, table), "r") as source:
+                reader = pa.ipc.open_file(source)
+                schema = reader.schema
+                column_list = ", ".join(f"{quote_identifier(field.name)} {_sqlite_type(pa, field.type)}"
+                                        for field in schema)
+                connection.execute(f"CREATE TABLE {quote_identifier(table)} ({column_list})")
+                insert = (f"INSERT INTO {quote_identifier(table)} VALUES "
+                          f"({', '.join('?' for _ in schema)})")
+                for index in range(reader.num_record_batches):
+                    batch = reader.get_batch(index)
+                    columns = [column.to_pylist() for column in batch.columns]
+                    connection.executemany(insert, ([_sqlite_value(value) for value in row] for row in zip(*columns)))
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def create_snapshot(snapshot_dir, tables=None, chunk_size=SNAPSHOT_CHUNK_SIZE):
+    """
+    Dumps tables and their schema from the current database into a snapshot directory.
+
+    Each table is read with one streamed SELECT and written as an Arrow IPC file; schema.json
+    keeps the catalog's column metadata and fingerprint, and the SQLite mirror is built last.
+
+    Args:
+        snapshot_dir (str): Output directory (created if missing; existing files are replaced).
+        tables (list, optional): Tables to dump; defaults to SNAPSHOT_TABLES.
+        chunk_size (int): Rows fetched and written per record batch.
+
+    Returns:
+        dict: Mapping of table name to the number of rows written.
+
+    Raises:
+        sqlalchemy.exc.NoSuchTableError: If a table is not in the schema.
+        ImportError: If pyarrow is not installed.
+    """
+    _require_pyarrow()
+    tables = tables or SNAPSHOT_TABLES
+    os.makedirs(snapshot_dir, exist_ok=True)
+    catalog = get_schema_catalog()
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "fingerprint": catalog.fingerprint,
+        "tables": {}
+    }
+    row_counts = {}
+    with get_db_engine().connect() as connection:
+        manifest["source_dialect"] = connection.dialect.name
+        for table in tables:
+            start = time.perf_counter()
+            columns = catalog.get_columns(table)
+            row_counts[table] = _write_arrow_table(connection, snapshot_dir, table, columns, chunk_size)
+            manifest["tables"][table] = {"rows": row_counts[table], "columns": columns}
+            print(f"  {table}: {row_counts[table]:,} rows in {time.perf_counter() - start:.2f}s")
+
+    with open(os.path.join(snapshot_dir, SCHEMA_FILE), "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    build_sqlite_mirror(snapshot_dir, tables)
+    return row_counts
+
+
+def read_manifest(snapshot_dir):
+    """
+    Reads a snapshot's schema.json.
+
+    Raises:
+        FileNotFoundError: If the directory has no schema.json.
+        ValueError: If the snapshot was written by an incompatible version.
+    """
+    with open(os.path.join(snapshot_dir, SCHEMA_FILE), "r") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format_version')} in {snapshot_dir}")
+    return manifest
+
+
+def use_snapshot(snapshot_dir):
+    """
+    Points the process at a snapshot instead of the live database.
+
+    The shared engine is reconfigured to the read-only SQLite mirror with memory-mapped I/O, and
+    the schema catalog is taken from schema.json, so every session_scope/get_db_engine caller
+    (analysis, exploration, export) reads the snapshot and the catalog reports the source column
+    types. The stored values follow the SQLite mirror's types (see the module docstring).
+
+    Args:
+        snapshot_dir (str): A directory written by create_snapshot.
+
+    Returns:
+        dict: The snapshot manifest.
+    """
+    manifest = read_manifest(snapshot_dir)
+    sqlite_path = os.path.abspath(os.path.join(snapshot_dir, SQLITE_FILE))
+    if not os.path.exists(sqlite_path):
+        raise FileNotFoundError(f"No SQLite mirror in {snapshot_dir}; rebuild it with build_sqlite_mirror")
+
+    def connect():
+        connection = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True, check_same_thread=False)
+        connection.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        return connection
+
+    global _active_snapshot
+    with _active_lock:
+        configure_db_engine(f"sqlite:///{sqlite_path}", creator=connect)
+        invalidate_schema_catalog()
+        set_schema_catalog(SchemaCatalog({table: info["columns"] for table, info in manifest["tables"].items()},
+                                         manifest.get("fingerprint")))
+        _active_snapshot = os.path.abspath(snapshot_dir)
+    return manifest
+
+
+def get_active_snapshot():
+    """Returns the directory of the snapshot in use, or None when running against the live database."""
+    return _active_snapshot
+
+
+def clear_snapshot():
+    """Goes back to the live database configured through the DB_* variables."""
+    global _active_snapshot
+    with _active_lock:
+        configure_db_engine(None)
+        invalidate_schema_catalog()
+        _active_snapshot = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Create or inspect offline snapshots of the pricing tables.",
+        epilog="A snapshot stores each table twice: as Arrow files for the pricing engine and as a SQLite "
+               "mirror for analysis, exploration and export, so it needs about twice the disk space. In the "
+               "mirror, booleans are 0/1, timestamps are ISO-8601 text and distinct counts are exact.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create = subparsers.add_parser("create", help="Dump the pricing tables from the database (Arrow files plus a "
+                                                  "SQLite copy)")
+    create.add_argument("snapshot_dir")
+    create.add_argument("--tables", help="Comma-separated tables (default: the four pricing tables)")
+    create.add_argument("--chunk-size", type=int, default=SNAPSHOT_CHUNK_SIZE)
+    info = subparsers.add_parser("info", help="Show a snapshot's tables and row counts")
+    info.add_argument("snapshot_dir")
+    args = parser.parse_args(argv)
+
+    if args.command == "create":
+        start = time.perf_counter()
+        print(f"Writing snapshot to {args.snapshot_dir}...")
+        tables = args.tables.split(",") if args.tables else None
+        row_counts = create_snapshot(args.snapshot_dir, tables, args.chunk_size)
+        print(f"Snapshot of {len(row_counts)} tables ({sum(row_counts.values()):,} rows) written in "
+              f"{time.perf_counter() - start:.2f}s")
+    else:
+        manifest = read_manifest(args.snapshot_dir)
+        print(f"Snapshot created {manifest['created']} from {manifest.get('source_dialect')}")
+        for table, table_info in manifest["tables"].items():
+            print(f"  {table}: {table_info['rows']:,} rows, {len(table_info['columns'])} columns")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,111 @@
-from database.queries import (find_duplicate_columns_enhanced, extract_columns,
-                              export_table_to_excel, comprehensive_table_analysis,
-                              run_comprehensive_analysis)
-from database.connection import get_db_session
-from sqlalchemy import text
-from api.openrouter import evaluate_all_architectures
-import pandas as pd
+"""
+Command-line entry point.
 
+Without a subcommand the interactive menu runs, as before. The subcommands (analyze, rank,
+explore, export, count, estimate) run one task without prompting, so they can be scripted or
+scheduled; pass --json for machine-readable output on stdout.
+
+Database, NumPy and HTTP modules are imported inside the functions that use them, so
+`python main.py rank --help` and the other argument-parsing paths start without loading them.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+ARCHITECTURES_PATH = "architectures.json"
+ARCHITECTURE_RESULTS_PATH = "architecture_results.jsonl"
+PRICED_ARCHITECTURES_PATH = "architectures_priced.json"
+DEFAULT_SNAPSHOT_DIR = "snapshot"
+
+# Column name fragments whose values explore shows samples of (at most two columns per fragment)
+EXPLORE_PATTERNS = ['price', 'cost', 'type', 'region', 'memory', 'cpu']
+
+
+def run_table_analysis(force=False, trace=False, trace_file=None, tables=None, max_workers=None,
+                       export_samples=None):
+    """
+    Run the comprehensive cloud cost and structure analysis (force=True recomputes every table).
+
+    export_samples is the number of rows per table to export to Excel afterwards; None asks.
+    """
+    from database.queries import run_comprehensive_analysis, export_table_to_excel, ANALYSIS_TABLES
 
-def run_table_analysis():
-    """Run the comprehensive cloud cost and structure analysis"""
     print("Running comprehensive database analysis...")
 
     # Perform full database analysis and export options
-    results = run_comprehensive_analysis()
+    trace_file = trace_file or os.getenv("ANALYSIS_TRACE_FILE") or None
+    options = {} if max_workers is None else {"max_workers": max_workers}
+    results = run_comprehensive_analysis(force=force, trace=trace, trace_file=trace_file, tables=tables, **options)
 
     # Optional: Export sample data for manual inspection
-    export_sample_data = input("\nWould you like to export sample data to Excel? (y/n): ")
-    if export_sample_data.lower() == 'y':
-        tables = ["aws-ec2-proc", "aws-s3-proc", "aws-rds-full", "aws-lambda-full"]
-        for table in tables:
-            export_table_to_excel(table, limit=100)  # Export first 100 rows
+    if export_samples is None:
+        export_sample_data = input("\nWould you like to export sample data to Excel? (y/n): ")
+        export_samples = 100 if export_sample_data.lower() == 'y' else 0  # Export first 100 rows
+    if export_samples:
+        for table in tables or ANALYSIS_TABLES:
+            export_table_to_excel(table, limit=export_samples)
 
     return results
 
 
-def explore_specific_table(table_name):
+def run_ranking(architectures_path=None, output_path=ARCHITECTURE_RESULTS_PATH, use_cache=True, top=None):
+    """
+    Ranks the architectures and records them in the ranking store.
+
+    Defaults to the priced architectures file when it exists, so the LLM sees the cost estimates.
+
+    Returns:
+        list: The stored results of the evaluated architectures, best first (only the best `top` if given).
+    """
+    from api.openrouter import evaluate_architectures_stream
+    from api.ranking_store import RankingStore
+
+    if architectures_path is None:
+        architectures_path = PRICED_ARCHITECTURES_PATH if os.path.exists(PRICED_ARCHITECTURES_PATH) \
+            else ARCHITECTURES_PATH
+    print(f"Ranking architectures from {architectures_path}")
+
+    # Results are written to JSONL and the ranking store as they complete. The leaderboard is read back
+    # from the store, so an architecture whose evaluation failed this run keeps its stored score.
+    store = RankingStore()
+    try:
+        results = evaluate_architectures_stream(architectures_path, output_path=output_path, use_cache=use_cache)
+        ranked = store.rank((result["Architecture"] for result in store.record(results)), k=top)
+        print(f"\nFull results written to {output_path}")
+        print(f"Rankings stored in {store.path} ({store.count()} architectures, "
+              f"{len(store.workplans())} workplans)")
+    finally:
+        store.close()
+    return ranked
+
+
+def print_ranking(ranked):
+    print("\nRanked Architectures:")
+    for i, arch in enumerate(ranked, start=1):
+        name = arch.get("Architecture", "Unnamed Architecture")
+        overall = arch.get("overall")
+        score_display = f"{overall:.2f}" if isinstance(overall, (int, float)) else "N/A"
+        print(f"{i}. {name} — Overall Score: {score_display}")
+
+
+def run_cost_estimation(input_path=ARCHITECTURES_PATH, output_path=PRICED_ARCHITECTURES_PATH):
+    """
+    Writes a copy of the architectures with component_pricing and monthly totals filled in.
+
+    The ranking uses that copy when it exists, so the LLM sees the cost estimates.
+    """
+    from pricing.estimator import estimate_architecture_costs
+
+    return estimate_architecture_costs(input_path, output_path)
+
+
+def explore_specific_table(table_name, limit=3, sample_limit=5):
     """Helper function to explore a specific table in detail"""
+    from database.queries import extract_columns
+
     print(f"\n=== EXPLORING TABLE: {table_name} ===")
 
     # Show basic info
@@ -36,46 +116,86 @@ def explore_specific_table(table_name):
     print(f"Columns ({len(columns)}): {', '.join(columns)}")
 
     # Show sample data
-    fetch_table_data(table_name, limit=3)
+    fetch_table_data(table_name, limit=limit)
 
     # Show some specific column samples
-    important_patterns = ['price', 'cost', 'type', 'region', 'memory', 'cpu']
-    for pattern in important_patterns:
+    for col in sample_column_names(columns):
+        fetch_column_data(table_name, col, limit=sample_limit)
+
+
+def describe_table(table_name, limit=3, sample_limit=5):
+    """
+    Collects what explore_specific_table prints, for JSON output.
+
+    Returns:
+        dict: 'table', 'row_count', 'columns', the first `limit` 'rows' and up to `sample_limit`
+              distinct 'samples' of each column matching EXPLORE_PATTERNS.
+    """
+    from database.queries import extract_columns
+
+    columns = extract_columns(table_name)
+    column_names, rows = query_table_rows(table_name, limit)
+    return {
+        "table": table_name,
+        "row_count": count_table_rows(table_name),
+        "columns": columns,
+        "rows": [dict(zip(column_names, row)) for row in rows],
+        "samples": {col: query_column_values(table_name, col, sample_limit) for col in sample_column_names(columns)},
+    }
+
+
+def sample_column_names(columns):
+    """Columns whose values explore shows samples of, in EXPLORE_PATTERNS order."""
+    names = []
+    for pattern in EXPLORE_PATTERNS:
         matching_cols = [col for col in columns if pattern.lower() in col.lower()]
-        for col in matching_cols[:2]:  # Max 2 columns per pattern
-            fetch_column_data(table_name, col, limit=5)
+        names.extend(matching_cols[:2])  # Max 2 columns per pattern
+    return names
+
+
+def query_column_values(table_name, column_name, limit=10):
+    """Returns up to `limit` distinct non-null values of a column."""
+    from sqlalchemy import text
+    from database.connection import session_scope
+
+    with session_scope() as session:
+        query = text(
+            f'SELECT DISTINCT "{column_name}" FROM "{table_name}" WHERE "{column_name}" IS NOT NULL LIMIT {limit}')
+        return [row[0] for row in session.execute(query)]
+
+
+def query_table_rows(table_name, limit=5):
+    """Returns (column names, rows) for the first `limit` rows of a table."""
+    from sqlalchemy import text
+    from database.connection import session_scope
+
+    with session_scope() as session:
+        result = session.execute(text(f'SELECT * FROM "{table_name}" LIMIT {limit}'))
+        return list(result.keys()), [tuple(row) for row in result]
 
 
 def fetch_column_data(table_name, column_name, limit=10):
     """Fetch and print data from a specified column"""
-    session = get_db_session()
     try:
-        query = text(
-            f'SELECT DISTINCT "{column_name}" FROM "{table_name}" WHERE "{column_name}" IS NOT NULL LIMIT {limit}')
-        result = session.execute(query)
+        values = query_column_values(table_name, column_name, limit)
 
         print(f"\n--- Sample '{column_name}' values from {table_name} ---")
-        for row in result:
-            print(f"  {row[0]}")
+        for value in values:
+            print(f"  {value}")
     except Exception as e:
         print(f"Error fetching '{column_name}' from {table_name}: {e}")
-    finally:
-        session.close()
 
 
 def fetch_table_data(table_name, limit=5):
     """Fetch limited rows from a table"""
-    session = get_db_session()
     try:
-        query = text(f'SELECT * FROM "{table_name}" LIMIT {limit}')
-        result = session.execute(query)
+        column_names, rows = query_table_rows(table_name, limit)
 
-        column_names = result.keys()
         print(f"\n--- Sample data from {table_name} ---")
         print(f"Columns: {', '.join(column_names)}")
         print("-" * 50)
 
-        for i, row in enumerate(result, 1):
+        for i, row in enumerate(rows, 1):
             print(f"Row {i}:")
             for col_name, value in zip(column_names, row):
                 # Truncate long values for readability
@@ -84,27 +204,28 @@ def fetch_table_data(table_name, limit=5):
             print()
     except Exception as e:
         print(f"Error fetching data from {table_name}: {e}")
-    finally:
-        session.close()
 
 
 def count_table_rows(table_name):
     """Count rows in a table"""
-    session = get_db_session()
+    from sqlalchemy import text
+    from database.connection import session_scope
+
     try:
-        query = text(f'SELECT COUNT(*) FROM "{table_name}"')
-        row_count = session.execute(query).scalar_one()
-        return row_count
+        with session_scope() as session:
+            query = text(f'SELECT COUNT(*) FROM "{table_name}"')
+            row_count = session.execute(query).scalar_one()
+            return row_count
     except Exception as e:
         print(f"Error counting rows in {table_name}: {e}")
         return -1
-    finally:
-        session.close()
 
 
 def interactive_exploration():
     """Interactive mode for exploring specific aspects"""
-    tables = ["aws-ec2-proc", "aws-s3-proc", "aws-rds-full", "aws-lambda-full"]
+    from database.queries import export_table_to_excel, ANALYSIS_TABLES
+
+    tables = ANALYSIS_TABLES
 
     while True:
         print("\n" + "=" * 50)
@@ -156,34 +277,197 @@ def interactive_exploration():
             print("Invalid choice")
 
 
-if __name__ == "__main__":
+def interactive_menu(force_analysis=False, trace_analysis=False, use_llm_cache=True):
     print("Choose mode:")
     print("1. Run database analysis (Part 1)")
     print("2. Run architecture ranking (Part 2)")
     print("3. Interactive exploration (optional)")
+    print("4. Estimate architecture costs")
 
-    choice = input("Enter your choice (1/2/3): ").strip()
+    choice = input("Enter your choice (1/2/3/4): ").strip()
 
     if choice == "1":
-        run_table_analysis()  # runs run_comprehensive_analysis + optional Excel export prompt
+        run_table_analysis(force=force_analysis, trace=trace_analysis)  # runs run_comprehensive_analysis + optional Excel export prompt
 
     elif choice == "2":
-        results = evaluate_all_architectures("architectures.json")
-        ranked = sorted(results, key=lambda x: (x["overall"] is not None, x["overall"]), reverse=True)
-
-        print("\nRanked Architectures:")
-        for i, arch in enumerate(ranked, start=1):
-            name = arch.get("Architecture", "Unnamed Architecture")
-            overall = arch.get("overall")
-            score_display = f"{overall:.2f}" if isinstance(overall, (int, float)) else "N/A"
-            print(f"{i}. {name} — Overall Score: {score_display}")
-
-        # Optionally export to CSV
-        # pd.DataFrame(ranked).to_csv("architecture_rankings.csv", index=False)
+        print_ranking(run_ranking(use_cache=use_llm_cache))
 
     elif choice == "3":
         interactive_exploration()
 
+    elif choice == "4":
+        run_cost_estimation()
+
     else:
         print("Invalid option.")
 
+
+def _json_default(value):
+    import dataclasses
+
+    # Table profiles are dataclasses, column samples are sets; anything else (Decimal, dates) as text
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def print_json(value):
+    json.dump(value, sys.stdout, indent=2, default=_json_default)
+    sys.stdout.write("\n")
+
+
+def _human_output(args):
+    # With --json, stdout carries only the JSON document; progress and reports go to stderr
+    return contextlib.redirect_stdout(sys.stderr) if getattr(args, "json", False) else contextlib.nullcontext()
+
+
+def _split_tables(value):
+    return [table.strip() for table in value.split(",") if table.strip()]
+
+
+def cmd_analyze(args):
+    with _human_output(args):
+        results = run_table_analysis(force=args.force, trace=args.trace, trace_file=args.trace_file,
+                                     tables=args.tables, max_workers=args.workers,
+                                     export_samples=args.export_samples)
+    if args.json:
+        print_json(results)
+    return 0
+
+
+def cmd_rank(args):
+    with _human_output(args):
+        ranked = run_ranking(args.input, args.output, use_cache=not args.no_cache, top=args.top or None)
+    if args.json:
+        print_json(ranked)
+    else:
+        print_ranking(ranked)
+    return 0
+
+
+def cmd_explore(args):
+    if args.json:
+        with _human_output(args):
+            description = describe_table(args.table, args.limit, args.sample_limit)
+        print_json(description)
+    else:
+        explore_specific_table(args.table, args.limit, args.sample_limit)
+    return 0
+
+
+def cmd_export(args):
+    from database.queries import export_table_to_excel
+
+    limit = args.limit or None  # 0 exports the whole table
+    row_count = export_table_to_excel(args.table, file_name=args.file, limit=limit, fmt=args.format)
+    return 0 if row_count is not None else 1
+
+
+def cmd_count(args):
+    from database.queries import ANALYSIS_TABLES
+
+    with _human_output(args):
+        counts = {table: count_table_rows(table) for table in args.tables or ANALYSIS_TABLES}
+    if args.json:
+        print_json(counts)
+    else:
+        for table, count in counts.items():
+            print(f"{table}: {count:,} rows")
+    return 1 if any(count < 0 for count in counts.values()) else 0
+
+
+def cmd_estimate(args):
+    with _human_output(args):
+        stats = run_cost_estimation(args.input, args.output)
+    if args.json:
+        print_json(stats)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Cloud cost analyzer. Runs the interactive menu when no command is given.")
+    parser.add_argument("--snapshot", metavar="DIR",
+                        help="Read the pricing tables from an offline snapshot "
+                             f"(python -m database.snapshot create {DEFAULT_SNAPSHOT_DIR}). Analysis, explore "
+                             "and export run on its SQLite copy, where booleans are 0/1, timestamps are text "
+                             "and distinct counts are exact")
+    # Menu options; the analyze and rank commands take them too
+    parser.add_argument("--force", action="store_true", help="Bypass the per-table analysis cache")
+    parser.add_argument("--trace", action="store_true",
+                        help="Print per-phase timings and the slowest queries after the analysis")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-query the LLM for every architecture instead of reusing cached responses")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    analyze = commands.add_parser("analyze", help="Run the database analysis")
+    # SUPPRESS keeps a flag given before the command from being reset by the command's default
+    analyze.add_argument("--force", action="store_true", default=argparse.SUPPRESS,
+                         help="Bypass the per-table analysis cache")
+    analyze.add_argument("--trace", action="store_true", default=argparse.SUPPRESS,
+                         help="Print per-phase timings and the slowest queries")
+    analyze.add_argument("--trace-file", help="Also write the trace as Chrome-trace JSON (implies --trace)")
+    analyze.add_argument("--tables", type=_split_tables, help="Comma-separated tables (default: ANALYSIS_TABLES)")
+    analyze.add_argument("--workers", type=int, help="Tables analyzed at once (default: ANALYSIS_MAX_WORKERS)")
+    analyze.add_argument("--export-samples", type=int, default=0, metavar="ROWS",
+                         help="Export this many rows of every table to Excel afterwards")
+    analyze.add_argument("--json", action="store_true", help="Write the analysis results as JSON to stdout")
+    analyze.set_defaults(handler=cmd_analyze)
+
+    rank = commands.add_parser("rank", help="Rank the architectures with the LLM")
+    rank.add_argument("--input", help=f"Architectures file (default: {PRICED_ARCHITECTURES_PATH} if it exists, "
+                                      f"else {ARCHITECTURES_PATH})")
+    rank.add_argument("--output", default=ARCHITECTURE_RESULTS_PATH, help="JSONL file for the full results")
+    rank.add_argument("--no-cache", action="store_true", default=argparse.SUPPRESS,
+                      help="Re-query the LLM for every architecture")
+    rank.add_argument("--top", type=int, help="Only show the best N architectures")
+    rank.add_argument("--json", action="store_true", help="Write the ranked results as JSON to stdout")
+    rank.set_defaults(handler=cmd_rank)
+
+    explore = commands.add_parser("explore", help="Show a table's size, columns, first rows and value samples")
+    explore.add_argument("table")
+    explore.add_argument("--limit", type=int, default=3, help="Rows to show")
+    explore.add_argument("--sample-limit", type=int, default=5, help="Values per sampled column")
+    explore.add_argument("--json", action="store_true", help="Write the table description as JSON to stdout")
+    explore.set_defaults(handler=cmd_explore)
+
+    export = commands.add_parser("export", help="Export a table to Excel, CSV or Parquet")
+    export.add_argument("table")
+    export.add_argument("--file", help="Output file (default: <table>_data.<format>)")
+    export.add_argument("--limit", type=int, default=100, help="Rows to export; 0 exports the whole table")
+    export.add_argument("--format", choices=("xlsx", "csv", "parquet"), default="xlsx")
+    export.set_defaults(handler=cmd_export)
+
+    count = commands.add_parser("count", help="Count the rows of tables")
+    count.add_argument("tables", nargs="*", help="Tables to count (default: ANALYSIS_TABLES)")
+    count.add_argument("--json", action="store_true", help="Write the counts as JSON to stdout")
+    count.set_defaults(handler=cmd_count)
+
+    estimate = commands.add_parser("estimate", help="Estimate architecture costs from the pricing tables")
+    estimate.add_argument("--input", default=ARCHITECTURES_PATH, help="Architectures file")
+    estimate.add_argument("--output", default=PRICED_ARCHITECTURES_PATH, help="Priced copy to write")
+    estimate.add_argument("--json", action="store_true", help="Write the pricing stats as JSON to stdout")
+    estimate.set_defaults(handler=cmd_estimate)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.snapshot:
+        from database.snapshot import use_snapshot
+
+        manifest = use_snapshot(args.snapshot)
+        print(f"Using offline snapshot {args.snapshot} (created {manifest['created']})", file=sys.stderr)
+
+    if args.command is None:
+        interactive_menu(force_analysis=args.force, trace_analysis=args.trace, use_llm_cache=not args.no_cache)
+        return 0
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
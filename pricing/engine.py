@@ -0,0 +1,481 @@
+import re
+import threading
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.exc import NoSuchTableError
+
+from database.catalog import get_schema_catalog
+from database.connection import get_db_engine
+from database.profiler import quote_identifier
+from database.snapshot import get_active_snapshot, open_snapshot_table, read_manifest
+
+# Pricing tables by the component_type used in architectures.json
+PRICING_TABLES = {
+    "AmazonEC2": "aws-ec2-proc",
+    "AmazonS3": "aws-s3-proc",
+    "AmazonRDS": "aws-rds-full",
+    "AWSLambda": "aws-lambda-full",
+}
+
+LOAD_CHUNK_SIZE = 50000
+
+# Canonical column -> accepted source column names, compared without case, spaces or underscores.
+# The processed tables and the component configs spell the same attribute differently
+# ("region" / "region code", "instance_type" / "instancetype", ...).
+COLUMN_ALIASES = {
+    "sku": ("sku",),
+    "region": ("regioncode", "region"),
+    "instance_type": ("instancetype", "instanceclass"),
+    "engine": ("engine", "databaseengine"),
+    "storage_class": ("storageclass", "volumetype"),
+    "term_type": ("termtype",),
+    "operating_system": ("operatingsystem",),
+    "tenancy": ("tenancy",),
+    "capacity_status": ("capacitystatus",),
+    "unit": ("unit",),
+    "price": ("priceperunit", "price"),
+}
+
+# Stored as int32 codes into a shared string pool; every other column except sku and price is dropped
+CATEGORICAL_COLUMNS = ("region", "instance_type", "engine", "storage_class", "term_type", "operating_system",
+                       "tenancy", "capacity_status", "unit")
+
+# The first of these a table has is indexed together with the region
+PRIMARY_KEY_COLUMNS = ("instance_type", "storage_class", "engine")
+
+MISSING = -1
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def normalize_column_name(name):
+    return re.sub(r"[\s_]+", "", str(name).lower())
+
+
+def map_columns(column_names):
+    """
+    Matches source column names to canonical pricing columns.
+
+    Returns:
+        dict: Canonical column -> source column name, for the canonical columns the table has.
+    """
+    by_normalized = {}
+    for name in column_names:
+        by_normalized.setdefault(normalize_column_name(name), name)
+    mapping = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in by_normalized:
+                mapping[canonical] = by_normalized[alias]
+                break
+    return mapping
+
+
+def _to_price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class StringPool:
+    """Interns the values of one categorical column; lookups ignore case and surrounding spaces."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    @staticmethod
+    def _key(value):
+        return str(value).strip().lower()
+
+    def intern(self, value):
+        if value is None or value == "":
+            return MISSING
+        key = self._key(value)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self.values)
+            self.values.append(str(value))
+        return code
+
+    def code(self, value):
+        """Returns the code of a value, or None if no row has it."""
+        if value is None:
+            return None
+        return self._codes.get(self._key(value))
+
+    def decode(self, code):
+        return self.values[code] if code != MISSING else None
+
+    def __len__(self):
+        return len(self.values)
+
+
+class PriceTable:
+    """
+    Price rows of one service as columnar arrays, with a hash and a sorted index on (region, primary key).
+
+    Rows are ordered by (region, primary key, price) in `order`. The hash index maps a
+    (region code, primary code) pair to its slice of that order, so the common lookup is one dict
+    probe and its rows come out cheapest first. Region-only lookups binary-search the sorted region codes.
+    SKU lookups use a dict from SKU to its rows, built on first use.
+    """
+
+    def __init__(self, service, table, codes, prices, skus, pools):
+        self.service = service
+        self.table = table
+        self.codes = codes
+        self.prices = prices
+        self.skus = skus
+        self.pools = pools
+        self.primary = next((column for column in PRIMARY_KEY_COLUMNS if column in codes), None)
+        self._sku_index = None
+        self._build_indexes()
+
+    def __len__(self):
+        return len(self.prices)
+
+    def _build_indexes(self):
+        size = len(self.prices)
+        regions = self.codes.get("region", np.full(size, MISSING, dtype=np.int32))
+        primaries = self.codes[self.primary] if self.primary else np.full(size, MISSING, dtype=np.int32)
+        # NaN prices sort last within their group
+        self.order = np.lexsort((self.prices, primaries, regions))
+        self._sorted_regions = regions[self.order]
+        sorted_primaries = primaries[self.order]
+
+        self._slices = {}
+        if size:
+            changes = np.flatnonzero((self._sorted_regions[1:] != self._sorted_regions[:-1])
+                                     | (sorted_primaries[1:] != sorted_primaries[:-1])) + 1
+            starts = np.concatenate(([0], changes))
+            stops = np.concatenate((changes, [size]))
+            keys = zip(self._sorted_regions[starts].tolist(), sorted_primaries[starts].tolist())
+            self._slices = dict(zip(keys, zip(starts.tolist(), stops.tolist())))
+
+    def sku_rows(self, sku):
+        """Returns the indices of the rows with this SKU (one per term and offer), in table order."""
+        if self._sku_index is None:
+            index = {}
+            if self.skus is not None:
+                for row, value in enumerate(self.skus.tolist()):
+                    if value is not None:
+                        index.setdefault(str(value), []).append(row)
+            self._sku_index = {value: np.asarray(rows, dtype=np.intp) for value, rows in index.items()}
+        return self._sku_index.get(str(sku), np.empty(0, dtype=np.intp))
+
+    def match(self, sku=None, **filters):
+        """
+        Returns the indices of rows matching every filter, cheapest first.
+
+        Args:
+            sku (str, optional): Only consider the rows with this exact SKU.
+            **filters: Canonical categorical columns (see CATEGORICAL_COLUMNS) and the values they must
+                       equal, compared without case. None values are ignored. A filter on a column the
+                       table does not have matches nothing.
+
+        Raises:
+            ValueError: If a filter names an unknown column.
+        """
+        wanted = {}
+        for column, value in filters.items():
+            if column not in CATEGORICAL_COLUMNS:
+                raise ValueError(f"Unknown pricing column '{column}'. Expected one of {', '.join(CATEGORICAL_COLUMNS)}")
+            if value is None:
+                continue
+            code = self.pools[column].code(value) if column in self.codes else None
+            if code is None:
+                return np.empty(0, dtype=np.intp)
+            wanted[column] = code
+
+        region = primary = None
+        if sku is None:
+            region = wanted.pop("region", None)
+            primary = wanted.pop(self.primary, None) if self.primary else None
+        presorted = True
+        if sku is not None:
+            rows = self.sku_rows(sku)
+            presorted = False
+        elif region is not None and primary is not None:
+            start, stop = self._slices.get((region, primary), (0, 0))
+            rows = self.order[start:stop]
+        elif region is not None:
+            start = np.searchsorted(self._sorted_regions, region, side="left")
+            stop = np.searchsorted(self._sorted_regions, region, side="right")
+            rows = self.order[start:stop]
+            presorted = False
+        elif primary is not None:
+            rows = np.flatnonzero(self.codes[self.primary] == primary)
+            presorted = False
+        else:
+            rows = np.arange(len(self.prices))
+            presorted = False
+
+        for column, code in wanted.items():
+            if not len(rows):
+                break
+            rows = rows[self.codes[column][rows] == code]
+        if not presorted and len(rows) > 1:
+            rows = rows[np.argsort(self.prices[rows], kind="stable")]
+        return rows
+
+    def row(self, index):
+        """Returns one row as a dictionary of canonical column names."""
+        record = {"sku": self.skus[index] if self.skus is not None else None}
+        for column, codes in self.codes.items():
+            record[column] = self.pools[column].decode(int(codes[index]))
+        price = self.prices[index]
+        record["price"] = None if np.isnan(price) else float(price)
+        return record
+
+
+class PricingEngine:
+    """
+    In-memory pricing lookups over the aws-*-proc/full tables, with no database round trip per query.
+
+    Only the price-relevant columns are kept: categoricals as int32 codes into string pools shared
+    by all tables, prices as float64 and SKUs as an object array.
+
+    Example:
+        engine = get_pricing_engine()
+        engine.price("AmazonEC2", instance_type="m5.large", term_type="OnDemand", region="il-central-1")
+    """
+
+    def __init__(self):
+        self.pools = {column: StringPool() for column in CATEGORICAL_COLUMNS}
+        self.tables = {}
+
+    def add_table(self, service, table, columns):
+        """
+        Builds a service's price table from column data.
+
+        Args:
+            service (str): Service name the table is looked up by (e.g. 'AmazonEC2').
+            table (str): Source table name.
+            columns (dict): Source column name -> sequence of values; names are matched with map_columns
+                            and columns without a canonical meaning are ignored.
+
+        Returns:
+            PriceTable: The new table.
+
+        Raises:
+            ValueError: If no price column is found.
+        """
+        mapping = map_columns(columns)
+        if "price" not in mapping:
+            raise ValueError(f"No price column found in {table}")
+        prices = np.fromiter((_to_price(value) for value in columns[mapping["price"]]), dtype=np.float64)
+        codes = {}
+        for column in CATEGORICAL_COLUMNS:
+            if column in mapping:
+                intern = self.pools[column].intern
+                codes[column] = np.fromiter((intern(value) for value in columns[mapping[column]]),
+                                            dtype=np.int32, count=len(prices))
+        skus = np.asarray(columns[mapping["sku"]], dtype=object) if "sku" in mapping else None
+        price_table = PriceTable(service, table, codes, prices, skus, self.pools)
+        self.tables[service] = price_table
+        return price_table
+
+    def add_arrow_table(self, service, table, arrow_table):
+        """
+        Builds a service's price table from a pyarrow Table, such as a memory-mapped snapshot file.
+
+        Categoricals are mapped to pool codes with one vectorized take over each column's distinct
+        values; a float64 price column without nulls in a single record batch is used without copying.
+
+        Returns:
+            PriceTable: The new table.
+
+        Raises:
+            ValueError: If no price column is found.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        mapping = map_columns(arrow_table.column_names)
+        if "price" not in mapping:
+            raise ValueError(f"No price column found in {table}")
+        price_column = arrow_table.column(mapping["price"])
+        if pa.types.is_integer(price_column.type) or pa.types.is_floating(price_column.type) \
+                or pa.types.is_decimal(price_column.type):
+            price_column = pc.cast(price_column, pa.float64()).fill_null(np.nan)
+            prices = price_column.to_numpy()
+        else:
+            prices = np.fromiter((_to_price(value) for value in price_column.to_pylist()), dtype=np.float64)
+
+        codes = {}
+        for column in CATEGORICAL_COLUMNS:
+            if column not in mapping:
+                continue
+            values = pc.cast(arrow_table.column(mapping[column]), pa.string())
+            distinct = pc.unique(values)
+            intern = self.pools[column].intern
+            # Position len(distinct) stands for NULL
+            remap = np.fromiter((intern(value) for value in distinct.to_pylist()), dtype=np.int32,
+                                count=len(distinct))
+            remap = np.append(remap, np.int32(MISSING))
+            positions = pc.index_in(values, value_set=distinct).fill_null(len(distinct))
+            codes[column] = remap[positions.to_numpy()]
+        skus = arrow_table.column(mapping["sku"]).to_numpy(zero_copy_only=False) if "sku" in mapping else None
+        price_table = PriceTable(service, table, codes, prices, skus, self.pools)
+        self.tables[service] = price_table
+        return price_table
+
+    def services(self):
+        return list(self.tables)
+
+    def table(self, service):
+        """
+        Returns the price table of a service, by service name or source table name.
+
+        Raises:
+            KeyError: If the service has no loaded table.
+        """
+        if service in self.tables:
+            return self.tables[service]
+        for price_table in self.tables.values():
+            if price_table.table == service:
+                return price_table
+        raise KeyError(f"No pricing data loaded for '{service}'")
+
+    def match(self, service, **filters):
+        """Returns the indices of a service's rows matching the filters, cheapest first (see PriceTable.match)."""
+        return self.table(service).match(**filters)
+
+    def lookup(self, service, limit=None, **filters):
+        """
+        Returns matching price rows, cheapest first.
+
+        Args:
+            service (str): Service or table name.
+            limit (int, optional): Maximum number of rows.
+            **filters: Canonical column values to match, e.g. region='il-central-1', instance_type='m5.large',
+                       and optionally an exact sku.
+
+        Returns:
+            list: Row dictionaries with 'sku', the table's categorical columns and 'price'.
+        """
+        price_table = self.table(service)
+        rows = price_table.match(**filters)
+        if limit is not None:
+            rows = rows[:limit]
+        return [price_table.row(index) for index in rows]
+
+    def price(self, service, **filters):
+        """
+        Returns the lowest price per unit among the matching rows.
+
+        Returns:
+            float: The price, or None if nothing matches or no matching row has a price.
+        """
+        price_table = self.table(service)
+        rows = price_table.match(**filters)
+        if not len(rows):
+            return None
+        price = price_table.prices[rows[0]]
+        return None if np.isnan(price) else float(price)
+
+
+def load_pricing_engine(connection, tables=None, catalog=None, chunk_size=LOAD_CHUNK_SIZE):
+    """
+    Reads the price-relevant columns of the pricing tables into a PricingEngine.
+
+    Each table is read with a single streamed SELECT of the mapped columns, fetched in chunks.
+    Tables missing from the schema are skipped with a warning.
+
+    Args:
+        connection: An open SQLAlchemy connection.
+        tables (dict, optional): Service name -> table name; defaults to PRICING_TABLES.
+        catalog (SchemaCatalog, optional): Column metadata; defaults to the process-wide catalog.
+        chunk_size (int): Rows fetched per round trip.
+
+    Returns:
+        PricingEngine: The loaded engine.
+    """
+    tables = tables or PRICING_TABLES
+    catalog = catalog or get_schema_catalog()
+    engine = PricingEngine()
+    for service, table in tables.items():
+        try:
+            mapping = map_columns(catalog.column_names(table))
+        except NoSuchTableError:
+            print(f"Warning: Pricing table '{table}' not found; {service} prices are unavailable.")
+            continue
+        if "price" not in mapping:
+            print(f"Warning: No price column in '{table}'; {service} prices are unavailable.")
+            continue
+
+        source_columns = list(mapping.values())
+        query = text(f"SELECT {', '.join(quote_identifier(column) for column in source_columns)} "
+                     f"FROM {quote_identifier(table)}")
+        values = {column: [] for column in source_columns}
+        result = connection.execution_options(stream_results=True).execute(query)
+        while True:
+            rows = result.fetchmany(chunk_size)
+            if not rows:
+                break
+            for position, column in enumerate(source_columns):
+                values[column].extend(row[position] for row in rows)
+        engine.add_table(service, table, values)
+    return engine
+
+
+def load_pricing_engine_from_snapshot(snapshot_dir, tables=None):
+    """
+    Builds a PricingEngine from the memory-mapped Arrow files of an offline snapshot (see database.snapshot).
+
+    Args:
+        snapshot_dir (str): Snapshot directory.
+        tables (dict, optional): Service name -> table name; defaults to PRICING_TABLES.
+
+    Returns:
+        PricingEngine: The loaded engine.
+    """
+    tables = tables or PRICING_TABLES
+    available = read_manifest(snapshot_dir)["tables"]
+    engine = PricingEngine()
+    for service, table in tables.items():
+        if table not in available:
+            print(f"Warning: Pricing table '{table}' not in snapshot; {service} prices are unavailable.")
+            continue
+        try:
+            engine.add_arrow_table(service, table, open_snapshot_table(snapshot_dir, table))
+        except ValueError as e:
+            print(f"Warning: {e}; {service} prices are unavailable.")
+    return engine
+
+
+def get_pricing_engine(refresh=False):
+    """
+    Returns the process-wide pricing engine, loading it on first use.
+
+    Prices come from the active offline snapshot when one is in use, and from the database otherwise.
+
+    Args:
+        refresh (bool): Reload the tables even if the engine is already in memory.
+
+    Returns:
+        PricingEngine: The pricing engine.
+    """
+    global _engine
+    if _engine is not None and not refresh:
+        return _engine
+    with _engine_lock:
+        if _engine is None or refresh:
+            snapshot_dir = get_active_snapshot()
+            if snapshot_dir is not None:
+                _engine = load_pricing_engine_from_snapshot(snapshot_dir)
+            else:
+                with get_db_engine().connect() as connection:
+                    _engine = load_pricing_engine(connection)
+        return _engine
+
+
+def invalidate_pricing_engine():
+    """Drops the in-memory engine so the next get_pricing_engine call reloads it."""
+    global _engine
+    with _engine_lock:
+        _engine = None
@@ -0,0 +1,263 @@
+import json
+import time
+
+import numpy as np
+
+from api.streaming import iter_architectures
+from pricing.engine import get_pricing_engine, map_columns
+
+ESTIMATE_CHUNK_SIZE = 5000
+DEFAULT_TERM_TYPE = "OnDemand"
+CURRENCY = "USD"
+
+# Usage quantities in a component's config attributes; monthly cost = priceperunit times all of them.
+# Missing quantities count as 1, matching how serviceusageprice is derived in architectures.json.
+QUANTITY_KEYS = ("number of instances", "utilization (hours/month)", "storage (gb)", "requests")
+
+# Attribute columns used to pick the pricing row when the line item's SKU is not in the table; unit only
+# narrows services without a main key (e.g. Lambda requests vs. GB-seconds)
+LOOKUP_COLUMNS = ("region", "instance_type", "engine", "storage_class", "term_type", "operating_system", "tenancy",
+                  "capacity_status")
+
+# EC2 lists reserved-capacity rows (often at $0) next to the on-demand row of the same instance
+DEFAULT_CAPACITY_STATUS = "Used"
+
+
+def _quantity(attributes, key):
+    value = attributes.get(key)
+    try:
+        return 1.0 if value is None else float(value)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _price(value):
+    try:
+        return np.nan if value is None else float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class CostEstimator:
+    """
+    Fills component_pricing and per-architecture monthly totals from a PricingEngine.
+
+    Each priced line item (one entry of a component's component_resource_config.attributes) is
+    matched to a pricing-table row by its own SKU and term. Line items whose SKU is not in the table
+    fall back to the rows with the same service, region, instance type / storage class / engine, term,
+    OS, tenancy and capacity status; that only counts when those rows agree on a single non-zero
+    price, otherwise the ambiguity is logged. A line item the tables cannot price keeps the
+    priceperunit from its own config.
+
+    A batch is flattened into per-line key and quantity arrays in one pass over the JSON; each
+    distinct key is resolved once, and prices, costs and totals are gathered and summed with NumPy.
+    Writing the results back into the JSON objects is a plain loop.
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        # Distinct lookups -> (price, sku, unit) and attribute layouts -> read plans; shared across chunks
+        self._resolved = {}
+        self._plans = {}
+        self.stats = {"architectures": 0, "line_items": 0, "from_tables": 0, "from_config": 0, "unpriced": 0,
+                      "ambiguous": 0}
+
+    def _plan(self, component_type, attributes):
+        """
+        Returns how to read a line item with these attribute names: (lookup columns, their source
+        keys, term key). Lookup columns are None when the pricing tables do not cover the service.
+        """
+        plan_key = (component_type, tuple(attributes))
+        plan = self._plans.get(plan_key)
+        if plan is None:
+            mapping = map_columns(plan_key[1])
+            columns = sources = None
+            price_table = self.engine.tables.get(component_type) if self.engine is not None else None
+            if price_table is not None:
+                columns = [column for column in LOOKUP_COLUMNS if column in price_table.codes]
+                if price_table.primary is None and "unit" in price_table.codes:
+                    columns.append("unit")
+                columns = tuple(columns)
+                sources = tuple(mapping.get(column) for column in columns)
+            plan = self._plans[plan_key] = (columns, sources, mapping.get("term_type"))
+        return plan
+
+    def _resolve(self, component_type, columns, values, sku):
+        """Returns (price, sku, unit) of the pricing row for a lookup key; price is NaN if there is none."""
+        key = (component_type, columns, values, sku)
+        resolved = self._resolved.get(key)
+        if resolved is not None:
+            return resolved
+        price_table = self.engine.tables[component_type]
+        filters = dict(zip(columns, values))
+        if filters.get("term_type") is None and "term_type" in price_table.codes:
+            filters["term_type"] = DEFAULT_TERM_TYPE
+        if filters.get("capacity_status") is None and "capacity_status" in price_table.codes:
+            filters["capacity_status"] = DEFAULT_CAPACITY_STATUS
+
+        resolved = (np.nan, None, None)
+        rows = np.empty(0, dtype=np.intp)
+        if sku is not None:
+            # The SKU names the product; the term picks between its on-demand and reserved offers
+            rows = price_table.match(sku=sku, term_type=filters.get("term_type"))
+            rows = rows[~np.isnan(price_table.prices[rows])]
+        if not len(rows):
+            rows = price_table.match(**filters)
+            prices = price_table.prices[rows]
+            rows = rows[~np.isnan(prices) & (prices > 0)]
+        if len(rows):
+            distinct = np.unique(price_table.prices[rows])
+            if len(distinct) == 1:
+                row = price_table.row(rows[0])
+                resolved = (row["price"], row["sku"], row.get("unit"))
+            else:
+                self.stats["ambiguous"] += 1
+                described = ", ".join(f"{column}={value}" for column, value in filters.items() if value is not None)
+                print(f"Warning: {len(rows)} {component_type} pricing rows match {described} at "
+                      f"{len(distinct)} different prices ({distinct.min():g}-{distinct.max():g}); "
+                      f"using the line item's own price.")
+        self._resolved[key] = resolved
+        return resolved
+
+    def estimate(self, architectures):
+        """
+        Prices every component of a batch of architectures in place.
+
+        Sets each priced component's component_pricing to {term: {'monthly_cost', 'currency',
+        'line_items'}} and each architecture's metadata 'estimated_monthly_cost'. Components without
+        config attributes keep their pricing unchanged.
+
+        Args:
+            architectures (list): Entries of an architectures.json "architectures" array.
+
+        Returns:
+            numpy.ndarray: Monthly totals in architecture order.
+        """
+        # One pass over the JSON: per-line lookup key ids, quantities and config values
+        keys = {}
+        line_keys, line_arch, line_component, terms, quantities, config_prices = [], [], [], [], [], []
+        config_skus, config_units = [], []
+        components = []
+        for arch_index, architecture in enumerate(architectures):
+            for component in architecture.get("components") or ():
+                config = component.get("component_resource_config")
+                attributes_list = config.get("attributes") if isinstance(config, dict) else None
+                if not attributes_list:
+                    continue
+                component_index = len(components)
+                components.append(component)
+                component_type = component.get("component_type")
+                for attributes in attributes_list:
+                    if not isinstance(attributes, dict):
+                        continue
+                    columns, sources, term_key = self._plan(component_type, attributes)
+                    if columns is not None:
+                        values = tuple(attributes.get(source) if source else None for source in sources)
+                        sku = attributes.get("sku")
+                        line_keys.append(keys.setdefault((component_type, columns, values, sku), len(keys)))
+                    else:
+                        line_keys.append(-1)
+                    line_arch.append(arch_index)
+                    line_component.append(component_index)
+                    terms.append((attributes.get(term_key) if term_key else None) or DEFAULT_TERM_TYPE)
+                    quantities.extend(_quantity(attributes, quantity_key) for quantity_key in QUANTITY_KEYS)
+                    config_prices.append(_price(attributes.get("priceperunit")))
+                    config_skus.append(attributes.get("sku"))
+                    config_units.append(attributes.get("unit"))
+
+        # Resolve each distinct key once; index -1 (services without a pricing table) picks the trailing NaN
+        resolved = [self._resolve(*key) for key in keys] + [(np.nan, None, None)]
+        key_prices = np.fromiter((price for price, _, _ in resolved), dtype=np.float64, count=len(resolved))
+        line_keys = np.asarray(line_keys, dtype=np.intp)
+
+        n_lines = len(line_arch)
+        line_arch = np.asarray(line_arch, dtype=np.intp)
+        table_prices = key_prices[line_keys]
+        config_prices = np.asarray(config_prices, dtype=np.float64)
+        from_tables = ~np.isnan(table_prices)
+        prices = np.where(from_tables, table_prices, config_prices)
+        priced = ~np.isnan(prices)
+        line_quantities = np.prod(np.asarray(quantities, dtype=np.float64).reshape(n_lines, len(QUANTITY_KEYS)), axis=1)
+        costs = np.where(priced, prices * line_quantities, 0.0)
+        totals = np.bincount(line_arch, weights=costs, minlength=len(architectures))
+
+        self.stats["architectures"] += len(architectures)
+        self.stats["line_items"] += n_lines
+        self.stats["from_tables"] += int(from_tables.sum())
+        self.stats["from_config"] += int((priced & ~from_tables).sum())
+        self.stats["unpriced"] += int((~priced).sum())
+
+        # Write the results back into the JSON structure
+        pricing = [{} for _ in components]
+        for line in np.flatnonzero(priced).tolist():
+            _, table_sku, table_unit = resolved[line_keys[line]]
+            entry = pricing[line_component[line]].setdefault(
+                terms[line], {"monthly_cost": 0.0, "currency": CURRENCY, "line_items": []})
+            entry["monthly_cost"] = round(entry["monthly_cost"] + float(costs[line]), 6)
+            entry["line_items"].append({
+                "sku": table_sku or config_skus[line],
+                "priceperunit": float(prices[line]),
+                "unit": table_unit or config_units[line],
+                "quantity": float(line_quantities[line]),
+                "monthly_cost": round(float(costs[line]), 6),
+                "source": "pricing_table" if from_tables[line] else "config"
+            })
+        for component, component_pricing in zip(components, pricing):
+            if component_pricing:
+                component["component_pricing"] = component_pricing
+        for architecture, total in zip(architectures, totals.tolist()):
+            architecture.setdefault("metadata", {})["estimated_monthly_cost"] = round(total, 2)
+        return totals
+
+    def estimate_file(self, input_path, output_path, chunk_size=ESTIMATE_CHUNK_SIZE):
+        """
+        Prices an architectures file chunk by chunk and writes the priced copy.
+
+        The input is streamed with iter_architectures, so memory is bounded by the chunk size.
+
+        Args:
+            input_path (str): Architectures JSON file.
+            output_path (str): Where to write the priced architectures (same layout as the input).
+            chunk_size (int): Architectures priced per batch.
+
+        Returns:
+            dict: The estimator stats ('architectures', 'line_items', 'from_tables', 'from_config', 'unpriced',
+                  'ambiguous').
+        """
+        architectures = iter_architectures(input_path)
+        first = True
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write('{"architectures": [\n')
+            while True:
+                chunk = [architecture for _, architecture in zip(range(chunk_size), architectures)]
+                if not chunk:
+                    break
+                self.estimate(chunk)
+                for architecture in chunk:
+                    f.write(("" if first else ",\n") + json.dumps(architecture))
+                    first = False
+            f.write("\n]}\n")
+        return dict(self.stats)
+
+
+def estimate_architecture_costs(input_path, output_path, engine=None, chunk_size=ESTIMATE_CHUNK_SIZE):
+    """
+    Writes a copy of an architectures file with component_pricing and monthly totals filled in.
+
+    Args:
+        input_path (str): Architectures JSON file.
+        output_path (str): Destination file.
+        engine (PricingEngine, optional): Price source; defaults to get_pricing_engine().
+        chunk_size (int): Architectures priced per batch.
+
+    Returns:
+        dict: Counts of architectures and line items, and how the line items were priced.
+    """
+    if engine is None:
+        engine = get_pricing_engine()
+    start = time.perf_counter()
+    stats = CostEstimator(engine).estimate_file(input_path, output_path, chunk_size)
+    print(f"Priced {stats['architectures']} architectures ({stats['line_items']} line items: "
+          f"{stats['from_tables']} from pricing tables, {stats['from_config']} from their config, "
+          f"{stats['unpriced']} unpriced, {stats['ambiguous']} ambiguous lookups) in {time.perf_counter() - start:.2f}s -> {output_path}")
+    return stats
@@ -6,21 +6,25 @@ load_dotenv()
 
 
 # Function to fetch environment variables
-def get_env_variable(key):
+def get_env_variable(key, default=None):
     """
     Retrieves the value of an environment variable and raises an error if it is not set.
 
     Args:
         key (str): The name of the environment variable to retrieve.
+        default (str, optional): Value returned when the variable is unset or empty.
+                                 If omitted, a missing variable is an error.
 
     Returns:
         str: The value of the environment variable.
 
     Raises:
-        ValueError: If the environment variable is not found or is empty.
+        ValueError: If the environment variable is not found or is empty and no default was given.
     """
 
     value = os.getenv(key)
     if not value:
+        if default is not None:
+            return default
         raise ValueError(f"Environment variable {key} is missing!")
     return value
@@ -0,0 +1,115 @@
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+# Universal hashing parameters: h(x) = ((a * x + b) mod p) truncated to 32 bits
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+DEFAULT_NUM_PERM = 128
+
+
+def _hash_values(values):
+    """Maps each string to a stable 32-bit integer (Python's hash() is salted per process)."""
+    return np.fromiter((zlib.crc32(str(v).encode("utf-8")) for v in values),
+                       dtype=np.uint64, count=len(values))
+
+
+class MinHasher:
+    """
+    Computes fixed-size MinHash signatures whose per-slot agreement rate estimates Jaccard similarity.
+
+    Args:
+        num_perm (int): Number of hash permutations (signature length).
+        seed (int): Seed for the permutation parameters; signatures are only comparable
+                    when produced by hashers with the same num_perm and seed.
+    """
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, values):
+        """
+        Builds the MinHash signature of a set of values.
+
+        Args:
+            values (set): The distinct values to summarise.
+
+        Returns:
+            numpy.ndarray: A uint64 array of length num_perm, or None for an empty set.
+        """
+        if not values:
+            return None
+        hashed = _hash_values(values)[:, np.newaxis]
+        permuted = np.bitwise_and((hashed * self._a + self._b) % MERSENNE_PRIME, MAX_HASH)
+        return permuted.min(axis=0)
+
+
+def _integrate(y, x):
+    """Trapezoidal integration (np.trapz is deprecated in recent NumPy releases)."""
+    return float(np.sum((y[1:] + y[:-1]) / 2 * np.diff(x)))
+
+
+def _false_positive_area(threshold, bands, rows):
+    s = np.linspace(0.0, threshold, 200)
+    return _integrate(1 - (1 - s ** rows) ** bands, s)
+
+
+def _false_negative_area(threshold, bands, rows):
+    s = np.linspace(threshold, 1.0, 200)
+    return _integrate((1 - s ** rows) ** bands, s)
+
+
+def choose_band_layout(threshold, num_perm, false_negative_weight=0.95):
+    """
+    Picks the (bands, rows) split of a signature whose LSH S-curve best matches the threshold.
+
+    False negatives are weighted more heavily than false positives because every candidate
+    pair is verified exactly afterwards, while a missed pair is lost for good.
+
+    Returns:
+        tuple: (bands, rows) with bands * rows <= num_perm.
+    """
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        error = ((1 - false_negative_weight) * _false_positive_area(threshold, bands, rows)
+                 + false_negative_weight * _false_negative_area(threshold, bands, rows))
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hashing index over MinHash signatures.
+
+    Keys whose signatures agree on every row of at least one band land in the same
+    bucket and are reported as candidate pairs.
+
+    Args:
+        threshold (float): Jaccard similarity the index should be tuned for.
+        num_perm (int): Signature length of the inserted MinHash signatures.
+    """
+
+    def __init__(self, threshold, num_perm=DEFAULT_NUM_PERM):
+        self.bands, self.rows = choose_band_layout(threshold, num_perm)
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+
+    def insert(self, key, signature):
+        for band, buckets in enumerate(self._buckets):
+            start = band * self.rows
+            buckets[signature[start:start + self.rows].tobytes()].append(key)
+
+    def candidate_pairs(self):
+        """Returns the set of (key1, key2) pairs, in insertion order, that share at least one bucket."""
+        pairs = set()
+        for buckets in self._buckets:
+            for keys in buckets.values():
+                for i in range(len(keys)):
+                    for j in range(i + 1, len(keys)):
+                        pairs.add((keys[i], keys[j]))
+        return pairs